@@ -1,5 +1,8 @@
 #version 330 core
 
+// Feature toggles are injected as #defines by ShaderProgram from the quality preset:
+// GAMMA_CORRECTION, DISTANCE_FOG, WATER_FOG, WATER_REFLECTIONS
+
 // Final output color with fog and transparency effects applied
 layout (location = 0) out vec4 fogColor;
 
@@ -7,10 +10,17 @@ layout (location = 0) out vec4 fogColor;
 const vec3 gamma = vec3(2.0);
 const vec3 inv_gamma = 1.0 / gamma;
 
+// --- Camera uniform block (shared by all programs, written once per frame) ---
+layout (std140) uniform Camera {
+    mat4 m_proj;
+    mat4 m_view;
+    mat4 m_proj_view;
+    vec4 camera_pos; // Player camera position (for water reflections)
+};
+
 // --- Uniforms (set by CPU) ---
 uniform sampler2DArray u_texture_array_0; // Texture atlas containing all block textures
 uniform vec3 bg_color; // Background/sky color for fog
-uniform vec3 u_camera_pos; // Player camera position (for water reflections)
 
 // --- Inputs from vertex shader ---
 in vec3 voxel_color; // Base color of the voxel (not currently used)
@@ -32,8 +42,10 @@ void main() {
     vec3 tex_col = tex_sample.rgb;
     float alpha = tex_sample.a;
 
+#ifdef GAMMA_CORRECTION
     // Apply gamma correction (convert from sRGB to linear for lighting calculations)
     tex_col = pow(tex_col, gamma);
+#endif
 
     // --- Step 2: Apply lighting (face direction + ambient occlusion) ---
     tex_col *= shading;
@@ -45,18 +57,21 @@ void main() {
     if (voxel_id == 16) {
         alpha = 0.65; // Make water semi-transparent
 
+#ifdef WATER_FOG
         // Apply underwater fog effect (murky blue depth fade)
         vec3 water_color = vec3(0.1, 0.25, 0.45); // Deep water color
         float water_fog = 1.0 - exp2(-0.15 * fog_dist);
         tex_col = mix(tex_col, water_color, water_fog * 0.85);
+#endif
 
         // Add blue tint to water
         tex_col *= vec3(0.65, 0.8, 1.0);
 
+#ifdef WATER_REFLECTIONS
         // --- Water surface reflections (only on top face) ---
         if (face_id == 0) {
             // Calculate view direction (camera to fragment)
-            vec3 view_dir = normalize(u_camera_pos - frag_world_pos);
+            vec3 view_dir = normalize(camera_pos.xyz - frag_world_pos);
 
             // Water surface normal points straight up
             vec3 water_normal = vec3(0.0, 1.0, 0.0);
@@ -75,13 +90,18 @@ void main() {
             // Mix water color with sky reflection
             tex_col = mix(tex_col, sky_reflection, fresnel);
         }
+#endif
     }
 
+#ifdef DISTANCE_FOG
     // --- Step 5: Apply distance fog ---
     tex_col = mix(tex_col, bg_color, (1.0 - exp2(-0.00001 * fog_dist * fog_dist)));
+#endif
 
+#ifdef GAMMA_CORRECTION
     // --- Step 6: Convert back to sRGB for display ---
     tex_col = pow(tex_col, inv_gamma);
+#endif
 
     // --- Step 7: Output final color with transparency ---
     fogColor = vec4(tex_col, alpha);
@@ -3,16 +3,21 @@
 // --- Input: Packed vertex data for performance ---
 // All vertex info is packed into a single uint32 to save memory bandwidth
 layout (location = 0) in uint packed_data;
+// Position of the vertex's chunk, so the chunks of a buffer page are drawn with one call
+layout (location = 1) in uint chunk_data;
 
 // Unpacked vertex data (local to this shader)
 int x, y, z;        // Vertex position within chunk (0-31)
 int ao_id;          // Ambient occlusion ID (0-3, darker to lighter)
 int flip_id;        // Fix for anisotropic filtering artifacts
 
-// --- Uniforms (set by CPU per chunk) ---
-uniform mat4 m_proj;  // Camera projection matrix (perspective)
-uniform mat4 m_view;  // Camera view matrix (position + rotation)
-uniform mat4 m_model; // Chunk's world position matrix
+// --- Camera uniform block (shared by all programs, written once per frame) ---
+layout (std140) uniform Camera {
+    mat4 m_proj;      // Camera projection matrix (perspective)
+    mat4 m_view;      // Camera view matrix (position + rotation)
+    mat4 m_proj_view; // m_proj * m_view, computed once on the CPU
+    vec4 camera_pos;  // Player camera position (xyz)
+};
 
 // --- Outputs to fragment shader ---
 flat out int voxel_id; // Block type ID (passed to fragment shader)
@@ -23,6 +28,9 @@ out vec2 uv;            // Texture coordinates (0-1)
 out float shading;      // Final lighting value (face direction * AO)
 out vec3 frag_world_pos; // World position for water reflections
 
+// Same position math as chunk_depth.vert, so the depth pre-pass matches exactly
+invariant gl_Position;
+
 // --- Lighting constants ---
 // Ambient occlusion: how much nearby blocks darken this vertex
 const float ao_values[4] = float[4](0.1, 0.25, 0.5, 1.0); // darker -> lighter
@@ -74,6 +82,15 @@ void unpack(uint packed_data) {
     flip_id = int(packed_data & g_mask);
 }
 
+// --- Chunk position unpacking ---
+// Format: [14 bits cx + 8192][14 bits cz + 8192][4 bits cy], see pack_chunk_position()
+vec3 get_chunk_offset(uint chunk_data) {
+    int cx = int(chunk_data >> 18u) - 8192;
+    int cz = int((chunk_data >> 4u) & 16383u) - 8192;
+    int cy = int(chunk_data & 15u);
+    return vec3(cx, cy, cz) * 32.0; // Chunk's world position (chunk position * CHUNK_SIZE)
+}
+
 void main() {
     // --- Step 1: Unpack vertex data from compressed format ---
     unpack(packed_data);
@@ -92,8 +109,8 @@ void main() {
     shading = face_shading[face_id] * ao_values[ao_id];
 
     // --- Step 5: Calculate world position (for water reflections) ---
-    frag_world_pos = (m_model * vec4(in_position, 1.0)).xyz;
+    frag_world_pos = in_position + get_chunk_offset(chunk_data);
 
     // --- Step 6: Transform to clip space for rasterization ---
-    gl_Position = m_proj * m_view * m_model * vec4(in_position, 1.0);
+    gl_Position = m_proj_view * vec4(frag_world_pos, 1.0);
 }
\ No newline at end of file
@@ -0,0 +1,5 @@
+#version 330 core
+
+// Depth pre-pass: no color output, only the depth buffer is written
+void main() {
+}
@@ -0,0 +1,32 @@
+#version 330 core
+
+// Depth pre-pass: only the vertex position is needed, the rest of the packed data is ignored
+layout (location = 0) in uint packed_data;
+layout (location = 1) in uint chunk_data;
+
+// --- Camera uniform block (shared by all programs, written once per frame) ---
+layout (std140) uniform Camera {
+    mat4 m_proj;
+    mat4 m_view;
+    mat4 m_proj_view;
+    vec4 camera_pos;
+};
+
+// Must produce exactly the same depth as chunk.vert, or the '==' depth test of the
+// shading pass would reject fragments
+invariant gl_Position;
+
+void main() {
+    // Same bit layout as chunk.vert: [6 bits x][6 bits y][6 bits z][14 bits other data]
+    int x = int(packed_data >> 26u);
+    int y = int((packed_data >> 20u) & 63u);
+    int z = int((packed_data >> 14u) & 63u);
+
+    // Same chunk position layout as chunk.vert: [14 bits cx + 8192][14 bits cz + 8192][4 bits cy]
+    int cx = int(chunk_data >> 18u) - 8192;
+    int cz = int((chunk_data >> 4u) & 16383u) - 8192;
+    int cy = int(chunk_data & 15u);
+
+    vec3 frag_world_pos = vec3(x, y, z) + vec3(cx, cy, cz) * 32.0;
+    gl_Position = m_proj_view * vec4(frag_world_pos, 1.0);
+}
@@ -0,0 +1,11 @@
+#version 330 core
+
+in vec2 uv;
+in vec4 color;
+out vec4 fragColor;
+
+uniform sampler2D u_glyph_atlas; // White glyphs with coverage in alpha, plus a solid white block for bars
+
+void main() {
+    fragColor = color * texture(u_glyph_atlas, uv);
+}
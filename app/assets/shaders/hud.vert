@@ -0,0 +1,18 @@
+#version 330 core
+
+// Performance HUD: text and graph quads in window pixel coordinates (origin top left)
+layout (location = 0) in vec2 in_position;
+layout (location = 1) in vec2 in_uv;
+layout (location = 2) in vec4 in_color;
+
+uniform vec2 u_screen_size;
+
+out vec2 uv;
+out vec4 color;
+
+void main() {
+    uv = in_uv;
+    color = in_color;
+    vec2 ndc = in_position / u_screen_size * 2.0 - 1.0;
+    gl_Position = vec4(ndc.x, -ndc.y, 0.0, 1.0);
+}
@@ -4,8 +4,13 @@ layout (location = 0) in vec3 in_position;
 
 out vec3 sky_position;
 
-uniform mat4 m_proj;
-uniform mat4 m_view;
+// Camera uniform block (shared by all programs, written once per frame)
+layout (std140) uniform Camera {
+    mat4 m_proj;
+    mat4 m_view;
+    mat4 m_proj_view;
+    vec4 camera_pos;
+};
 
 void main() {
     // Remove translation from view matrix (only keep rotation)
@@ -0,0 +1,11 @@
+#version 330 core
+
+// Full-screen quad covering the sky panorama
+layout (location = 0) in vec2 in_position;
+
+out vec2 panorama_uv;
+
+void main() {
+    panorama_uv = in_position * 0.5 + 0.5;
+    gl_Position = vec4(in_position, 0.0, 1.0);
+}
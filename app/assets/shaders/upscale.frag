@@ -0,0 +1,10 @@
+#version 330 core
+
+in vec2 uv;
+out vec4 fragColor;
+
+uniform sampler2D u_scene; // Scene rendered at the dynamic resolution
+
+void main() {
+    fragColor = vec4(texture(u_scene, uv).rgb, 1.0);
+}
@@ -0,0 +1,13 @@
+#version 330 core
+
+// Full-screen quad that upscales the dynamic resolution render target to the window
+layout (location = 0) in vec2 in_position;
+
+uniform vec2 u_uv_scale; // Part of the render target that was rendered to (render scale)
+
+out vec2 uv;
+
+void main() {
+    uv = (in_position * 0.5 + 0.5) * u_uv_scale;
+    gl_Position = vec4(in_position, 0.0, 1.0);
+}
@@ -4,9 +4,15 @@
 layout (location = 0) in vec2 in_tex_coord_0; // Texture coordinates
 layout (location = 1) in vec3 in_position; // Vertex positions
 
+// Camera uniform block (shared by all programs, written once per frame)
+layout (std140) uniform Camera {
+    mat4 m_proj; // Projection matrix
+    mat4 m_view; // View matrix
+    mat4 m_proj_view; // Projection * view matrix
+    vec4 camera_pos; // Camera position
+};
+
 // Uniform matrices
-uniform mat4 m_proj; // Projection matrix
-uniform mat4 m_view; // View matrix
 uniform mat4 m_model; // Model matrix
 uniform uint mode_id; // Mode identifier (used to select marker color)
 
@@ -35,5 +41,5 @@ void main() {
     face_id = gl_VertexID / 6;
 
     // Transform vertex position into clip space
-    gl_Position = m_proj * m_view * m_model * vec4((in_position - 0.5) * 1.01 + 0.5, 1.0);
+    gl_Position = m_proj_view * m_model * vec4((in_position - 0.5) * 1.01 + 0.5, 1.0);
 }// End of void main()
\ No newline at end of file
@@ -0,0 +1,237 @@
+"""
+Headless rendering benchmark.
+
+Builds a fixed-seed world in a standalone OpenGL context (EGL where available, which also
+works with Mesa llvmpipe on machines without a GPU), renders a few scripted camera poses
+through Scene.render into an offscreen framebuffer and prints per pose:
+- CPU submit time: time spent in Scene.render
+- Frame time: submit time plus waiting for the GPU to finish the frame
+- GPU time of the scene passes (sky, depth pre-pass, solid and water passes), if timer queries are supported
+- Chunk draw calls and vertices
+
+Run it with:
+    python -m app.benchmark [--frames N] [--warmup N]
+
+The world seed and render distance are read from the UCG_SEED and UCG_RENDER_DISTANCE
+environment variables; the benchmark defaults them to 1234 and 4 so the results of
+different runs are comparable.
+"""
+
+import os
+
+# Must be set before app.settings is imported
+os.environ.setdefault('UCG_SEED', '1234')
+os.environ.setdefault('UCG_RENDER_DISTANCE', '4')
+os.environ['UCG_WORLD_DIR'] = ''  # Never load or modify the player's world save, even if UCG_WORLD_DIR is set
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import statistics
+import time
+import moderngl
+import pygame
+
+from app.settings import *
+from app.graphics.shader_program import ShaderProgram
+from app.graphics.scene import Scene
+from app.graphics.textures import Textures
+from app.graphics.render_state import RenderState
+from app.profiler import Profiler
+from app.players.player import Player
+from app.game_mode import GameMode, GameModeManager
+
+# Scripted camera poses: (name, offset from the spawn position, yaw, pitch in degrees)
+BENCHMARK_POSES = (
+    ('north', (0, 0, 0), -90, 0),
+    ('east', (0, 0, 0), 0, 0),
+    ('south', (0, 0, 0), 90, 0),
+    ('west', (0, 0, 0), 180, 0),
+    ('down', (0, 0, 0), 0, -80),
+    ('overview', (0, 60, 0), 45, -30),
+)
+
+
+def create_context():
+    """
+    Creates a standalone OpenGL 3.3 context, preferring EGL so no display is needed.
+
+    Returns:
+        moderngl.Context: The OpenGL context
+    """
+    try:
+        return moderngl.create_standalone_context(require=330, backend='egl')
+    except Exception as error:
+        print(f"EGL context not available ({error}), falling back to the default backend")
+        return moderngl.create_standalone_context(require=330)
+
+
+class Benchmark:
+    """
+    Stands in for the Game object: holds the same attributes the scene needs, but renders
+    into an offscreen framebuffer instead of a window.
+
+    Attributes:
+        ctx: Standalone OpenGL context
+        render_state (RenderState): GL state tracker
+        profiler (Profiler): Frame profiler, required by the world
+        dynamic_resolution: Always None, the benchmark renders at the full resolution
+        fbo: Offscreen framebuffer with the window resolution
+        clock: pygame clock (not ticked, the benchmark measures time itself)
+        delta_time (float): Fixed frame time in milliseconds
+        time (float): Fixed game time in seconds, so every run bakes the same sky
+        game_mode (GameModeManager): Game mode manager
+        textures (Textures): Textures
+        player (Player): Player, moved to each benchmark pose
+        shader_program (ShaderProgram): Shader programs
+        scene (Scene): The scene that is benchmarked
+        spawn_position (glm.vec3): Player position after spawning, the poses are relative to it
+    """
+
+    def __init__(self):
+        """
+        Initializes a Benchmark object and builds the world.
+        """
+        pygame.init()
+
+        self.ctx = create_context()
+        self.render_state = RenderState(self.ctx)
+        self.render_state.enable(moderngl.DEPTH_TEST)
+        self.render_state.enable(moderngl.BLEND)
+        self.render_state.disable(moderngl.CULL_FACE)
+        self.profiler = Profiler(self)
+        self.dynamic_resolution = None
+        self.render_state.set_blend_func((moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA))
+
+        self.fbo = self.ctx.simple_framebuffer((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.render_state.use_framebuffer(self.fbo)
+
+        self.clock = pygame.time.Clock()
+        self.delta_time = 1000 / 60
+        self.time = 0.0
+
+        self.game_mode = GameModeManager(starting_mode=GameMode.DEBUG)
+
+        start_time = time.perf_counter()
+        self.textures = Textures(self)
+        self.player = Player(self)
+        self.shader_program = ShaderProgram(self)
+        self.scene = Scene(self)
+        self.player.init_voxel_handler()
+        self.spawn_position = glm.vec3(self.player.position)
+
+        print(f"Renderer: {self.ctx.info['GL_RENDERER']}")
+        print(f"Seed: {SEED} | Render distance: {self.scene.world.render_distance} | "
+              f"Chunks: {len(self.scene.world.chunks)} | "
+              f"World built in {time.perf_counter() - start_time:.1f} s")
+
+    def set_pose(self, offset, yaw, pitch):
+        """
+        Moves the camera to a benchmark pose and updates the scene for it.
+
+        Args:
+            offset (tuple): Offset from the spawn position
+            yaw (float): Yaw in degrees
+            pitch (float): Pitch in degrees
+        """
+        self.player.position = self.spawn_position + glm.vec3(offset)
+        self.player.yaw = glm.radians(yaw)
+        self.player.pitch = glm.radians(pitch)
+        self.player.update_vectors()
+        self.player.update_view_matrix()
+        self.shader_program.update()
+        self.scene.update()
+
+    def render_frame(self):
+        """
+        Renders one frame of the scene and waits for the GPU to finish it.
+
+        Returns:
+            tuple: (CPU submit ms, frame ms)
+        """
+        start_time = time.perf_counter()
+        self.render_state.set_depth_mask(True)
+        self.ctx.clear(color=BG_COLOR)
+        self.scene.render()
+        submit_time = time.perf_counter()
+        self.ctx.finish()
+        end_time = time.perf_counter()
+        self.profiler.end_frame()
+        self.render_state.end_frame()
+        return (submit_time - start_time) * 1000, (end_time - start_time) * 1000
+
+    def run_pose(self, offset, yaw, pitch, frames, warmup):
+        """
+        Renders a pose for the warmup frames and then measures it for the given number of frames.
+
+        Args:
+            offset (tuple): Offset from the spawn position
+            yaw (float): Yaw in degrees
+            pitch (float): Pitch in degrees
+            frames (int): Number of measured frames
+            warmup (int): Number of frames rendered before measuring
+
+        Returns:
+            dict: Median of the measurements and the draw counts of the pose
+        """
+        self.set_pose(offset, yaw, pitch)
+        for _ in range(warmup):
+            self.render_frame()
+
+        submit_times, frame_times, gpu_times = [], [], []
+        for _ in range(frames):
+            submit_ms, frame_ms = self.render_frame()
+            submit_times.append(submit_ms)
+            frame_times.append(frame_ms)
+            # The GPU timers report the previous frame, which is a frame of the same pose
+            gpu_times.append(self.scene.get_gpu_time_ms())
+
+        world = self.scene.world
+        return {
+            'submit_ms': statistics.median(submit_times),
+            'frame_ms': statistics.median(frame_times),
+            'gpu_ms': statistics.median(gpu_times),
+            'draw_calls': world.draw_call_count,
+            'vertices': world.vertex_count,
+        }
+
+    def run(self, frames, warmup):
+        """
+        Runs every benchmark pose and prints the results.
+
+        Args:
+            frames (int): Number of measured frames per pose
+            warmup (int): Number of frames rendered before measuring a pose
+        """
+        print(f"{'Pose':<10} {'CPU submit':>11} {'Frame':>10} {'GPU scene':>10} {'Draws':>7} {'Vertices':>10}")
+
+        results = []
+        for name, offset, yaw, pitch in BENCHMARK_POSES:
+            result = self.run_pose(offset, yaw, pitch, frames, warmup)
+            results.append(result)
+
+            # Timer queries return 0 when the driver doesn't support them
+            gpu_time = f"{result['gpu_ms']:.2f} ms" if result['gpu_ms'] > 0 else 'n/a'
+            print(f"{name:<10} {result['submit_ms']:>8.2f} ms {result['frame_ms']:>7.2f} ms {gpu_time:>10} "
+                  f"{result['draw_calls']:>7} {result['vertices']:>10}")
+
+        print(f"{'total':<10} {sum(r['submit_ms'] for r in results):>8.2f} ms "
+              f"{sum(r['frame_ms'] for r in results):>7.2f} ms")
+
+    def release(self):
+        """
+        Closes the world and releases the OpenGL context.
+        """
+        self.scene.world.close()
+        self.ctx.release()
+        pygame.quit()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Headless rendering benchmark')
+    parser.add_argument('--frames', type=int, default=10, help='measured frames per pose')
+    parser.add_argument('--warmup', type=int, default=5, help='frames rendered before measuring a pose')
+    args = parser.parse_args()
+
+    benchmark = Benchmark()
+    benchmark.run(args.frames, max(args.warmup, 1))
+    benchmark.release()
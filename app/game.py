@@ -7,9 +7,13 @@ import math
 from app.graphics.shader_program import ShaderProgram
 from app.graphics.scene import Scene
 from app.graphics.textures import Textures
+from app.graphics.dynamic_resolution import DynamicResolution
+from app.graphics.render_state import RenderState
+from app.profiler import Profiler
 
 from app.players.player import Player
 from app.gui.gui_manager import GUIManager
+from app.gui.performance_hud import PerformanceHUD
 from app.game_mode import GameMode, GameModeManager
 
 
@@ -40,12 +44,20 @@ class Game:
         pygame.display.set_mode(WINDOW_RESOLUTION, flags=pygame.OPENGL | pygame.DOUBLEBUF)
         self.ctx = moderngl.create_context()
 
+        # All GL state changes go through the render state tracker
+        self.render_state = RenderState(self.ctx)
+
+        # Frame phase times and counters (F3 writes them to a CSV file)
+        self.profiler = Profiler(self)
+
         # Activate fragment depth tests and color blending
         # Note: Face culling disabled to fix transparency rendering issues with water
-        self.ctx.enable(flags=moderngl.DEPTH_TEST | moderngl.BLEND)
+        self.render_state.enable(moderngl.DEPTH_TEST)
+        self.render_state.enable(moderngl.BLEND)
+        self.render_state.disable(moderngl.CULL_FACE)
 
         # Set blend function for proper transparency (src_alpha, one_minus_src_alpha)
-        self.ctx.blend_func = moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA
+        self.render_state.set_blend_func((moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA))
 
         # Turn on garbage collection of unused OpenGL objects
         self.ctx.gc_mode = "auto"
@@ -91,17 +103,23 @@ class Game:
         self.scene = Scene(self)
         self.player.init_voxel_handler()
 
+        # Render the scene offscreen at a variable resolution
+        self.dynamic_resolution = DynamicResolution(self) if DYNAMIC_RESOLUTION else None
+
         # Initialize GUI system
         self.gui = GUIManager(self)
         # Register block preview as a GUI widget
         self.gui.add_widget('block_preview', self.scene.block_preview)
+        # Register the performance overlay (F1)
+        self.gui.add_widget('performance_hud', PerformanceHUD(self))
 
     def update(self):
         """
         Updates the game logic and components.
         """
 
-        self.player.update()
+        with self.profiler.phase('player_update'):
+            self.player.update()
         self.shader_program.update()
         self.scene.update()
 
@@ -121,20 +139,32 @@ class Game:
         Renders the main game scene.
         """
 
-        self.ctx.clear(color=BG_COLOR)
-        self.scene.render()
+        if self.dynamic_resolution:
+            self.dynamic_resolution.render(self.scene.render)
+        else:
+            self.render_state.set_depth_mask(True)  # Depth writes must be on to clear the depth buffer
+            self.ctx.clear(color=BG_COLOR)
+            self.scene.render()
 
         # Render GUI elements (block preview, etc.)
-        self.gui.render()
+        with self.profiler.phase('gui'):
+            self.gui.render()
 
-        # Render debug info
-        self.render_debug_info()
+        # Print debug info to the console (the performance HUD shows it on screen)
+        if PRINT_DEBUG_INFO:
+            self.render_debug_info()
 
-        pygame.display.flip()
+        with self.profiler.phase('flip'):
+            pygame.display.flip()
+        self.profiler.end_frame()
+        self.render_state.end_frame()
 
-    def render_debug_info(self):
+    def get_heading(self):
         """
-        Renders debug information to console (simple approach for OpenGL).
+        Returns the direction the player is facing.
+
+        Returns:
+            tuple: (cardinal direction, yaw in degrees (0-360), pitch in degrees)
         """
         yaw_degrees = math.degrees(self.player.yaw) % 360
         pitch_degrees = math.degrees(self.player.pitch)
@@ -149,16 +179,54 @@ class Game:
         else:
             direction = "North"
 
+        return direction, yaw_degrees, pitch_degrees
+
+    def render_debug_info(self):
+        """
+        Renders debug information to console (simple approach for OpenGL).
+        """
+        direction, yaw_degrees, pitch_degrees = self.get_heading()
+
         # Print to console every 30 frames to avoid spam
         if not hasattr(self, '_debug_frame_count'):
             self._debug_frame_count = 0
 
         self._debug_frame_count += 1
         if self._debug_frame_count % 30 == 0:
+            self.profiler.print_report()
             print(f"Pos: ({self.player.position.x:.1f}, {self.player.position.y:.1f}, {self.player.position.z:.1f}) | "
                   f"Facing: {direction} (Yaw: {yaw_degrees:.1f}°, Pitch: {pitch_degrees:.1f}°) | "
                   f"FPS: {self.clock.get_fps():.0f} | Ground: {self.player.on_ground}")
 
+            arena = self.scene.world.geometry_arena
+            print(f"Chunk geometry: {arena.used_bytes / 2**20:.1f} MiB used | "
+                  f"{arena.allocated_bytes / 2**20:.1f} MiB allocated in {len(arena.pages)} buffers")
+
+            # Compare the solid pass with DEPTH_PREPASS on and off to see if the pre-pass pays off
+            prepass_ms, solid_pass_ms = self.scene.world.get_pass_times()
+            if DEPTH_PREPASS:
+                print(f"GPU depth pre-pass: {prepass_ms:.2f} ms | GPU solid pass: {solid_pass_ms:.2f} ms | "
+                      f"Total: {prepass_ms + solid_pass_ms:.2f} ms")
+            else:
+                print(f"GPU solid pass: {solid_pass_ms:.2f} ms")
+
+            render_state = self.render_state
+            print(f"GL state changes: {render_state.last_change_count} | "
+                  f"Redundant changes skipped: {render_state.last_skipped_count}")
+
+            if self.dynamic_resolution:
+                dynamic_resolution = self.dynamic_resolution
+                print(f"Render scale: {dynamic_resolution.render_scale:.2f} "
+                      f"({'x'.join(map(str, dynamic_resolution.get_viewport_size()))}) | "
+                      f"GPU: {dynamic_resolution.gpu_time_ms:.2f} ms | Frame: {dynamic_resolution.frame_time_ms:.0f} ms")
+
+            if SOFTWARE_OCCLUSION:
+                world = self.scene.world
+                occlusion = world.occlusion_buffer
+                print(f"Chunks drawn: {world.visible_chunk_count} | "
+                      f"Occlusion culled: {occlusion.culled_count}/{occlusion.tested_count} | "
+                      f"Occluders: {occlusion.occluder_count} | Time: {occlusion.time_ms:.2f} ms")
+
     def handle_events(self):
         """
         Handles pygame events such as quitting the game or player events.
@@ -169,6 +237,14 @@ class Game:
             if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
                 self.is_running = False
 
+            # Cycle the shader quality presets
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F2:
+                self.shader_program.cycle_quality()
+
+            # Write the profiler history to a CSV file
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.profiler.dump_csv()
+
             # Handle GUI events (toggling windows, etc.)
             self.gui.handle_event(event)
 
@@ -185,13 +261,18 @@ class Game:
         print("Place/delete a block: Left Mouse Button")
         print("Switch between placement and deletion modes: Right Mouse Button or p")
         print("Change your block: Middle Mouse Button or - or +")
+        print("Cycle shader quality (low/medium/high): F2")
+        print("Toggle the performance HUD: F1")
+        print("Write the frame profile to logs/profile_*.csv: F3")
 
         # Main game loop
         while self.is_running:
-            self.handle_events()
+            with self.profiler.phase('handle_events'):
+                self.handle_events()
             self.update()
             self.render()
 
         # Exit the game
+        self.scene.world.close()
         pygame.quit()
         sys.exit()
@@ -93,8 +93,10 @@ class BlockPreview:
 
     def render(self):
         """Render the block preview in the top-right corner."""
-        # Enable face culling for proper preview rendering
-        self.ctx.enable(moderngl.CULL_FACE)
+        # UI overlay: no depth test, face culling for proper preview rendering
+        render_state = self.app.render_state
+        render_state.disable(moderngl.DEPTH_TEST)
+        render_state.enable(moderngl.CULL_FACE)
 
         # Create model matrix with rotation and positioning
         # Position in top-right corner
@@ -108,13 +110,10 @@ class BlockPreview:
         ortho = glm.ortho(-1, 1, -1, 1, 0.1, 10)
 
         # Set uniforms
-        self.program['m_proj'].write(ortho)
-        self.program['m_model'].write(m_model)
-        self.program['voxel_id'] = self.player.selected_voxel
-        self.program['u_texture_array_0'] = 1
+        render_state.write_uniform(self.program, 'm_proj', ortho)
+        render_state.write_uniform(self.program, 'm_model', m_model)
+        render_state.set_uniform(self.program, 'voxel_id', self.player.selected_voxel)
+        render_state.set_uniform(self.program, 'u_texture_array_0', 1)
 
         # Render the cube
         self.vao.render()
-
-        # Disable face culling again (since it's disabled for main world rendering)
-        self.ctx.disable(moderngl.CULL_FACE)
@@ -0,0 +1,382 @@
+"""
+Chunk geometry arena.
+
+Chunk meshes are sub-allocated from a few large vertex buffers ("pages") instead of each
+getting its own buffer and VAO. A mesh is a (first, count) range of vertices inside a page
+and is drawn with the page's VAO, so rebuilding or streaming a chunk only writes into an
+existing buffer and the number of GPU objects stays small.
+
+Every vertex carries the position of its chunk, so the ranges that follow each other in a
+page are merged and drawn with a single call instead of one call per chunk.
+
+Ranges and pages are released explicitly instead of being left to the garbage collector,
+so the byte counters of the arena always match the loaded chunks.
+"""
+
+import bisect
+from app.settings import *
+
+
+class ArenaRange:
+    """
+    A range of vertices inside an arena page.
+
+    Attributes:
+        page (ArenaPage): Page the range was allocated from
+        first (int): Index of the first vertex in the page
+        count (int): Number of vertices
+    """
+
+    def __init__(self, page, first, count):
+        """
+        Initializes an ArenaRange object.
+
+        Args:
+            page (ArenaPage): Page the range was allocated from
+            first (int): Index of the first vertex in the page
+            count (int): Number of vertices
+        """
+        self.page = page
+        self.first = first
+        self.count = count
+
+    def render(self):
+        """
+        Draws the range with the shading program.
+        """
+        self.page.vao.render(first=self.first, vertices=self.count)
+
+    def render_depth(self):
+        """
+        Draws the range with the depth pre-pass program.
+        """
+        self.page.vao_depth.render(first=self.first, vertices=self.count)
+
+
+class ArenaPage:
+    """
+    One large vertex buffer with a first-fit free list.
+
+    Attributes:
+        capacity (int): Size of the page in vertices
+        buffer: The vertex buffer
+        vao: Vertex array object for the shading program
+        vao_depth: Vertex array object for the depth pre-pass program (None if disabled)
+        free_ranges (list): Sorted (first, count) free vertex ranges
+        used_vertices (int): Number of allocated vertices
+        size_bytes (int): Size of the vertex buffer in bytes
+    """
+
+    def __init__(self, arena, capacity):
+        """
+        Initializes an ArenaPage object.
+
+        Args:
+            arena (BufferArena): Arena that owns the page
+            capacity (int): Size of the page in vertices
+        """
+        ctx = arena.ctx
+        self.capacity = capacity
+        self.size_bytes = capacity * arena.vertex_size
+        self.buffer = ctx.buffer(reserve=self.size_bytes)
+        self.vao = self.get_vao(arena, arena.program)
+
+        # A VAO is bound to one program, so the pre-pass gets its own VAO over the same buffer
+        self.vao_depth = None
+        if DEPTH_PREPASS:
+            self.vao_depth = self.get_vao(arena, arena.depth_program)
+
+        self.free_ranges = [(0, capacity)]
+        self.used_vertices = 0
+
+    def get_vao(self, arena, program):
+        """
+        Creates a vertex array object over the page's buffer.
+
+        Args:
+            arena (BufferArena): Arena that owns the page
+            program: Shader program of the VAO
+
+        Returns:
+            moderngl.VertexArray: The vertex array object
+        """
+        return arena.ctx.vertex_array(
+            program, [(self.buffer, arena.vbo_format, *arena.attrs)], skip_errors=True
+        )
+
+    def allocate(self, count, from_end=False):
+        """
+        Finds the first free range that fits.
+
+        Args:
+            count (int): Number of vertices
+            from_end (bool): Take the last free range that fits, from its end, instead
+
+        Returns:
+            int: Index of the first allocated vertex, or None if the page is too full
+        """
+        indices = range(len(self.free_ranges))
+        for i in reversed(indices) if from_end else indices:
+            first, size = self.free_ranges[i]
+            if size < count:
+                continue
+
+            if size == count:
+                del self.free_ranges[i]
+            elif from_end:
+                self.free_ranges[i] = (first, size - count)
+                first += size - count
+            else:
+                self.free_ranges[i] = (first + count, size - count)
+            self.used_vertices += count
+            return first
+        return None
+
+    def free(self, first, count):
+        """
+        Returns a range to the free list, merging it with its free neighbours.
+
+        Args:
+            first (int): Index of the first vertex
+            count (int): Number of vertices
+        """
+        self.used_vertices -= count
+        i = bisect.bisect_left(self.free_ranges, (first, count))
+
+        # Merge with the next free range
+        if i < len(self.free_ranges) and self.free_ranges[i][0] == first + count:
+            count += self.free_ranges[i][1]
+            del self.free_ranges[i]
+
+        # Merge with the previous free range
+        if i > 0 and sum(self.free_ranges[i - 1]) == first:
+            first, count = self.free_ranges[i - 1][0], self.free_ranges[i - 1][1] + count
+            self.free_ranges[i - 1] = (first, count)
+        else:
+            self.free_ranges.insert(i, (first, count))
+
+    def is_empty(self):
+        """
+        Checks if nothing is allocated in the page.
+
+        Returns:
+            bool: True if the page is empty
+        """
+        return self.used_vertices == 0
+
+    def release(self):
+        """
+        Releases the VAOs and the vertex buffer of the page.
+        """
+        self.vao.release()
+        if self.vao_depth:
+            self.vao_depth.release()
+        self.buffer.release()
+
+
+class BufferArena:
+    """
+    Sub-allocates chunk meshes from large vertex buffer pages.
+
+    Attributes:
+        app: The game object
+        ctx: OpenGL context
+        program: Shader program used for rendering
+        depth_program: Depth-only shader program used for the depth pre-pass
+        vbo_format: Format string of one vertex
+        attrs: Attribute names of the vertex format
+        vertex_size (int): Size of one vertex in bytes
+        page_capacity (int): Size of a page in vertices
+        pages (list): Allocated pages
+        allocated_bytes (int): Size of all page buffers in bytes (GPU memory held by the arena)
+        used_bytes (int): Bytes of chunk geometry currently stored in the pages
+        reused_count (int): Number of uploads that were written into the previous range of a mesh
+    """
+
+    def __init__(self, app, vbo_format, attrs, vertex_size):
+        """
+        Initializes a BufferArena object.
+
+        Args:
+            app: The game object
+            vbo_format (str): Format string of one vertex
+            attrs (tuple): Attribute names of the vertex format
+            vertex_size (int): Size of one vertex in bytes
+        """
+        self.app = app
+        self.ctx = app.ctx
+        self.program = app.shader_program.chunk
+        self.depth_program = app.shader_program.chunk_depth
+        self.vbo_format = vbo_format
+        self.attrs = attrs
+        self.vertex_size = vertex_size
+        # Whole faces of 6 vertices, so ranges taken from the end of a page also start on a face
+        # (the chunk shader picks the UVs of a vertex from gl_VertexID % 6)
+        self.page_capacity = ARENA_PAGE_SIZE // vertex_size // 6 * 6
+        self.pages = []
+
+        # Memory accounting
+        self.allocated_bytes = 0
+        self.used_bytes = 0
+        self.reused_count = 0
+
+    def allocate(self, vertex_data, from_end=False):
+        """
+        Allocates a range for the vertex data and uploads it.
+
+        Args:
+            vertex_data (numpy.array): Vertex data to upload
+            from_end (bool): Allocate from the end of the pages, which keeps geometry drawn
+                in another pass (water) apart from the rest so the rest can be merged into fewer draws
+
+        Returns:
+            ArenaRange: The allocated range
+        """
+        count = vertex_data.nbytes // self.vertex_size
+
+        for page in self.pages:
+            first = page.allocate(count, from_end)
+            if first is not None:
+                break
+        else:
+            # Meshes larger than a page get a page of their own
+            page = ArenaPage(self, max(self.page_capacity, count))
+            self.pages.append(page)
+            self.allocated_bytes += page.size_bytes
+            first = page.allocate(count, from_end)
+
+        page.buffer.write(vertex_data, offset=first * self.vertex_size)
+        self.used_bytes += count * self.vertex_size
+        return ArenaRange(page, first, count)
+
+    def reallocate(self, arena_range, vertex_data, from_end=False):
+        """
+        Uploads new vertex data for a mesh. The previous range is reused when the data fits
+        in it, the unused tail is returned to the free list.
+
+        Args:
+            arena_range (ArenaRange): Previous range of the mesh, or None
+            vertex_data (numpy.array): New vertex data, may be empty
+            from_end (bool): Allocate new ranges from the end of the pages (see allocate())
+
+        Returns:
+            ArenaRange: The range holding the data, or None if the data is empty
+        """
+        count = vertex_data.nbytes // self.vertex_size
+
+        if arena_range is None:
+            return self.allocate(vertex_data, from_end) if count else None
+
+        if count == 0 or count > arena_range.count:
+            self.free(arena_range)
+            return self.allocate(vertex_data, from_end) if count else None
+
+        # Fits: write in place and shrink
+        page = arena_range.page
+        page.buffer.write(vertex_data, offset=arena_range.first * self.vertex_size)
+        if count < arena_range.count:
+            page.free(arena_range.first + count, arena_range.count - count)
+            self.used_bytes -= (arena_range.count - count) * self.vertex_size
+            arena_range.count = count
+        self.reused_count += 1
+        return arena_range
+
+    def read(self, arena_range):
+        """
+        Reads the vertex data of a range back from the GPU.
+
+        Args:
+            arena_range (ArenaRange): Range returned by allocate(), or None
+
+        Returns:
+            numpy.array: The vertex data as bytes, empty for None
+        """
+        if arena_range is None:
+            return numpy.empty(0, dtype=numpy.uint8)
+        data = arena_range.page.buffer.read(
+            size=arena_range.count * self.vertex_size, offset=arena_range.first * self.vertex_size
+        )
+        return numpy.frombuffer(data, dtype=numpy.uint8)
+
+    def free(self, arena_range):
+        """
+        Releases a range so its space can be reused. Pages that become empty are released,
+        except the last one, which is kept for the next allocations.
+
+        Args:
+            arena_range (ArenaRange): Range returned by allocate()
+        """
+        page = arena_range.page
+        page.free(arena_range.first, arena_range.count)
+        self.used_bytes -= arena_range.count * self.vertex_size
+
+        if page.is_empty() and len(self.pages) > 1:
+            self.pages.remove(page)
+            self.allocated_bytes -= page.size_bytes
+            page.release()
+
+    @staticmethod
+    def merge_ranges(ranges, window=1):
+        """
+        Merges ranges that follow each other in a page, so each merged range is drawn with one call.
+
+        The draw order is kept between groups of `window` consecutive ranges. Inside a group any
+        ranges adjacent in a page are merged, and the merged ranges are ordered by the first of
+        their ranges in the draw order. A window of 1 keeps the exact draw order (for blending),
+        larger windows give fewer draws but a coarser order.
+
+        Args:
+            ranges (list): ArenaRanges in draw order
+            window (int): Number of consecutive ranges that may be reordered to merge them
+
+        Returns:
+            list: New ArenaRanges in draw order
+        """
+        merged = []
+        for start in range(0, len(ranges), window):
+            # Walk the group in buffer order, remembering the draw order index of each merged range
+            group = sorted(
+                range(start, min(start + window, len(ranges))),
+                key=lambda i: (id(ranges[i].page), ranges[i].first)
+            )
+            group_merged, ranks = [], []
+            for i in group:
+                arena_range = ranges[i]
+                last = group_merged[-1] if group_merged else None
+                if last and last.page is arena_range.page and last.first + last.count == arena_range.first:
+                    last.count += arena_range.count
+                    ranks[-1] = min(ranks[-1], i)
+                else:
+                    group_merged.append(ArenaRange(arena_range.page, arena_range.first, arena_range.count))
+                    ranks.append(i)
+
+            for j in sorted(range(len(group_merged)), key=ranks.__getitem__):
+                arena_range = group_merged[j]
+                last = merged[-1] if merged else None
+                if last and last.page is arena_range.page and last.first + last.count == arena_range.first:
+                    last.count += arena_range.count
+                else:
+                    merged.append(arena_range)
+        return merged
+
+    def set_program(self, program):
+        """
+        Switches the shading program (e.g. to another shader variant), rebinding the VAO of every page.
+
+        Args:
+            program: The new shader program
+        """
+        self.program = program
+        for page in self.pages:
+            page.vao.release()
+            page.vao = page.get_vao(self, program)
+
+    def release(self):
+        """
+        Releases every page. Ranges allocated before must not be used afterwards.
+        """
+        for page in self.pages:
+            page.release()
+        self.pages.clear()
+        self.allocated_bytes = 0
+        self.used_bytes = 0
@@ -119,35 +119,25 @@ class Frustum:
         self.factor_x = 1.0 / math.cos(half_x := H_FOV * 0.5)
         self.tan_x = math.tan(half_x)
 
-    def is_on_frustum(self, chunk):
+    def get_visible_mask(self, centers):
         """
-        Checks if a chunk is inside the frustum.
+        Checks many chunks against the frustum at once. The bounding sphere of each chunk is
+        tested against the near and far planes, then the top and bottom planes, then the left
+        and right planes.
 
         Args:
-            chunk: The chunk to be checked
+            centers (numpy.array): (N, 3) world positions of the chunk centers
 
         Returns:
-            bool: True if the chunk is inside the frustum
+            numpy.array: N booleans, True for the chunks inside the frustum
         """
-
-        # Calculate vector to the center of the chunk from the camera position
-        sphere_vec = chunk.center - self.cam.position
-
-        # Check if the chunk is outside the NEAR and FAR planes
-        sz = glm.dot(sphere_vec, self.cam.forward)
-        if not (NEAR - CHUNK_SPHERE_RADIUS <= sz <= FAR + CHUNK_SPHERE_RADIUS):
-            return False
-
-        # Check if the chunk is outside the TOP and BOTTOM planes
-        sy = glm.dot(sphere_vec, self.cam.up)
-        dist = self.factor_y * CHUNK_SPHERE_RADIUS + sz * self.tan_y
-        if not (-dist <= sy <= dist):
-            return False
-
-        # Check if the chunk is outside the LEFT and RIGHT planes
-        sx = glm.dot(sphere_vec, self.cam.right)
-        dist = self.factor_x * CHUNK_SPHERE_RADIUS + sz * self.tan_x
-        if not (-dist <= sx <= dist):
-            return False
-
-        return True
+        sphere_vecs = centers - numpy.array(self.cam.position, dtype=numpy.float32)
+        sz = sphere_vecs @ numpy.array(self.cam.forward, dtype=numpy.float32)
+        sy = sphere_vecs @ numpy.array(self.cam.up, dtype=numpy.float32)
+        sx = sphere_vecs @ numpy.array(self.cam.right, dtype=numpy.float32)
+
+        return (
+            (NEAR - CHUNK_SPHERE_RADIUS <= sz) & (sz <= FAR + CHUNK_SPHERE_RADIUS)
+            & (numpy.abs(sy) <= self.factor_y * CHUNK_SPHERE_RADIUS + sz * self.tan_y)
+            & (numpy.abs(sx) <= self.factor_x * CHUNK_SPHERE_RADIUS + sz * self.tan_x)
+        )
@@ -0,0 +1,119 @@
+"""
+Dynamic resolution scaling.
+
+Renders the 3D scene into an offscreen framebuffer at a fraction of the window resolution
+and upscales it to the window, adjusting the fraction every frame to hold a target frame time.
+"""
+
+from app.settings import *
+import numpy as np
+import moderngl
+
+
+class DynamicResolution:
+    """
+    Offscreen render target whose used size follows the measured frame time.
+
+    The framebuffer is allocated at the window resolution once and only a viewport of
+    render_scale times its size is rendered to, so changing the scale is free.
+
+    Attributes:
+        app: The game object
+        ctx: OpenGL context
+        program: Shader program of the upscale pass
+        render_scale (float): Current fraction of the window resolution that is rendered
+        color_texture: Color attachment of the offscreen framebuffer
+        fbo: Offscreen framebuffer the scene is rendered into
+        gpu_time_ms (float): GPU time of the sky, depth pre-pass, solid and water passes, measured one frame late
+        frame_time_ms (float): Time of the last frame, without the FPS limiter sleep
+    """
+
+    def __init__(self, app):
+        """
+        Initializes a DynamicResolution object.
+
+        Args:
+            app: The game object
+        """
+        self.app = app
+        self.ctx = app.ctx
+        self.program = app.shader_program.upscale
+        self.render_scale = 1.0
+
+        # Offscreen framebuffer at full resolution, only a part of it is used
+        size = (WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.color_texture = self.ctx.texture(size, components=4)
+        self.color_texture.filter = (moderngl.LINEAR, moderngl.LINEAR)
+        self.color_texture.use(location=UPSCALE_TEXTURE_UNIT)
+        self.depth_buffer = self.ctx.depth_renderbuffer(size)
+        self.fbo = self.ctx.framebuffer(color_attachments=[self.color_texture], depth_attachment=self.depth_buffer)
+
+        # Full-screen quad for the upscale pass
+        self.vbo = self.ctx.buffer(np.array([-1, -1, 1, -1, 1, 1, -1, -1, 1, 1, -1, 1], dtype='f4'))
+        self.vao = self.ctx.vertex_array(self.program, [(self.vbo, '2f', 'in_position')])
+
+        self.gpu_time_ms = 0.0
+        self.frame_time_ms = 0.0
+
+    def get_viewport_size(self):
+        """
+        Returns the size of the part of the framebuffer that is rendered to.
+
+        Returns:
+            tuple: (width, height) in pixels
+        """
+        return (
+            max(int(WINDOW_WIDTH * self.render_scale), 1),
+            max(int(WINDOW_HEIGHT * self.render_scale), 1),
+        )
+
+    def render(self, render_scene):
+        """
+        Renders the scene into the offscreen framebuffer at the current scale, upscales it
+        to the current framebuffer and updates the scale. The GUI should be rendered after.
+
+        Args:
+            render_scene: Function that renders the 3D scene
+        """
+        render_state = self.app.render_state
+        target_fbo = self.ctx.fbo
+        viewport_width, viewport_height = self.get_viewport_size()
+
+        render_state.use_framebuffer(self.fbo)
+        render_state.set_viewport((0, 0, viewport_width, viewport_height))
+        render_state.set_depth_mask(True)
+        self.ctx.clear(color=BG_COLOR)
+        render_scene()
+
+        # Upscale pass (covers the whole window, so no depth test and no clear are needed)
+        render_state.use_framebuffer(target_fbo)
+        render_state.set_uniform(
+            self.program, 'u_uv_scale', (viewport_width / WINDOW_WIDTH, viewport_height / WINDOW_HEIGHT)
+        )
+        render_state.disable(moderngl.DEPTH_TEST)
+        self.vao.render()
+
+        self.update_scale()
+
+    def update_scale(self):
+        """
+        Moves the render scale towards the scale that would bring the GPU time of the scene
+        to DYNAMIC_RESOLUTION_TARGET_MS. The GPU cost is roughly proportional to the pixel
+        count, so the scale is corrected by the square root of the time ratio.
+
+        Only the GPU work depends on the resolution, so the scale is only lowered while the
+        frame time misses the target too; a frame that is late because of the CPU does not
+        get any faster at a lower resolution.
+        """
+        self.gpu_time_ms = self.app.scene.get_gpu_time_ms()
+        self.frame_time_ms = float(self.app.clock.get_rawtime())
+
+        if self.gpu_time_ms <= 0.0:
+            return
+
+        ideal_scale = self.render_scale * math.sqrt(DYNAMIC_RESOLUTION_TARGET_MS / self.gpu_time_ms)
+        if self.frame_time_ms <= DYNAMIC_RESOLUTION_TARGET_MS:
+            ideal_scale = max(ideal_scale, self.render_scale)
+
+        self.render_scale += (ideal_scale - self.render_scale) * DYNAMIC_RESOLUTION_SMOOTHING
+        self.render_scale = min(max(self.render_scale, DYNAMIC_RESOLUTION_MIN_SCALE), 1.0)
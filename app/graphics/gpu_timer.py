@@ -0,0 +1,39 @@
+class GpuTimer:
+    """
+    Measures the GPU time of the draw calls inside a `with` block.
+
+    Two timer queries are used in turns and each one is read a frame after it was issued,
+    when the GPU has finished it, so reading the time never makes the CPU wait.
+    Timer queries can't be nested, so GpuTimer blocks must not contain each other.
+
+    Attributes:
+        queries (list): The two timer queries
+        index (int): Index of the query used by the next block
+        issued (list): Flags indicating which queries have been issued at least once
+        time_ms (float): GPU time of the block, one frame late, in milliseconds
+    """
+
+    def __init__(self, ctx):
+        """
+        Initializes a GpuTimer object.
+
+        Args:
+            ctx: OpenGL context
+        """
+        self.queries = [ctx.query(time=True), ctx.query(time=True)]
+        self.index = 0
+        self.issued = [False, False]
+        self.time_ms = 0.0
+
+    def __enter__(self):
+        self.queries[self.index].__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self.queries[self.index].__exit__(*args)
+        self.issued[self.index] = True
+        self.index = 1 - self.index
+
+        # The query issued the frame before is finished by now
+        if self.issued[self.index]:
+            self.time_ms = self.queries[self.index].elapsed / 1e6
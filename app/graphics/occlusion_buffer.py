@@ -0,0 +1,282 @@
+"""
+Software occlusion culling.
+
+Rasterizes the coarse occluder boxes of the nearest chunks into a small CPU depth buffer
+and tests the bounding box of every candidate chunk against it before it is drawn.
+"""
+
+import time
+import heapq
+from app.settings import *
+
+# Depth value of an empty pixel (NDC depth is in the -1..1 range)
+CLEAR_DEPTH = 2.0
+
+# Triangles of a box, as indices into its 8 corners (bit 0 = max x, bit 1 = max y, bit 2 = max z)
+# Wound counter-clockwise seen from outside, so back faces can be skipped
+BOX_TRIANGLES = numpy.array([
+    (0, 4, 6), (0, 6, 2),  # Left
+    (1, 3, 7), (1, 7, 5),  # Right
+    (0, 1, 5), (0, 5, 4),  # Bottom
+    (2, 6, 7), (2, 7, 3),  # Top
+    (0, 2, 3), (0, 3, 1),  # Back
+    (4, 5, 7), (4, 7, 6),  # Front
+], dtype=numpy.int64)
+
+
+@njit
+def project_box(view_proj, box, width, height, corners):
+    """
+    Projects the 8 corners of a box into occlusion buffer space.
+
+    Args:
+        view_proj: 4x4 view projection matrix (row-major numpy array)
+        box: Box as (min x, y, z, max x, y, z)
+        width, height: Size of the occlusion buffer
+        corners: (8, 3) output array of screen x, screen y and NDC depth
+
+    Returns:
+        bool: False if a corner is behind the near plane
+    """
+    for i in range(8):
+        x = box[3] if i & 1 else box[0]
+        y = box[4] if i & 2 else box[1]
+        z = box[5] if i & 4 else box[2]
+
+        clip_w = view_proj[3, 0] * x + view_proj[3, 1] * y + view_proj[3, 2] * z + view_proj[3, 3]
+        if clip_w < NEAR:
+            return False
+
+        clip_x = view_proj[0, 0] * x + view_proj[0, 1] * y + view_proj[0, 2] * z + view_proj[0, 3]
+        clip_y = view_proj[1, 0] * x + view_proj[1, 1] * y + view_proj[1, 2] * z + view_proj[1, 3]
+        clip_z = view_proj[2, 0] * x + view_proj[2, 1] * y + view_proj[2, 2] * z + view_proj[2, 3]
+
+        corners[i, 0] = (clip_x / clip_w * 0.5 + 0.5) * width
+        corners[i, 1] = (clip_y / clip_w * 0.5 + 0.5) * height
+        corners[i, 2] = clip_z / clip_w
+    return True
+
+
+@njit
+def is_top_left(dx, dy):
+    """
+    Checks if a triangle edge owns the pixels lying exactly on it (top-left fill rule).
+    Two triangles sharing an edge traverse it in opposite directions, so exactly one of them
+    owns those pixels.
+
+    Args:
+        dx, dy: Direction of the edge on screen
+
+    Returns:
+        bool: True if the pixels on the edge belong to this triangle
+    """
+    return dy < 0 or (dy == 0 and dx < 0)
+
+
+@njit
+def rasterize_triangle(depth, x0, y0, z0, x1, y1, z1, x2, y2, z2):
+    """
+    Rasterizes a front facing triangle into the depth buffer, keeping the nearest depth.
+
+    Pixels are covered if their centre is inside the triangle (top-left fill rule), so the
+    triangles of a box and the faces of adjacent boxes leave no gaps between them. This is
+    safe for occluders because the boxes lie inside solid terrain; the conservative side of
+    the test is is_box_hidden().
+    """
+    # Back faces (clockwise on screen) are hidden by the front faces of the same box
+    area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+    if area < 1e-6:
+        return
+
+    height, width = depth.shape
+    min_x = max(int(math.floor(min(x0, x1, x2))), 0)
+    max_x = min(int(math.ceil(max(x0, x1, x2))), width - 1)
+    min_y = max(int(math.floor(min(y0, y1, y2))), 0)
+    max_y = min(int(math.ceil(max(y0, y1, y2))), height - 1)
+    if min_x > max_x or min_y > max_y:
+        return
+
+    # Depth plane of the triangle
+    dz_dx = ((z1 - z0) * (y2 - y0) - (z2 - z0) * (y1 - y0)) / area
+    dz_dy = ((z2 - z0) * (x1 - x0) - (z1 - z0) * (x2 - x0)) / area
+
+    is_top_left_0 = is_top_left(x2 - x1, y2 - y1)
+    is_top_left_1 = is_top_left(x0 - x2, y0 - y2)
+    is_top_left_2 = is_top_left(x1 - x0, y1 - y0)
+
+    for py in range(min_y, max_y + 1):
+        sy = py + 0.5
+        for px in range(min_x, max_x + 1):
+            sx = px + 0.5
+
+            w0 = (x2 - x1) * (sy - y1) - (y2 - y1) * (sx - x1)
+            w1 = (x0 - x2) * (sy - y2) - (y0 - y2) * (sx - x2)
+            w2 = (x1 - x0) * (sy - y0) - (y1 - y0) * (sx - x0)
+            if w0 < 0 or w1 < 0 or w2 < 0:
+                continue
+            if (w0 == 0 and not is_top_left_0) or (w1 == 0 and not is_top_left_1) or (w2 == 0 and not is_top_left_2):
+                continue
+
+            z = z0 + dz_dx * (sx - x0) + dz_dy * (sy - y0)
+            if z < depth[py, px]:
+                depth[py, px] = z
+
+
+@njit
+def is_box_hidden(depth, corners):
+    """
+    Checks if a projected box is completely behind the depth buffer.
+
+    Args:
+        depth: (height, width) float32 depth buffer
+        corners: (8, 3) projected corners of the box
+
+    Returns:
+        bool: True if every pixel under the box is nearer than the box
+    """
+    height, width = depth.shape
+    min_x = max(int(math.floor(corners[:, 0].min())), 0)
+    max_x = min(int(math.ceil(corners[:, 0].max())), width - 1)
+    min_y = max(int(math.floor(corners[:, 1].min())), 0)
+    max_y = min(int(math.ceil(corners[:, 1].max())), height - 1)
+    nearest_z = corners[:, 2].min()
+
+    # Off-screen boxes are left to the frustum test
+    if min_x > max_x or min_y > max_y:
+        return False
+
+    for py in range(min_y, max_y + 1):
+        for px in range(min_x, max_x + 1):
+            if depth[py, px] >= nearest_z:
+                return False
+    return True
+
+
+@njit  # Numba JIT - runs every frame when the occlusion buffer is enabled
+def rasterize_boxes(depth, view_proj, boxes):
+    """
+    Rasterizes occluder boxes into the depth buffer. Boxes should be sorted front to back,
+    boxes already hidden by nearer ones are skipped.
+
+    Args:
+        depth: (height, width) float32 depth buffer
+        view_proj: 4x4 view projection matrix (row-major numpy array)
+        boxes: (N, 6) array of occluder boxes
+    """
+    height, width = depth.shape
+    corners = numpy.empty((8, 3), dtype=numpy.float64)
+
+    for i in range(boxes.shape[0]):
+        # Boxes crossing the near plane are skipped, they can't be projected safely
+        if not project_box(view_proj, boxes[i], width, height, corners):
+            continue
+        if is_box_hidden(depth, corners):
+            continue
+
+        for t in range(BOX_TRIANGLES.shape[0]):
+            a, b, c = BOX_TRIANGLES[t, 0], BOX_TRIANGLES[t, 1], BOX_TRIANGLES[t, 2]
+            rasterize_triangle(
+                depth,
+                corners[a, 0], corners[a, 1], corners[a, 2],
+                corners[b, 0], corners[b, 1], corners[b, 2],
+                corners[c, 0], corners[c, 1], corners[c, 2],
+            )
+
+
+@njit  # Numba JIT - runs every frame when the occlusion buffer is enabled
+def test_boxes(depth, view_proj, boxes):
+    """
+    Tests boxes against the depth buffer.
+
+    Args:
+        depth: (height, width) float32 depth buffer
+        view_proj: 4x4 view projection matrix (row-major numpy array)
+        boxes: (N, 6) array of boxes to test
+
+    Returns:
+        numpy.array: N bools, False for boxes hidden behind the occluders
+    """
+    height, width = depth.shape
+    corners = numpy.empty((8, 3), dtype=numpy.float64)
+    visible = numpy.ones(boxes.shape[0], dtype=numpy.bool_)
+
+    for i in range(boxes.shape[0]):
+        # Boxes crossing the near plane are always visible
+        if not project_box(view_proj, boxes[i], width, height, corners):
+            continue
+
+        visible[i] = not is_box_hidden(depth, corners)
+
+    return visible
+
+
+class OcclusionBuffer:
+    """
+    Low resolution CPU depth buffer used to skip chunks hidden behind terrain.
+
+    Attributes:
+        app: The game object
+        depth: The depth buffer
+        tested_count: Number of chunks tested in the last frame
+        culled_count: Number of chunks culled in the last frame
+        occluder_count: Number of occluder boxes rasterized in the last frame
+        time_ms: Time spent rasterizing and testing in the last frame, in milliseconds
+    """
+
+    def __init__(self, app):
+        """
+        Initializes an OcclusionBuffer object.
+
+        Args:
+            app: The game object
+        """
+        self.app = app
+        self.depth = numpy.full((OCCLUSION_BUFFER_HEIGHT, OCCLUSION_BUFFER_WIDTH), CLEAR_DEPTH, dtype=numpy.float32)
+
+        # Per-frame statistics
+        self.tested_count = 0
+        self.culled_count = 0
+        self.occluder_count = 0
+        self.time_ms = 0.0
+
+    def cull(self, chunks):
+        """
+        Rasterizes the occluders of the nearest chunks and removes the chunks they hide.
+
+        Args:
+            chunks (list): Chunks that passed the frustum test
+
+        Returns:
+            list: Chunks that are not hidden behind the occluders
+        """
+        start_time = time.perf_counter()
+        player = self.app.player
+        view_proj = numpy.array(player.m_proj * player.m_view, dtype=numpy.float64)
+        self.depth.fill(CLEAR_DEPTH)
+
+        # Nearest chunks with occluders
+        camera_pos = player.position
+        occluder_chunks = heapq.nsmallest(
+            OCCLUSION_MAX_OCCLUDER_CHUNKS,
+            (chunk for chunk in chunks if len(chunk.occluder_boxes)),
+            key=lambda chunk: glm.distance2(chunk.center, camera_pos)
+        )
+
+        self.occluder_count = 0
+        if occluder_chunks:
+            occluder_boxes = numpy.concatenate([chunk.occluder_boxes for chunk in occluder_chunks])
+            rasterize_boxes(self.depth, view_proj, occluder_boxes)
+            self.occluder_count = len(occluder_boxes)
+
+        # Test the bounding box of every chunk
+        visible_chunks = chunks
+        if chunks:
+            box_min = numpy.array([chunk.position for chunk in chunks], dtype=numpy.float32) * CHUNK_SIZE
+            boxes = numpy.hstack([box_min, box_min + CHUNK_SIZE])
+            visible = test_boxes(self.depth, view_proj, boxes)
+            visible_chunks = [chunk for chunk, is_visible in zip(chunks, visible) if is_visible]
+
+        self.tested_count = len(chunks)
+        self.culled_count = len(chunks) - len(visible_chunks)
+        self.time_ms = (time.perf_counter() - start_time) * 1000.0
+        return visible_chunks
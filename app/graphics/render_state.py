@@ -0,0 +1,195 @@
+class RenderState:
+    """
+    Tracks the GL state and uniform values set through it and skips changes that would not
+    change anything.
+
+    Every pass declares the state it needs (depth test, face culling, depth function, depth
+    and color writes, blending) instead of restoring what it changed, so a state only changes
+    when two consecutive passes really need different values.
+
+    The write masks and the viewport belong to the current framebuffer in moderngl, and
+    Framebuffer.use() applies the ones stored in the framebuffer. Framebuffers are therefore
+    bound with use_framebuffer(), which forgets the tracked masks and viewport.
+
+    Attributes:
+        ctx: OpenGL context
+        flags (dict): Known enabled/disabled state of the moderngl capability flags
+        depth_func (str): Current depth function, None until it is set the first time
+        depth_mask (bool): Current depth write mask, None until it is set the first time
+        color_mask (tuple): Current color write mask, None until it is set the first time
+        viewport (tuple): Current viewport, None until it is set the first time
+        blend_func (tuple): Current blend function, None until it is set the first time
+        uniforms (dict): Last value written to each (program, uniform name)
+        change_count (int): State changes and uniform writes done in the current frame
+        skipped_count (int): Redundant state changes and uniform writes skipped in the current frame
+        last_change_count (int): change_count of the previous frame
+        last_skipped_count (int): skipped_count of the previous frame
+    """
+
+    def __init__(self, ctx):
+        """
+        Initializes a RenderState object.
+
+        Args:
+            ctx: OpenGL context
+        """
+        self.ctx = ctx
+        self.flags = {}
+        self.depth_func = None
+        self.depth_mask = None
+        self.color_mask = None
+        self.viewport = None
+        self.blend_func = None
+        self.uniforms = {}
+
+        # Per-frame statistics
+        self.change_count = 0
+        self.skipped_count = 0
+        self.last_change_count = 0
+        self.last_skipped_count = 0
+
+    def is_redundant(self, is_same):
+        """
+        Counts a state change request.
+
+        Args:
+            is_same (bool): True if the requested state is already set
+
+        Returns:
+            bool: is_same
+        """
+        if is_same:
+            self.skipped_count += 1
+        else:
+            self.change_count += 1
+        return is_same
+
+    def enable(self, flag):
+        """
+        Enables a single capability (e.g. moderngl.DEPTH_TEST).
+
+        Args:
+            flag: moderngl capability flag
+        """
+        if not self.is_redundant(self.flags.get(flag) is True):
+            self.ctx.enable(flag)
+            self.flags[flag] = True
+
+    def disable(self, flag):
+        """
+        Disables a single capability (e.g. moderngl.CULL_FACE).
+
+        Args:
+            flag: moderngl capability flag
+        """
+        if not self.is_redundant(self.flags.get(flag) is False):
+            self.ctx.disable(flag)
+            self.flags[flag] = False
+
+    def set_depth_func(self, depth_func):
+        """
+        Sets the depth function.
+
+        Args:
+            depth_func (str): moderngl depth function ('<', '<=', '==', ...)
+        """
+        if not self.is_redundant(self.depth_func == depth_func):
+            self.ctx.depth_func = depth_func
+            self.depth_func = depth_func
+
+    def set_depth_mask(self, depth_mask):
+        """
+        Enables or disables depth writes of the current framebuffer. Depth writes must be
+        on for ctx.clear() to clear the depth buffer.
+
+        Args:
+            depth_mask (bool): True to write depth
+        """
+        if not self.is_redundant(self.depth_mask == depth_mask):
+            self.ctx.fbo.depth_mask = depth_mask
+            self.depth_mask = depth_mask
+
+    def set_color_mask(self, color_mask):
+        """
+        Enables or disables color writes of the current framebuffer.
+
+        Args:
+            color_mask (tuple): (red, green, blue, alpha) booleans, True to write the channel
+        """
+        if not self.is_redundant(self.color_mask == color_mask):
+            self.ctx.fbo.color_mask = color_mask
+            self.color_mask = color_mask
+
+    def set_viewport(self, viewport):
+        """
+        Sets the viewport of the current framebuffer.
+
+        Args:
+            viewport (tuple): (x, y, width, height) in pixels
+        """
+        if not self.is_redundant(self.viewport == viewport):
+            self.ctx.fbo.viewport = viewport
+            self.viewport = viewport
+
+    def set_blend_func(self, blend_func):
+        """
+        Sets the blend function.
+
+        Args:
+            blend_func (tuple): moderngl blend factors (source, destination)
+        """
+        if not self.is_redundant(self.blend_func == blend_func):
+            self.ctx.blend_func = blend_func
+            self.blend_func = blend_func
+
+    def use_framebuffer(self, fbo):
+        """
+        Binds a framebuffer. Binding applies the write masks and the viewport stored in the
+        framebuffer, so the tracked values are forgotten.
+
+        Args:
+            fbo: moderngl framebuffer
+        """
+        fbo.use()
+        self.change_count += 1
+        self.depth_mask = None
+        self.color_mask = None
+        self.viewport = None
+
+    def set_uniform(self, program, name, value):
+        """
+        Sets a scalar or tuple uniform (e.g. a texture unit or a block ID).
+
+        Args:
+            program: Shader program
+            name (str): Uniform name
+            value: New value
+        """
+        key = (program.glo, name)
+        if not self.is_redundant(self.uniforms.get(key) == value):
+            program[name] = value
+            self.uniforms[key] = value
+
+    def write_uniform(self, program, name, value):
+        """
+        Writes a glm value (e.g. a matrix) into a uniform.
+
+        Args:
+            program: Shader program
+            name (str): Uniform name
+            value: glm value
+        """
+        data = value.to_bytes()
+        key = (program.glo, name)
+        if not self.is_redundant(self.uniforms.get(key) == data):
+            program[name].write(data)
+            self.uniforms[key] = data
+
+    def end_frame(self):
+        """
+        Stores the statistics of the frame and resets the counters.
+        """
+        self.last_change_count = self.change_count
+        self.last_skipped_count = self.skipped_count
+        self.change_count = 0
+        self.skipped_count = 0
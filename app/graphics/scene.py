@@ -31,12 +31,24 @@ class Scene:
 
     def update(self):
         """
-        Updates the scene by updating the world and voxel marker.
+        Updates the scene by updating the sky, world and voxel marker.
         """
+        self.sky.update()
         self.world.update()
         self.voxel_marker.update()
         self.block_preview.update()
 
+    def get_gpu_time_ms(self):
+        """
+        Returns the GPU time of the passes whose cost depends on the resolution, measured
+        in the previous frame: the sky, the depth pre-pass, the solid pass and the water pass.
+
+        Returns:
+            float: GPU time in milliseconds
+        """
+        world = self.world
+        return self.sky.render_timer.time_ms + sum(world.get_pass_times()) + world.transparent_pass_timer.time_ms
+
     def render(self):
         """
         Renders the scene by rendering the sky, world, and voxel marker.
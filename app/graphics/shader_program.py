@@ -10,9 +10,16 @@ class ShaderProgram:
             ctx: The context associated with the game
             player: The player object from the game
             chunk: The shader program for rendering chunks
+            chunk_depth: The depth-only shader program for the chunk depth pre-pass
             voxel_marker: The shader program for rendering voxel markers
             block_preview: The shader program for rendering block previews
-            sky: The shader program for rendering the sky gradient
+            sky: The shader program for rendering the sky from its baked panorama
+            sky_bake: The shader program for baking the sky and clouds into a panorama
+            upscale: The shader program for upscaling the dynamic resolution render target
+            hud: The shader program for the performance HUD
+            quality: Name of the active SHADER_QUALITY_PRESETS entry
+            variants: Compiled programs, keyed by shader name and #defines
+            camera_ubo: Uniform buffer with the camera matrices, shared by all programs
         """
     def __init__(self, app):
         """
@@ -26,10 +33,20 @@ class ShaderProgram:
         self.player = app.player
 
         # Load shader programs
-        self.chunk = self.get_program(shader_name='chunk')
+        self.variants = {}
+        self.quality = SHADER_QUALITY
+        self.chunk = self.get_program(shader_name='chunk', defines=SHADER_QUALITY_PRESETS[self.quality])
+        self.chunk_depth = self.get_program(shader_name='chunk_depth')
         self.voxel_marker = self.get_program(shader_name='voxel_marker')
         self.block_preview = self.get_program(shader_name='block_preview')
         self.sky = self.get_program(shader_name='sky')
+        self.sky_bake = self.get_program(shader_name='sky_bake')
+        self.upscale = self.get_program(shader_name='upscale')
+        self.hud = self.get_program(shader_name='hud')
+
+        # Camera matrices are shared through one uniform buffer (std140: 3 mat4 + vec4)
+        self.camera_ubo = self.ctx.buffer(reserve=3 * 64 + 16)
+        self.camera_ubo.bind_to_uniform_block(CAMERA_UBO_BINDING)
 
         self.set_uniforms_on_init()
 
@@ -38,37 +55,87 @@ class ShaderProgram:
         Sets the initial uniform values for the shader programs.
         """
 
+        # Camera uniform block
+        for program in (self.chunk, self.chunk_depth, self.voxel_marker, self.sky):
+            program['Camera'].binding = CAMERA_UBO_BINDING
+        self.update()
+
         # Chunk uniforms
-        self.chunk['m_proj'].write(self.player.m_proj)
-        self.chunk['m_model'].write(glm.mat4())
-        self.chunk['u_texture_array_0'] = 1
-        self.chunk['bg_color'].write(BG_COLOR)
-        self.chunk['u_camera_pos'].write(self.player.position)
+        self.set_chunk_uniforms()
 
         # Voxel marker uniforms
-        self.voxel_marker['m_proj'].write(self.player.m_proj)
         self.voxel_marker['m_model'].write(glm.mat4())
         self.voxel_marker['u_texture_0'] = 0
         self.voxel_marker['u_texture_array_0'] = 1  # Use same texture array as chunks
 
-    def update(self):
+        # Sky uniforms
+        self.sky['u_sky_panorama'] = SKY_TEXTURE_UNIT
+
+        # Upscale uniforms
+        self.upscale['u_scene'] = UPSCALE_TEXTURE_UNIT
+
+        # HUD uniforms
+        self.hud['u_glyph_atlas'] = HUD_TEXTURE_UNIT
+
+    def set_chunk_uniforms(self):
         """
-        Updates the shader programs with the player's view matrix.
+        Sets the initial uniform values of the active chunk shader variant.
+        """
+        self.chunk['Camera'].binding = CAMERA_UBO_BINDING
+        self.chunk['u_texture_array_0'] = 1
+
+        # Only used by the fog, the compiler removes it from variants without fog
+        if self.chunk.get('bg_color', None) is not None:
+            self.chunk['bg_color'].write(BG_COLOR)
+
+    def set_quality(self, quality):
+        """
+        Switches the chunk shader to the variant of a quality preset. Variants are compiled
+        on first use and cached, and the chunk VAOs are rebuilt for the new program.
+
+        Args:
+            quality (str): Name of a SHADER_QUALITY_PRESETS entry
         """
-        self.chunk['m_view'].write(self.player.m_view)
-        self.chunk['u_camera_pos'].write(self.player.position)
-        self.voxel_marker['m_view'].write(self.player.m_view)
+        self.quality = quality
+        self.chunk = self.get_program(shader_name='chunk', defines=SHADER_QUALITY_PRESETS[quality])
+        self.set_chunk_uniforms()
+        self.app.scene.world.geometry_arena.set_program(self.chunk)
+        print(f"Shader quality: {quality}")
 
-    def get_program(self, shader_name):
+    def cycle_quality(self):
+        """
+        Switches to the next quality preset.
+        """
+        presets = list(SHADER_QUALITY_PRESETS)
+        self.set_quality(presets[(presets.index(self.quality) + 1) % len(presets)])
+
+    def update(self):
+        """
+        Writes the player's camera matrices into the shared uniform buffer, once per frame.
+        """
+        m_proj, m_view = self.player.m_proj, self.player.m_view
+        self.camera_ubo.write(
+            m_proj.to_bytes() +
+            m_view.to_bytes() +
+            (m_proj * m_view).to_bytes() +
+            glm.vec4(self.player.position, 1.0).to_bytes()
+        )
+
+    def get_program(self, shader_name, defines=()):
         """
          Loads and compiles a shader program from vertex and fragment shader files.
+         Each variant is compiled once and cached.
 
          Args:
              shader_name (str): The name of the shader program
+             defines (tuple): Names #defined in both shaders, right after the #version line
 
          Returns:
              Program: Compiled shader program.
          """
+        key = (shader_name, tuple(sorted(defines)))
+        if key in self.variants:
+            return self.variants[key]
 
         with open(f'app/assets/shaders/{shader_name}.vert') as file:
             vertex_shader = file.read()
@@ -76,5 +143,26 @@ class ShaderProgram:
         with open(f'app/assets/shaders/{shader_name}.frag') as file:
             fragment_shader = file.read()
 
+        if defines:
+            vertex_shader = self.add_defines(vertex_shader, defines)
+            fragment_shader = self.add_defines(fragment_shader, defines)
+
         program = self.ctx.program(vertex_shader=vertex_shader, fragment_shader=fragment_shader)
+        self.variants[key] = program
         return program
+
+    @staticmethod
+    def add_defines(source, defines):
+        """
+        Inserts #define lines after the #version line of a shader.
+
+        Args:
+            source (str): Shader source code
+            defines (tuple): Names to define
+
+        Returns:
+            str: Shader source code with the defines
+        """
+        version, body = source.split('\n', 1)
+        define_lines = ''.join(f'#define {name}\n' for name in defines)
+        return f'{version}\n{define_lines}{body}'
@@ -1,11 +1,17 @@
 """
 Sky rendering system.
 
-Renders a gradient skybox that follows the camera.
+Renders a gradient skybox that follows the camera. The sky and clouds are expensive to
+compute per pixel but change slowly, so they are baked into a low resolution
+equirectangular panorama every SKY_REFRESH_INTERVAL seconds and the skybox only samples it.
+A bake is spread over SKY_BAKE_BANDS frames, one band of rows per frame, so no single frame
+pays for the whole panorama.
 """
 
 from app.settings import *
 import numpy as np
+import moderngl
+from app.graphics.gpu_timer import GpuTimer
 
 
 class Sky:
@@ -14,6 +20,17 @@ class Sky:
 
     The sky follows the camera rotation but not position,
     creating the illusion of an infinite sky.
+
+    Attributes:
+        app: The main game instance
+        ctx: OpenGL context
+        program: Shader program that samples the panorama on the skybox
+        bake_program: Shader program that renders the sky and clouds into the panorama
+        panorama: Equirectangular sky texture
+        panorama_fbo: Framebuffer rendering into the panorama
+        last_bake_time: Game time of the last bake, in seconds
+        next_band: Band of the bake in progress to render next, None if no bake is in progress
+        render_timer (GpuTimer): GPU time of drawing the skybox
     """
 
     def __init__(self, app):
@@ -26,11 +43,27 @@ class Sky:
         self.app = app
         self.ctx = app.ctx
         self.program = app.shader_program.sky
+        self.bake_program = app.shader_program.sky_bake
 
         # Create a large cube for the skybox
         self.vbo = self.get_vbo()
         self.vao = self.get_vao()
 
+        # Panorama the sky is baked into
+        self.panorama = self.ctx.texture((SKY_PANORAMA_WIDTH, SKY_PANORAMA_HEIGHT), components=4)
+        self.panorama.filter = (moderngl.LINEAR, moderngl.LINEAR)
+        self.panorama.repeat_y = False  # Longitude wraps around, latitude doesn't
+        self.panorama.use(location=SKY_TEXTURE_UNIT)
+        self.panorama_fbo = self.ctx.framebuffer(color_attachments=[self.panorama])
+
+        # Full-screen quad for baking
+        self.bake_vbo = self.ctx.buffer(np.array([-1, -1, 1, -1, 1, 1, -1, -1, 1, 1, -1, 1], dtype='f4'))
+        self.bake_vao = self.ctx.vertex_array(self.bake_program, [(self.bake_vbo, '2f', 'in_position')])
+
+        self.last_bake_time = None
+        self.next_band = None
+        self.render_timer = GpuTimer(self.ctx)
+
     def get_vertex_data(self):
         """
         Generate vertex data for a cube.
@@ -115,22 +148,61 @@ class Sky:
         )
         return vao
 
-    def render(self):
+    def bake_band(self, band):
         """
-        Render the sky.
+        Renders the sky and clouds into one band of rows of the panorama, for the time of the
+        bake in progress.
 
-        Should be called before rendering the world.
+        Args:
+            band (int): Index of the band, 0 to SKY_BAKE_BANDS - 1
         """
-        # Disable depth writing for sky (but keep depth testing)
-        self.ctx.depth_func = '<='
+        band_height = -(-SKY_PANORAMA_HEIGHT // SKY_BAKE_BANDS)
+        previous_fbo = self.ctx.fbo
+        self.panorama_fbo.scissor = (0, band * band_height, SKY_PANORAMA_WIDTH, band_height)
+        render_state = self.app.render_state
+        render_state.use_framebuffer(self.panorama_fbo)
 
-        # Write uniforms
-        self.program['m_proj'].write(self.app.player.m_proj)
-        self.program['m_view'].write(self.app.player.m_view)
-        self.program['u_time'].value = self.app.time
+        self.bake_program['u_time'].value = self.last_bake_time
+        self.bake_vao.render()
 
-        # Render the sky cube
-        self.vao.render()
+        self.panorama_fbo.scissor = None
+        render_state.use_framebuffer(previous_fbo)
 
-        # Reset depth function
-        self.ctx.depth_func = '<'
+    def update(self):
+        """
+        Bakes the next band of the panorama, or starts a new bake when the panorama is older
+        than SKY_REFRESH_INTERVAL. The first bake is done at once.
+        """
+        if self.last_bake_time is None:
+            self.last_bake_time = self.app.time
+            for band in range(SKY_BAKE_BANDS):
+                self.bake_band(band)
+            return
+
+        if self.next_band is None:
+            if self.app.time - self.last_bake_time < SKY_REFRESH_INTERVAL:
+                return
+            self.last_bake_time = self.app.time
+            self.next_band = 0
+
+        self.bake_band(self.next_band)
+        self.next_band += 1
+        if self.next_band == SKY_BAKE_BANDS:
+            self.next_band = None
+
+    def render(self):
+        """
+        Render the sky.
+
+        Should be called before rendering the world.
+        """
+        # The sky is drawn at the far plane, '<=' lets it pass against the cleared depth
+        render_state = self.app.render_state
+        render_state.enable(moderngl.DEPTH_TEST)
+        render_state.disable(moderngl.CULL_FACE)
+        render_state.set_depth_func('<=')
+        render_state.set_depth_mask(True)
+
+        # Render the sky cube (camera matrices come from the shared uniform block)
+        with self.render_timer:
+            self.vao.render()
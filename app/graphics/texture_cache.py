@@ -0,0 +1,157 @@
+"""
+Precompiled texture cache.
+
+Decoding the texture PNGs with pygame on every launch is slow and keeps several copies of the
+pixels in memory. The build step stores the decoded, flipped RGBA pixels in a binary file next
+to the PNG, together with a hash of the PNG. At startup the file is memory-mapped and uploaded
+directly; if the hash does not match the PNG any more, the caller falls back to the PNG.
+
+Only the base level is stored, the mip levels are still generated on the GPU after the upload.
+moderngl 5 can neither allocate nor write the mip levels of a texture array, so a stored mip
+chain could not be uploaded from the cache.
+
+Build the cache with:
+    python -m app.graphics.texture_cache
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import pygame
+
+TEXTURE_DIR = 'app/assets/textures'
+
+# Header: magic, SHA-256 of the PNG, width, height, layers, components
+CACHE_MAGIC = b'UCGTEX01'
+CACHE_HEADER = struct.Struct('<8s32s4I')
+
+# Textures that are cached by the build step: (file name, is_texture_array)
+CACHED_TEXTURES = (
+    ('frame.png', False),
+    ('texture_array.png', True),
+)
+
+
+def get_cache_path(file_name):
+    """
+    Returns the path of the cache file of a texture.
+
+    Args:
+        file_name (str): The name of the texture file
+
+    Returns:
+        str: Path of the cache file
+    """
+    return f'{TEXTURE_DIR}/{file_name}.cache'
+
+
+def hash_file(path):
+    """
+    Computes the SHA-256 digest of a file.
+
+    Args:
+        path (str): Path of the file
+
+    Returns:
+        bytes: 32 byte digest
+    """
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).digest()
+
+
+def decode_texture(file_name, is_texture_array=False):
+    """
+    Decodes a texture PNG into the RGBA pixels that are uploaded to the GPU.
+
+    Args:
+        file_name (str): The name of the texture file
+        is_texture_array (bool): Indicates if the texture is a texture array
+
+    Returns:
+        tuple: (width, height, layers, pixels), layers is 1 for a plain texture
+    """
+    texture = pygame.image.load(f'{TEXTURE_DIR}/{file_name}')
+    texture = pygame.transform.flip(texture, flip_x=True, flip_y=False)
+    width, height = texture.get_size()
+
+    layers = 1
+    if is_texture_array:
+        # Calculate number of layers for texture array
+        layers = 3 * height // width
+        height //= layers
+
+    return width, height, layers, pygame.image.tostring(texture, 'RGBA', False)
+
+
+def build_cache(file_name, is_texture_array=False):
+    """
+    Decodes a texture PNG and writes its cache file.
+
+    Args:
+        file_name (str): The name of the texture file
+        is_texture_array (bool): Indicates if the texture is a texture array
+    """
+    width, height, layers, pixels = decode_texture(file_name, is_texture_array)
+    png_hash = hash_file(f'{TEXTURE_DIR}/{file_name}')
+
+    with open(get_cache_path(file_name), 'wb') as file:
+        file.write(CACHE_HEADER.pack(CACHE_MAGIC, png_hash, width, height, layers, 4))
+        file.write(pixels)
+
+
+def load_cache(file_name, upload):
+    """
+    Memory-maps the cache file of a texture and passes its pixels to the upload function.
+
+    Args:
+        file_name (str): The name of the texture file
+        upload: Function called with (width, height, layers, pixels) that creates the texture
+
+    Returns:
+        The return value of upload, or None if there is no valid cache for the PNG
+    """
+    try:
+        file = open(get_cache_path(file_name), 'rb')
+    except FileNotFoundError:
+        return None
+
+    with file:
+        # An interrupted build can leave an empty or truncated file, which cannot be mapped
+        if os.fstat(file.fileno()).st_size < CACHE_HEADER.size:
+            return None
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as cache:
+            return read_cache(file_name, cache, upload)
+
+
+def read_cache(file_name, cache, upload):
+    """
+    Validates a mapped cache file and passes its pixels to the upload function.
+
+    Args:
+        file_name (str): The name of the texture file
+        cache (mmap.mmap): The mapped cache file, at least one header long
+        upload: Function called with (width, height, layers, pixels) that creates the texture
+
+    Returns:
+        The return value of upload, or None if the cache does not match the PNG
+    """
+    magic, png_hash, width, height, layers, components = CACHE_HEADER.unpack_from(cache)
+    pixel_count = width * height * layers * components
+    if magic != CACHE_MAGIC or len(cache) != CACHE_HEADER.size + pixel_count:
+        return None
+    if png_hash != hash_file(f'{TEXTURE_DIR}/{file_name}'):
+        print(f"Texture cache for {file_name} is stale, run: python -m app.graphics.texture_cache")
+        return None
+
+    # The pixels are uploaded straight from the mapped file, without a copy
+    with memoryview(cache) as view:
+        with view[CACHE_HEADER.size:] as pixels:
+            return upload(width, height, layers, pixels)
+
+
+if __name__ == '__main__':
+    for texture_name, texture_is_array in CACHED_TEXTURES:
+        build_cache(texture_name, texture_is_array)
+        print(f"Built {get_cache_path(texture_name)}")
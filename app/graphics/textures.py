@@ -1,5 +1,5 @@
-import pygame
 import moderngl
+from .texture_cache import decode_texture, load_cache
 
 
 class Textures:
@@ -27,7 +27,8 @@ class Textures:
 
     def load(self, file_name, is_texture_array=False):
         """
-        Loads a texture from the given file and returns a texture object.
+        Loads a texture from its precompiled cache, or from the given file if the cache
+        is missing or stale, and returns a texture object.
 
         Args:
             file_name (str): The name of the texture file
@@ -37,24 +38,14 @@ class Textures:
             moderngl.Texture: The loaded texture object
         """
 
-        texture = pygame.image.load(f'app/assets/textures/{file_name}')
-        texture = pygame.transform.flip(texture, flip_x=True, flip_y=False)
-
-        if is_texture_array:
-            # Calculate number of layers for texture array
-            num_layers = 3 * texture.get_height() // texture.get_width()
-            texture = self.app.ctx.texture_array(
-                size=(texture.get_width(), texture.get_height() // num_layers, num_layers),
-                components=4,
-                data=pygame.image.tostring(texture, 'RGBA')
-            )
-
-        else:
-            texture = self.ctx.texture(
-                size=texture.get_size(),
-                components=4,
-                data=pygame.image.tostring(texture, 'RGBA', False)
-            )
+        def upload(width, height, layers, pixels):
+            if is_texture_array:
+                return self.ctx.texture_array(size=(width, height, layers), components=4, data=pixels)
+            return self.ctx.texture(size=(width, height), components=4, data=pixels)
+
+        texture = load_cache(file_name, upload)
+        if texture is None:
+            texture = upload(*decode_texture(file_name, is_texture_array))
 
         # Set texture properties
         texture.anisotropy = 32.0
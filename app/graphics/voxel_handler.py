@@ -16,6 +16,7 @@ class VoxelHandler:
         """
 
         self.app = world.app
+        self.world = world
         self.chunks = world.chunks
 
         self.chunk = None
@@ -41,7 +42,9 @@ class VoxelHandler:
             result = self.get_voxel_id(self.voxel_world_position + self.voxel_normal)
 
             if not result[0]:
-                _, voxel_index, _, chunk = result
+                old_voxel_id, voxel_index, _, chunk = result
+                new_voxel_id = self.new_voxel_id if player_new_voxel_id is None else player_new_voxel_id
+                self.world.record_edit(self.voxel_world_position + self.voxel_normal, old_voxel_id, new_voxel_id)
                 if player_new_voxel_id is None:
                     chunk.voxels[voxel_index] = self.new_voxel_id
                     chunk.mesh.rebuild()
@@ -53,6 +56,7 @@ class VoxelHandler:
 
                 if chunk.is_empty:
                     chunk.is_empty = False
+                chunk.is_modified = True
 
     def rebuild_adj_chunk(self, adj_voxel_pos):
         """
@@ -97,7 +101,9 @@ class VoxelHandler:
             self.add_voxel(new_voxel_id)
         elif self.interaction_mode == 0:
             if self.voxel_id:
+                self.world.record_edit(self.voxel_world_position, self.voxel_id, 0)
                 self.chunk.voxels[self.voxel_index] = 0
+                self.chunk.is_modified = True
 
                 self.chunk.mesh.rebuild()
                 self.rebuild_adjacent_chunks()
@@ -277,7 +283,7 @@ class VoxelHandler:
             lx, ly, lz = voxel_local_position = voxel_world_position - chunk_pos * CHUNK_SIZE
 
             voxel_index = int(lx) + CHUNK_SIZE * int(lz) + CHUNK_AREA * int(ly)
-            voxel_id = chunk.voxels[voxel_index]
+            voxel_id = chunk.get_voxel(voxel_index)
 
             return voxel_id, voxel_index, voxel_local_position, chunk
         return 0, 0, 0, 0
@@ -1,4 +1,5 @@
 from app.settings import *
+import moderngl
 from app.meshes.cube_mesh import CubeMesh
 
 
@@ -44,10 +45,11 @@ class VoxelMarker:
          Sets the uniform values for rendering the marker.
          """
 
-        self.mesh.program['mode_id'] = self.handler.interaction_mode
-        self.mesh.program['m_model'].write(self.get_model_matrix())
+        render_state = self.app.render_state
+        render_state.set_uniform(self.mesh.program, 'mode_id', self.handler.interaction_mode)
+        render_state.write_uniform(self.mesh.program, 'm_model', self.get_model_matrix())
         # Pass the selected voxel ID for ghost preview in place mode
-        self.mesh.program['selected_voxel_id'] = self.app.player.selected_voxel
+        render_state.set_uniform(self.mesh.program, 'selected_voxel_id', self.app.player.selected_voxel)
 
     def get_model_matrix(self):
         """
@@ -66,5 +68,9 @@ class VoxelMarker:
         """
 
         if self.handler.voxel_id:
+            render_state = self.app.render_state
+            render_state.enable(moderngl.DEPTH_TEST)
+            render_state.set_depth_func('<')
+            render_state.set_depth_mask(True)
             self.set_uniform()
             self.mesh.render()
@@ -15,6 +15,7 @@ class GUIManager:
 
         # GUI state
         self.show_block_preview = True  # Toggle for 3D block preview
+        self.show_performance_hud = SHOW_PERFORMANCE_HUD  # Toggle for the performance overlay
 
     def add_widget(self, name, widget):
         """Register a widget with the GUI system."""
@@ -25,6 +26,11 @@ class GUIManager:
         self.show_block_preview = not self.show_block_preview
         print(f"Block preview: {'ON' if self.show_block_preview else 'OFF'}")
 
+    def toggle_performance_hud(self):
+        """Toggle the performance HUD."""
+        self.show_performance_hud = not self.show_performance_hud
+        print(f"Performance HUD: {'ON' if self.show_performance_hud else 'OFF'}")
+
     def update(self):
         """Update all active widgets."""
         for widget in self.widgets.values():
@@ -32,15 +38,14 @@ class GUIManager:
                 widget.update()
 
     def render(self):
-        """Render all visible widgets."""
-        import moderngl
-
+        """Render all visible widgets. Widgets set the render state they need themselves."""
         # Render 3D widgets (like block preview) in OpenGL space
         if self.show_block_preview and 'block_preview' in self.widgets:
-            # Disable depth test for UI overlay
-            self.app.ctx.disable(moderngl.DEPTH_TEST)
             self.widgets['block_preview'].render()
-            self.app.ctx.enable(moderngl.DEPTH_TEST)
+
+        # The HUD is drawn last, over everything else
+        if self.show_performance_hud and 'performance_hud' in self.widgets:
+            self.widgets['performance_hud'].render()
 
     def handle_event(self, event):
         """Handle GUI-related events."""
@@ -48,3 +53,7 @@ class GUIManager:
             # Toggle block preview with 'B' key
             if event.key == pygame.K_b:
                 self.toggle_block_preview()
+
+            # Toggle performance HUD with F1
+            elif event.key == pygame.K_F1:
+                self.toggle_performance_hud()
@@ -0,0 +1,295 @@
+import pygame
+import numpy as np
+import moderngl
+from app.settings import *
+
+# Characters rasterized into the glyph atlas
+HUD_CHARACTERS = ''.join(chr(code) for code in range(32, 127))
+
+# Vertex format: position (pixels), uv, color
+HUD_VERTEX_FORMAT = '2f 2f 4f'
+HUD_VERTEX_SIZE = 8 * 4
+
+HUD_TEXT_COLOR = (1.0, 1.0, 1.0, 1.0)
+HUD_PANEL_COLOR = (0.0, 0.0, 0.0, 0.55)
+HUD_GRAPH_GOOD_COLOR = (0.3, 0.9, 0.3, 0.9)
+HUD_GRAPH_BAD_COLOR = (0.95, 0.3, 0.25, 0.9)
+HUD_GRAPH_TARGET_COLOR = (1.0, 1.0, 1.0, 0.5)
+
+
+class PerformanceHUD:
+    """
+    On-screen overlay with frame time graphs, chunk counts and memory figures.
+
+    The text is drawn from a glyph atlas that is rasterized once from the game font. All
+    text and graph quads are batched into a single vertex buffer that is drawn with one
+    draw call. The contents are regenerated every HUD_REFRESH_INTERVAL seconds and the
+    buffer is only rewritten when they changed.
+
+    Attributes:
+        app: The game object
+        ctx: OpenGL context
+        font: pygame font the atlas is built from
+        program: HUD shader program
+        line_height (int): Height of a text line in pixels
+        glyphs (dict): Character -> (advance width, height, u0, v0, u1, v1)
+        solid_uv (tuple): uv of the solid white block of the atlas, used for panels and bars
+        atlas: Glyph atlas texture
+        vbo: Dynamic vertex buffer holding all quads
+        vao: Vertex array object of the vbo
+        vertex_count (int): Number of vertices in the vbo
+        contents (tuple): Text lines and graph samples the vbo was built from
+        next_refresh_time (float): Game time of the next refresh in seconds
+    """
+
+    def __init__(self, app):
+        """
+        Initializes a PerformanceHUD object.
+
+        Args:
+            app: The game object
+        """
+        self.app = app
+        self.ctx = app.ctx
+        self.font = app.font
+        self.program = app.shader_program.hud
+        self.line_height = self.font.get_linesize()
+
+        self.glyphs = {}
+        self.solid_uv = (0.0, 0.0)
+        self.atlas = self.build_atlas()
+
+        self.vbo = self.ctx.buffer(reserve=HUD_MAX_QUADS * 6 * HUD_VERTEX_SIZE, dynamic=True)
+        self.vao = self.ctx.vertex_array(
+            self.program, [(self.vbo, HUD_VERTEX_FORMAT, 'in_position', 'in_uv', 'in_color')]
+        )
+        self.vertex_count = 0
+        self.contents = None
+        self.next_refresh_time = 0.0
+
+    def build_atlas(self):
+        """
+        Rasterizes HUD_CHARACTERS into one row of a texture, after a small solid white block.
+
+        Returns:
+            moderngl.Texture: The glyph atlas, glyph coverage is stored in the alpha channel
+        """
+        surfaces = [self.font.render(char, True, (255, 255, 255)) for char in HUD_CHARACTERS]
+        padding = 1
+        solid_size = 2
+        width = solid_size + padding + sum(surface.get_width() + padding for surface in surfaces)
+        height = max(self.line_height, solid_size)
+
+        atlas_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        atlas_surface.fill((255, 255, 255, 255), pygame.Rect(0, 0, solid_size, solid_size))
+        self.solid_uv = (1 / width, 1 / height)
+
+        x = solid_size + padding
+        for char, surface in zip(HUD_CHARACTERS, surfaces):
+            glyph_width, glyph_height = surface.get_size()
+            atlas_surface.blit(surface, (x, 0))
+            # Row 0 of the texture is the top row of the surface, so v grows downwards like the screen y
+            self.glyphs[char] = (glyph_width, glyph_height, x / width, 0.0, (x + glyph_width) / width, glyph_height / height)
+            x += glyph_width + padding
+
+        atlas = self.ctx.texture((width, height), components=4, data=pygame.image.tostring(atlas_surface, 'RGBA'))
+        atlas.filter = (moderngl.NEAREST, moderngl.NEAREST)
+        atlas.use(location=HUD_TEXTURE_UNIT)
+        return atlas
+
+    def get_lines(self):
+        """
+        Collects the text lines shown in the HUD.
+
+        Returns:
+            list: Text lines
+        """
+        app = self.app
+        world = app.scene.world
+        profiler = app.profiler
+        frame = profiler.frames[-1] if profiler.frames else None
+        phases = profiler.get_phase_averages()
+        p50, p95, p99 = profiler.get_percentiles()
+        arena = world.geometry_arena
+        render_state = app.render_state
+        position = app.player.position
+        direction, yaw_degrees, pitch_degrees = app.get_heading()
+        voxel_bytes, raw_voxel_bytes = world.get_voxel_memory()
+
+        lines = [
+            f"FPS {app.clock.get_fps():.0f} | Frame p50 {p50:.1f} ms  p95 {p95:.1f} ms  p99 {p99:.1f} ms",
+            None,  # Frame time graph
+        ]
+        if frame:
+            lines.append(
+                f"GPU pre-pass {frame['gpu_prepass_ms']:.2f} | solid {frame['gpu_solid_ms']:.2f} | "
+                f"water {frame['gpu_transparent_ms']:.2f} ms"
+            )
+        lines += [
+            f"CPU chunks {phases['update_chunks']:.2f} | culling {phases['culling']:.2f} | "
+            f"solid {phases['solid_pass']:.2f} | water {phases['transparent_pass']:.2f} ms",
+            f"Chunks {len(world.chunks)} | drawn {world.visible_chunk_count} | culled {world.culled_chunk_count} | "
+            f"render lists {len(world.solid_chunks)} solid, {len(world.transparent_chunks)} water",
+            f"Draw calls {world.draw_call_count} | vertices {world.vertex_count} | "
+            f"state changes {render_state.last_change_count} (skipped {render_state.last_skipped_count})",
+            f"Geometry {arena.used_bytes / 2**20:.1f} / {arena.allocated_bytes / 2**20:.1f} MiB in "
+            f"{len(arena.pages)} buffers | voxels {voxel_bytes / 2**20:.1f} MiB "
+            f"({raw_voxel_bytes / max(voxel_bytes, 1):.1f}x compressed)",
+        ]
+        residency = world.residency_manager
+        lines.append(
+            f"View distance {world.render_distance} / {RENDER_DISTANCE} | budgets: voxels "
+            f"{residency.voxel_bytes / 2**20:.0f} / {VOXEL_MEMORY_BUDGET / 2**20:.0f} MiB, geometry "
+            f"{residency.gpu_bytes / 2**20:.0f} / {GPU_MEMORY_BUDGET / 2**20:.0f} MiB, cached meshes "
+            f"{residency.mesh_bytes / 2**20:.0f} / {MESH_MEMORY_BUDGET / 2**20:.0f} MiB"
+        )
+        if world.chunk_cache:
+            cache = world.chunk_cache
+            lines.append(
+                f"Chunk cache {len(cache.entries)} chunks, {cache.size_bytes / 2**20:.1f} / "
+                f"{cache.max_bytes / 2**20:.0f} MiB | hits {cache.hit_count} misses {cache.miss_count} "
+                f"({cache.get_hit_rate() * 100:.0f}%)"
+            )
+        if app.dynamic_resolution:
+            lines.append(f"Render scale {app.dynamic_resolution.render_scale:.2f}")
+        lines.append(
+            f"Pos {position.x:.1f} {position.y:.1f} {position.z:.1f} | "
+            f"{direction} (yaw {yaw_degrees:.0f}, pitch {pitch_degrees:.0f})"
+        )
+        return lines
+
+    def get_graph_samples(self):
+        """
+        Returns the frame times of the last HUD_GRAPH_FRAMES frames, rounded to 0.1 ms.
+
+        Returns:
+            tuple: Frame times in milliseconds, oldest first
+        """
+        frames = list(self.app.profiler.frames)[-HUD_GRAPH_FRAMES:]
+        return tuple(round(frame['frame_ms'], 1) for frame in frames)
+
+    def add_quad(self, vertices, x0, y0, x1, y1, uv, color):
+        """
+        Appends the two triangles of a quad to the vertex list.
+
+        Args:
+            vertices (list): Vertex list
+            x0, y0, x1, y1 (float): Rectangle in window pixels
+            uv (tuple): (u0, v0, u1, v1) texture rectangle
+            color (tuple): RGBA color
+        """
+        u0, v0, u1, v1 = uv
+        for x, y, u, v in ((x0, y0, u0, v0), (x0, y1, u0, v1), (x1, y1, u1, v1),
+                           (x0, y0, u0, v0), (x1, y1, u1, v1), (x1, y0, u1, v0)):
+            vertices.append((x, y, u, v, *color))
+
+    def add_text(self, vertices, text, x, y):
+        """
+        Appends the glyph quads of a line of text.
+
+        Args:
+            vertices (list): Vertex list
+            text (str): Text, characters missing from the atlas are skipped
+            x, y (float): Top left corner in window pixels
+        """
+        for char in text:
+            glyph = self.glyphs.get(char)
+            if glyph is None:
+                continue
+            advance, height, u0, v0, u1, v1 = glyph
+            if char != ' ':
+                self.add_quad(vertices, x, y, x + advance, y + height, (u0, v0, u1, v1), HUD_TEXT_COLOR)
+            x += advance
+
+    def add_graph(self, vertices, samples, x, y):
+        """
+        Appends the bars of the frame time graph and its target line.
+
+        Args:
+            vertices (list): Vertex list
+            samples (tuple): Frame times in milliseconds
+            x, y (float): Top left corner in window pixels
+        """
+        solid = (*self.solid_uv, *self.solid_uv)
+        bottom = y + HUD_GRAPH_HEIGHT
+        scale = HUD_GRAPH_HEIGHT / HUD_GRAPH_MAX_MS
+
+        for i, frame_ms in enumerate(samples):
+            bar_x = x + i * HUD_GRAPH_BAR_WIDTH
+            bar_height = min(frame_ms, HUD_GRAPH_MAX_MS) * scale
+            color = HUD_GRAPH_GOOD_COLOR if frame_ms <= HUD_GRAPH_TARGET_MS else HUD_GRAPH_BAD_COLOR
+            self.add_quad(vertices, bar_x, bottom - bar_height, bar_x + HUD_GRAPH_BAR_WIDTH - 1, bottom, solid, color)
+
+        target_y = bottom - HUD_GRAPH_TARGET_MS * scale
+        graph_width = HUD_GRAPH_FRAMES * HUD_GRAPH_BAR_WIDTH
+        self.add_quad(vertices, x, target_y, x + graph_width, target_y + 1, solid, HUD_GRAPH_TARGET_COLOR)
+
+    def build_vertices(self, lines, samples):
+        """
+        Lays out the panel, text lines and graph.
+
+        Args:
+            lines (list): Text lines, None marks the place of the graph
+            samples (tuple): Frame time graph samples
+
+        Returns:
+            numpy.array: Vertex data
+        """
+        margin = 8
+        graph_width = HUD_GRAPH_FRAMES * HUD_GRAPH_BAR_WIDTH
+        text_width = max(sum(self.glyphs.get(char, (0,))[0] for char in line) for line in lines if line)
+        panel_width = max(text_width, graph_width) + 2 * margin
+        panel_height = sum(HUD_GRAPH_HEIGHT + 4 if line is None else self.line_height for line in lines) + 2 * margin
+
+        vertices = []
+        self.add_quad(vertices, 0, 0, panel_width, panel_height, (*self.solid_uv, *self.solid_uv), HUD_PANEL_COLOR)
+
+        y = margin
+        for line in lines:
+            if line is None:
+                self.add_graph(vertices, samples, margin, y + 2)
+                y += HUD_GRAPH_HEIGHT + 4
+            else:
+                self.add_text(vertices, line, margin, y)
+                y += self.line_height
+
+        return np.array(vertices[:HUD_MAX_QUADS * 6], dtype='f4')
+
+    def update(self):
+        """
+        Regenerates the HUD contents every HUD_REFRESH_INTERVAL seconds and rewrites the
+        vertex buffer if they changed. Nothing is gathered while the HUD is hidden, and it is
+        regenerated on the first update after it is shown again.
+        """
+        if not self.app.gui.show_performance_hud or self.app.time < self.next_refresh_time:
+            return
+        self.next_refresh_time = self.app.time + HUD_REFRESH_INTERVAL
+
+        contents = (tuple(self.get_lines()), self.get_graph_samples())
+        if contents == self.contents:
+            return
+        self.contents = contents
+
+        vertex_data = self.build_vertices(*contents)
+        self.vbo.write(vertex_data)
+        self.vertex_count = len(vertex_data)
+
+    def render(self):
+        """
+        Draws the HUD over the frame with a single draw call.
+        """
+        self.update()
+
+        render_state = self.app.render_state
+        render_state.disable(moderngl.DEPTH_TEST)
+        render_state.disable(moderngl.CULL_FACE)
+        render_state.set_uniform(self.program, 'u_screen_size', (WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.vao.render(vertices=self.vertex_count)
+
+    def release(self):
+        """
+        Releases the GPU objects of the HUD.
+        """
+        self.vao.release()
+        self.vbo.release()
+        self.atlas.release()
@@ -1,26 +1,45 @@
 from app.settings import *
 from .chunk_mesh import *
+from .chunk_compression import compress_voxels, decompress_voxels, get_compressed_voxel, get_compressed_size
+from app.world_utils.chunk_registry import CHUNK_EMPTY, CHUNK_MODIFIED, CHUNK_POOLED
 import app.world_utils.terrain_gen as terrain_gen
 
 class Chunk:
     """
     Represents a chunk inside the world.
 
+    The per-chunk data that the per-frame passes read (center, flags, connectivity, last
+    visible time) is stored in the world's ChunkRegistry at the chunk's slot and exposed
+    here as properties.
+
     Attributes:
         app: The game object
         world: World object that the chunk belongs to
+        registry: ChunkRegistry of the world
+        slot: Slot of the chunk in the registry
         position: Position of the chunk in the world
-        m_model: Model matrix of the chunk
-        voxels: Array representing the voxels in the chunk
+        voxels: Array representing the voxels in the chunk, decompressed on access
+        raw_voxels: Uncompressed voxels, None while the chunk is compressed
+        compressed_voxels: Palette and runs of the voxels (see compress_voxels), None while uncompressed
+        last_access_time: Game time the voxels were last accessed, used to find idle chunks
+        last_visible_time: Game time the chunk last passed culling, used to pick chunks to unload
         mesh: Mesh associated with the chunk
         is_empty: Flag indicating if the chunk is empty
+        is_modified: Flag indicating if the voxels were edited since the chunk was generated or saved
+        face_connectivity: Bitmask of the chunk faces connected through see-through voxels
+        occluder_boxes: Coarse boxes of solid terrain used by the software occlusion buffer
         center: Center position of the chunk
-        is_on_frustum: A function to check if the chunk is within the camera frustum
     """
 
+    __slots__ = (
+        'app', 'world', 'registry', 'slot', 'position', 'raw_voxels', 'compressed_voxels',
+        'last_access_time', 'mesh', 'occluder_boxes',
+    )
+
     def __init__(self, world, position):
         """
-        Initializes a Chunk object within the given world and position.
+        Initializes a Chunk object within the given world and position, and gives it a slot
+        in the world's chunk registry. The slot is freed by the world when the chunk is unloaded.
 
         Args:
             world: World object
@@ -28,52 +47,114 @@ class Chunk:
         """
         self.app = world.app
         self.world = world
+        self.registry = world.chunk_registry
         self.position = position
-        self.m_model = self.get_model_matrix()
-        self.voxels: numpy.array = None
+        self.slot = self.registry.add(self)
+        self.raw_voxels: numpy.array = None
+        self.compressed_voxels = None
+        self.last_access_time = self.app.time
+        self.last_visible_time = self.app.time
         self.mesh: ChunkMesh = None
-        self.is_empty = True
+        self.occluder_boxes = numpy.empty((0, 6), dtype=numpy.float32)
+
+    @property
+    def center(self):
+        return glm.vec3(*self.registry.centers[self.slot])
+
+    @property
+    def is_empty(self):
+        return self.registry.has_flag(self.slot, CHUNK_EMPTY)
+
+    @is_empty.setter
+    def is_empty(self, is_empty):
+        self.registry.set_flag(self.slot, CHUNK_EMPTY, is_empty)
+
+    @property
+    def is_modified(self):
+        return self.registry.has_flag(self.slot, CHUNK_MODIFIED)
 
-        self.center = (glm.vec3(self.position) + 0.5) * CHUNK_SIZE
-        self.is_on__frustum = self.app.player.frustum.is_on_frustum
+    @is_modified.setter
+    def is_modified(self, is_modified):
+        self.registry.set_flag(self.slot, CHUNK_MODIFIED, is_modified)
 
-    def get_model_matrix(self):
+    @property
+    def face_connectivity(self):
+        return int(self.registry.face_connectivity[self.slot])
+
+    @face_connectivity.setter
+    def face_connectivity(self, face_connectivity):
+        self.registry.face_connectivity[self.slot] = face_connectivity
+
+    @property
+    def last_visible_time(self):
+        return float(self.registry.last_visible_times[self.slot])
+
+    @last_visible_time.setter
+    def last_visible_time(self, last_visible_time):
+        self.registry.last_visible_times[self.slot] = last_visible_time
+
+    @property
+    def voxels(self):
         """
-        Generates the model matrix for the chunk and returns it as m_model
+        The voxels of the chunk. Accessing them decompresses the chunk if it is compressed.
 
         Returns:
-            glm.mat4: Model matrix.
+            numpy.array: Flat uint8 array of CHUNK_VOL voxels
         """
-        m_model = glm.translate(glm.mat4(), glm.vec3(self.position) * CHUNK_SIZE)
-        return m_model
+        if self.raw_voxels is None and self.compressed_voxels is not None:
+            self.raw_voxels = decompress_voxels(*self.compressed_voxels)
+            self.compressed_voxels = None
+        self.last_access_time = self.app.time
+        return self.raw_voxels
+
+    @voxels.setter
+    def voxels(self, voxels):
+        self.raw_voxels = voxels
+        self.compressed_voxels = None
+        self.last_access_time = self.app.time
 
-    def set_uniform(self):
+    def get_voxel(self, voxel_index):
         """
-        Sets the uniform values for rendering the chunk.
+        Reads a single voxel without decompressing the chunk.
+
+        Args:
+            voxel_index (int): Index of the voxel in the chunk
+
+        Returns:
+            int: Voxel ID
         """
-        self.mesh.program['m_model'].write(self.m_model)
+        if self.raw_voxels is None:
+            return get_compressed_voxel(*self.compressed_voxels, voxel_index)
+        return self.raw_voxels[voxel_index]
 
-    def build_mesh(self):
+    def compress(self):
         """
-        Builds the chunk mesh.
+        Replaces the voxels by their palette and run-length compressed form.
+        Chunks whose voxels are in the world's voxel store stay uncompressed.
         """
-        self.mesh = ChunkMesh(self)
+        if self.raw_voxels is not None and not self.registry.has_flag(self.slot, CHUNK_POOLED):
+            self.compressed_voxels = compress_voxels(self.raw_voxels)
+            self.raw_voxels = None
 
-    def render(self):
+    def get_voxel_memory(self):
         """
-        Render solid geometry of the chunk.
+        Returns the memory used by the voxels.
+
+        Returns:
+            int: Size in bytes
         """
-        if not self.is_empty and self.is_on__frustum(self):
-            self.set_uniform()
-            self.mesh.render()
+        if self.raw_voxels is None:
+            return get_compressed_size(self.compressed_voxels)
+        return self.raw_voxels.nbytes
 
-    def render_transparent(self):
+    def build_mesh(self, vertex_data=None):
         """
-        Render transparent geometry (water) of the chunk.
+        Builds the chunk mesh.
+
+        Args:
+            vertex_data (tuple): (solid, transparent) vertex data to upload instead of meshing the chunk
         """
-        if not self.is_empty and self.is_on__frustum(self):
-            self.set_uniform()
-            self.mesh.render_transparent()
+        self.mesh = ChunkMesh(self, vertex_data)
 
     def build_voxels(self):
         """
@@ -114,6 +195,9 @@ class Chunk:
         4. Sky chunks only generate terrain if mountains reach that height
         """
 
+        # Ores and trees only depend on the seed and the chunk, not on the generation order
+        terrain_gen.seed_chunk_random(SEED, int(cx), int(cy), int(cz))
+
         for x in range(CHUNK_SIZE):
             for z in range(CHUNK_SIZE):
                 # Convert chunk-local coords to world coords
@@ -0,0 +1,97 @@
+from app.settings import *
+
+
+@njit  # Numba JIT - runs for every chunk that becomes idle
+def compress_voxels(voxels):
+    """
+    Compresses the voxels of a chunk into a palette and runs of equal voxels.
+
+    Terrain is mostly long runs of air, stone or water along the x axis (the fastest
+    changing axis of the voxel index), so a chunk usually needs a few hundred runs
+    instead of CHUNK_VOL bytes.
+
+    Args:
+        voxels: Flat uint8 array of CHUNK_VOL voxels
+
+    Returns:
+        tuple: (palette, run_values, run_ends)
+            palette: uint8 array of the distinct voxel IDs of the chunk
+            run_values: uint8 array with the palette index of each run
+            run_ends: uint16 array with the voxel index after the end of each run
+    """
+    # Palette of the voxel IDs in the chunk
+    palette_index = numpy.full(256, -1, dtype=numpy.int16)
+    palette_size = 0
+    run_count = 1
+    for i in range(voxels.size):
+        voxel_id = voxels[i]
+        if palette_index[voxel_id] < 0:
+            palette_index[voxel_id] = palette_size
+            palette_size += 1
+        if i > 0 and voxel_id != voxels[i - 1]:
+            run_count += 1
+
+    palette = numpy.empty(palette_size, dtype=numpy.uint8)
+    for voxel_id in range(256):
+        if palette_index[voxel_id] >= 0:
+            palette[palette_index[voxel_id]] = voxel_id
+
+    run_values = numpy.empty(run_count, dtype=numpy.uint8)
+    run_ends = numpy.empty(run_count, dtype=numpy.uint16)
+    run = 0
+    for i in range(1, voxels.size + 1):
+        if i == voxels.size or voxels[i] != voxels[i - 1]:
+            run_values[run] = palette_index[voxels[i - 1]]
+            run_ends[run] = i
+            run += 1
+
+    return palette, run_values, run_ends
+
+
+@njit  # Numba JIT - runs when an idle chunk is accessed again
+def decompress_voxels(palette, run_values, run_ends):
+    """
+    Expands compressed voxels back into a flat array.
+
+    Args:
+        palette, run_values, run_ends: Compressed voxels from compress_voxels
+
+    Returns:
+        numpy.array: Flat uint8 array of CHUNK_VOL voxels
+    """
+    voxels = numpy.empty(CHUNK_VOL, dtype=numpy.uint8)
+    start = 0
+    for run in range(run_ends.size):
+        end = run_ends[run]
+        voxels[start:end] = palette[run_values[run]]
+        start = end
+    return voxels
+
+
+@njit
+def get_compressed_voxel(palette, run_values, run_ends, voxel_index):
+    """
+    Looks up a single voxel of compressed voxels without expanding them.
+
+    Args:
+        palette, run_values, run_ends: Compressed voxels from compress_voxels
+        voxel_index (int): Index of the voxel in the chunk
+
+    Returns:
+        int: Voxel ID
+    """
+    run = numpy.searchsorted(run_ends, voxel_index, side='right')
+    return palette[run_values[run]]
+
+
+def get_compressed_size(compressed_voxels):
+    """
+    Computes the memory used by compressed voxels.
+
+    Args:
+        compressed_voxels (tuple): Compressed voxels from compress_voxels
+
+    Returns:
+        int: Size in bytes
+    """
+    return sum(array.nbytes for array in compressed_voxels)
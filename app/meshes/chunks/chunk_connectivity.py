@@ -0,0 +1,122 @@
+from app.settings import *
+from app.blocks import block_type
+
+
+# Face IDs match the mesh builder: 0=top, 1=bottom, 2=right, 3=left, 4=back, 5=front
+FACE_COUNT = 6
+
+# Every face pair connected (used for empty chunks and chunks that are not loaded)
+FULL_CONNECTIVITY = (1 << (FACE_COUNT * FACE_COUNT)) - 1
+
+
+@njit
+def is_see_through(voxel_id):
+    """
+    Checks if light (and the camera) can pass through a voxel.
+
+    Leaves are treated as see-through because their texture has holes in it.
+
+    Args:
+        voxel_id: ID of the voxel
+
+    Returns:
+        bool: True if the voxel does not block the view
+    """
+    return voxel_id == block_type.VOID or voxel_id == block_type.WATER or voxel_id == block_type.LEAVES
+
+
+@njit
+def connects(connectivity, face_a, face_b):
+    """
+    Checks if two faces of a chunk are connected.
+
+    Args:
+        connectivity: Connectivity bitmask built by get_face_connectivity
+        face_a, face_b: Face IDs (0-5)
+
+    Returns:
+        bool: True if the faces are connected through see-through voxels
+    """
+    return (connectivity >> (face_a * FACE_COUNT + face_b)) & 1 == 1
+
+
+@njit  # Numba JIT - runs on every mesh rebuild
+def get_face_connectivity(chunk_voxels):
+    """
+    Flood fills the see-through voxels of a chunk to find which pairs of chunk faces
+    are connected to each other.
+
+    Args:
+        chunk_voxels: This chunk's voxel data (32*32*32 = 32768 uint8s)
+
+    Returns:
+        int: 36 bit mask, bit (face_a * 6 + face_b) is set when face_a connects to face_b
+    """
+
+    visited = numpy.zeros(CHUNK_VOL, dtype=numpy.uint8)
+    stack = numpy.empty(CHUNK_VOL, dtype=numpy.int32)
+    connectivity = 0
+
+    for start in range(CHUNK_VOL):
+        if visited[start] or not is_see_through(chunk_voxels[start]):
+            continue
+
+        # Flood fill one region of see-through voxels and collect the faces it touches
+        faces = 0
+        visited[start] = 1
+        stack[0] = start
+        top = 1
+
+        while top > 0:
+            top -= 1
+            index = stack[top]
+            x = index % CHUNK_SIZE
+            z = (index // CHUNK_SIZE) % CHUNK_SIZE
+            y = index // CHUNK_AREA
+
+            if y == CHUNK_SIZE - 1:
+                faces |= 1 << 0
+            if y == 0:
+                faces |= 1 << 1
+            if x == CHUNK_SIZE - 1:
+                faces |= 1 << 2
+            if x == 0:
+                faces |= 1 << 3
+            if z == 0:
+                faces |= 1 << 4
+            if z == CHUNK_SIZE - 1:
+                faces |= 1 << 5
+
+            # Push the six neighbours that are inside the chunk
+            for axis in range(6):
+                nx, ny, nz = x, y, z
+                if axis == 0:
+                    ny += 1
+                elif axis == 1:
+                    ny -= 1
+                elif axis == 2:
+                    nx += 1
+                elif axis == 3:
+                    nx -= 1
+                elif axis == 4:
+                    nz -= 1
+                else:
+                    nz += 1
+
+                if not (0 <= nx < CHUNK_SIZE and 0 <= ny < CHUNK_SIZE and 0 <= nz < CHUNK_SIZE):
+                    continue
+
+                neighbor = nx + CHUNK_SIZE * nz + CHUNK_AREA * ny
+                if not visited[neighbor] and is_see_through(chunk_voxels[neighbor]):
+                    visited[neighbor] = 1
+                    stack[top] = neighbor
+                    top += 1
+
+        # Every face touched by this region is connected to every other one
+        for face_a in range(FACE_COUNT):
+            if faces & (1 << face_a):
+                for face_b in range(FACE_COUNT):
+                    if faces & (1 << face_b):
+                        connectivity |= 1 << (face_a * FACE_COUNT + face_b)
+
+    return connectivity
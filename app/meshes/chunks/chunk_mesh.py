@@ -1,70 +1,124 @@
 from app.meshes.mesh import Mesh
 from .chunk_mesh_builder import build_chunk_mesh
+from .chunk_connectivity import get_face_connectivity
+from .chunk_occluders import get_occluder_boxes
+from app.settings import SOFTWARE_OCCLUSION
 
 
 class ChunkMesh(Mesh):
     """
     Represents the chunk mesh for rendering a chunk in the world.
 
-    Inherits from Mesh.
+    Inherits from Mesh. The geometry lives in the world's BufferArena, as one range of
+    vertices for solid geometry and one for transparent geometry.
 
     Attributes:
         app: The game object.
         chunk: Chunk associated with the mesh
         ctx: OpenGL context associated with the game
-        program: Shader program used for rendering
+        arena: BufferArena the geometry is allocated from
         vbo_format: Format string for the vertex buffer object
         format_size: Size of the format
         attrs: Attributes of the mesh
-        vao_solid: Vertex array object for solid geometry
-        vao_transparent: Vertex array object for transparent geometry
+        solid_range: ArenaRange of the solid geometry (None if there is none)
+        transparent_range: ArenaRange of the transparent geometry (None if there is none)
     """
 
-    def __init__(self, chunk):
+    def __init__(self, chunk, vertex_data=None):
         """
         Initializes a ChunkMesh object with the given chunk.
 
         Args:
             chunk: The chunk object
+            vertex_data (tuple): (solid, transparent) vertex data of the chunk if it is known,
+                e.g. from the chunk cache, otherwise the chunk is meshed
         """
 
         super().__init__()
         self.app = chunk.app
         self.chunk = chunk
         self.ctx = self.app.ctx
-        self.program = self.app.shader_program.chunk
+        self.arena = chunk.world.geometry_arena
 
-        self.vbo_format = '1u4'
+        self.vbo_format = self.arena.vbo_format
         self.format_size = sum(int(fmt[:1]) for fmt in self.vbo_format.split())
 
-        self.attrs = ('packed_data',)
-        self.vao_solid = None
-        self.vao_transparent = None
-        self.rebuild()
+        self.attrs = self.arena.attrs
+        self.solid_range = None
+        self.transparent_range = None
+        if vertex_data is None:
+            self.rebuild()
+        else:
+            self.upload(*vertex_data)
 
     def rebuild(self):
         """
-        Rebuilds the vertex array objects (VAOs) for solid and transparent geometry.
+        Rebuilds the solid and transparent geometry ranges in the arena.
+        The previous ranges are reused when the new geometry fits in them.
+        Also refreshes which faces of the chunk are connected, for cave culling,
+        and the occluder boxes of the chunk, for the software occlusion buffer.
+        The world's render lists are updated once the new ranges are in place.
         """
         solid_data, transparent_data = self.get_vertex_data()
+        self.update_connectivity()
 
-        # Build solid VAO
-        if len(solid_data) > 0:
-            vbo_solid = self.ctx.buffer(solid_data)
-            self.vao_solid = self.ctx.vertex_array(
-                self.program, [(vbo_solid, self.vbo_format, *self.attrs)], skip_errors=True
-            )
-        else:
-            self.vao_solid = None
-
-        # Build transparent VAO
-        if len(transparent_data) > 0:
-            vbo_transparent = self.ctx.buffer(transparent_data)
-            self.vao_transparent = self.ctx.vertex_array(
-                self.program, [(vbo_transparent, self.vbo_format, *self.attrs)], skip_errors=True
-            )
-        else:
-            self.vao_transparent = None
+        if SOFTWARE_OCCLUSION:
+            self.chunk.occluder_boxes = get_occluder_boxes(self.chunk.voxels, self.chunk.position)
+
+        self.upload(solid_data, transparent_data)
+
+    def upload(self, solid_data, transparent_data):
+        """
+        Writes vertex data into the arena ranges and updates the world's render lists.
+
+        Args:
+            solid_data (numpy.array): Vertex data of the solid geometry
+            transparent_data (numpy.array): Vertex data of the transparent geometry
+        """
+        self.solid_range = self.arena.reallocate(self.solid_range, solid_data)
+        self.transparent_range = self.arena.reallocate(self.transparent_range, transparent_data, from_end=True)
+
+        self.chunk.world.on_mesh_built(self)
+
+    def read_vertex_data(self):
+        """
+        Reads the geometry back from the arena, so it can be uploaded again without meshing.
+
+        Returns:
+            tuple: (solid_mesh_data, transparent_mesh_data)
+        """
+        return self.arena.read(self.solid_range), self.arena.read(self.transparent_range)
+
+    def release(self):
+        """
+        Returns the geometry ranges to the arena. Called when the chunk is unloaded.
+        """
+        if self.solid_range:
+            self.arena.free(self.solid_range)
+            self.solid_range = None
+        if self.transparent_range:
+            self.arena.free(self.transparent_range)
+            self.transparent_range = None
+
+    def get_size_bytes(self):
+        """
+        Returns the arena memory used by the geometry.
+
+        Returns:
+            int: Size in bytes
+        """
+        vertex_count = sum(arena_range.count for arena_range in (self.solid_range, self.transparent_range) if arena_range)
+        return vertex_count * self.arena.vertex_size
+
+    def update_connectivity(self):
+        """
+        Recomputes the face connectivity of the chunk and notifies the cave culler if it changed.
+        """
+        old_connectivity = self.chunk.face_connectivity
+        self.chunk.face_connectivity = get_face_connectivity(self.chunk.voxels)
+        self.chunk.world.cave_culler.on_connectivity_changed(
+            self.chunk.position, old_connectivity, self.chunk.face_connectivity
+        )
 
     def get_vertex_data(self):
         """
@@ -81,17 +135,3 @@ class ChunkMesh(Mesh):
         )
 
         return solid_mesh, transparent_mesh
-
-    def render(self):
-        """
-        Renders the chunk mesh (solid geometry only - transparent is rendered separately).
-        """
-        if self.vao_solid:
-            self.vao_solid.render()
-
-    def render_transparent(self):
-        """
-        Renders transparent geometry (water blocks).
-        """
-        if self.vao_transparent:
-            self.vao_transparent.render()
@@ -179,13 +179,32 @@ def should_render_face(current_voxel_id, neighbor_voxel_id):
 #     return index
 
 @njit
-def add_data(vertex_data, index, *vertices):
+def pack_chunk_position(cx, cy, cz):
+    """
+    Packs a chunk position into a single uint32 value. It is stored with every vertex, so the
+    shader places the vertex in the world without a per-chunk uniform and the chunks of an
+    arena page can be drawn with one call.
+
+    Args:
+        cx, cy, cz: Chunk position
+
+    Returns:
+        uint32: Packed chunk position
+    """
+
+    # cx: 14 bit, cz: 14 bit (both offset by CHUNK_POS_BIAS so negative positions fit), cy: 4 bit
+    return (cx + CHUNK_POS_BIAS) << 18 | (cz + CHUNK_POS_BIAS) << 4 | cy
+
+
+@njit
+def add_data(vertex_data, index, chunk_data, *vertices):
     """
     Adds vertex data to a vertex array.
 
     Args:
         vertex_data (numpy.array): The vertex array
         index (int): Current index in the vertex array
+        chunk_data (int): Packed chunk position, stored after every vertex
         *vertices: Variable number of vertices to add
 
     Returns:
@@ -194,7 +213,8 @@ def add_data(vertex_data, index, *vertices):
 
     for vertex in vertices:
         vertex_data[index] = vertex
-        index += 1
+        vertex_data[index + 1] = chunk_data
+        index += 2
     return index
 
 
@@ -208,18 +228,19 @@ def build_chunk_mesh(chunk_voxels, format_size, chunk_pos):
 
     Args:
         chunk_voxels: This chunk's voxel data (32*32*32 = 32768 uint8s)
-        format_size: Vertex attribute count (always 1 - we use packed data)
+        format_size: Vertex attribute count (always 2 - packed vertex and packed chunk position)
         chunk_pos: (cx, cy, cz) chunk position in world
 
     Returns:
         (solid_mesh, transparent_mesh): Two uint32 arrays of packed vertices
 
-    VERTEX PACKING FORMAT (1 uint32 per vertex):
+    VERTEX PACKING FORMAT (2 uint32 per vertex):
     - 6 bits X, 6 bits Y, 6 bits Z (local position 0-31)
     - 8 bits voxel_id (block type)
     - 3 bits face_id (which face: 0=top, 1=bottom, 2-5=sides)
     - 2 bits ao_id (ambient occlusion darkness level)
     - 1 bit flip_id (fixes texture anisotropy artifacts)
+    - Second uint32: chunk position (see pack_chunk_position)
     """
 
     # Preallocate worst-case arrays (if every voxel had 6 visible faces)
@@ -228,6 +249,7 @@ def build_chunk_mesh(chunk_voxels, format_size, chunk_pos):
     transparent_data = numpy.empty(CHUNK_VOL * 18 * format_size, dtype='uint32')
     solid_index = 0
     transparent_index = 0
+    chunk_data = pack_chunk_position(chunk_pos[0], chunk_pos[1], chunk_pos[2])
 
     for x in range(CHUNK_SIZE):
         for y in range(CHUNK_SIZE):
@@ -259,14 +281,14 @@ def build_chunk_mesh(chunk_voxels, format_size, chunk_pos):
 
                     if voxel_id == 16:  # Water - transparent
                         if flip_id:
-                            transparent_index = add_data(transparent_data, transparent_index, v1, v0, v3, v1, v3, v2)
+                            transparent_index = add_data(transparent_data, transparent_index, chunk_data, v1, v0, v3, v1, v3, v2)
                         else:
-                            transparent_index = add_data(transparent_data, transparent_index, v0, v3, v2, v0, v2, v1)
+                            transparent_index = add_data(transparent_data, transparent_index, chunk_data, v0, v3, v2, v0, v2, v1)
                     else:  # Solid blocks
                         if flip_id:
-                            solid_index = add_data(solid_data, solid_index, v1, v0, v3, v1, v3, v2)
+                            solid_index = add_data(solid_data, solid_index, chunk_data, v1, v0, v3, v1, v3, v2)
                         else:
-                            solid_index = add_data(solid_data, solid_index, v0, v3, v2, v0, v2, v1)
+                            solid_index = add_data(solid_data, solid_index, chunk_data, v0, v3, v2, v0, v2, v1)
 
                 # Bottom Face
                 neighbor_id = get_voxel_id_at((x, y - 1, z), chunk_voxels)
@@ -283,14 +305,14 @@ def build_chunk_mesh(chunk_voxels, format_size, chunk_pos):
 
                     if voxel_id == 16:  # Water - transparent
                         if flip_id:
-                            transparent_index = add_data(transparent_data, transparent_index, v1, v3, v0, v1, v2, v3)
+                            transparent_index = add_data(transparent_data, transparent_index, chunk_data, v1, v3, v0, v1, v2, v3)
                         else:
-                            transparent_index = add_data(transparent_data, transparent_index, v0, v2, v3, v0, v1, v2)
+                            transparent_index = add_data(transparent_data, transparent_index, chunk_data, v0, v2, v3, v0, v1, v2)
                     else:  # Solid blocks
                         if flip_id:
-                            solid_index = add_data(solid_data, solid_index, v1, v3, v0, v1, v2, v3)
+                            solid_index = add_data(solid_data, solid_index, chunk_data, v1, v3, v0, v1, v2, v3)
                         else:
-                            solid_index = add_data(solid_data, solid_index, v0, v2, v3, v0, v1, v2)
+                            solid_index = add_data(solid_data, solid_index, chunk_data, v0, v2, v3, v0, v1, v2)
 
                 # Right Face
                 neighbor_id = get_voxel_id_at((x + 1, y, z), chunk_voxels)
@@ -306,14 +328,14 @@ def build_chunk_mesh(chunk_voxels, format_size, chunk_pos):
 
                     if voxel_id == 16:  # Water - transparent
                         if flip_id:
-                            transparent_index = add_data(transparent_data, transparent_index, v3, v0, v1, v3, v1, v2)
+                            transparent_index = add_data(transparent_data, transparent_index, chunk_data, v3, v0, v1, v3, v1, v2)
                         else:
-                            transparent_index = add_data(transparent_data, transparent_index, v0, v1, v2, v0, v2, v3)
+                            transparent_index = add_data(transparent_data, transparent_index, chunk_data, v0, v1, v2, v0, v2, v3)
                     else:  # Solid blocks
                         if flip_id:
-                            solid_index = add_data(solid_data, solid_index, v3, v0, v1, v3, v1, v2)
+                            solid_index = add_data(solid_data, solid_index, chunk_data, v3, v0, v1, v3, v1, v2)
                         else:
-                            solid_index = add_data(solid_data, solid_index, v0, v1, v2, v0, v2, v3)
+                            solid_index = add_data(solid_data, solid_index, chunk_data, v0, v1, v2, v0, v2, v3)
 
                 # Left Face
                 neighbor_id = get_voxel_id_at((x - 1, y, z), chunk_voxels)
@@ -329,14 +351,14 @@ def build_chunk_mesh(chunk_voxels, format_size, chunk_pos):
 
                     if voxel_id == 16:  # Water - transparent
                         if flip_id:
-                            transparent_index = add_data(transparent_data, transparent_index, v3, v1, v0, v3, v2, v1)
+                            transparent_index = add_data(transparent_data, transparent_index, chunk_data, v3, v1, v0, v3, v2, v1)
                         else:
-                            transparent_index = add_data(transparent_data, transparent_index, v0, v2, v1, v0, v3, v2)
+                            transparent_index = add_data(transparent_data, transparent_index, chunk_data, v0, v2, v1, v0, v3, v2)
                     else:  # Solid blocks
                         if flip_id:
-                            solid_index = add_data(solid_data, solid_index, v3, v1, v0, v3, v2, v1)
+                            solid_index = add_data(solid_data, solid_index, chunk_data, v3, v1, v0, v3, v2, v1)
                         else:
-                            solid_index = add_data(solid_data, solid_index, v0, v2, v1, v0, v3, v2)
+                            solid_index = add_data(solid_data, solid_index, chunk_data, v0, v2, v1, v0, v3, v2)
 
                 # Back Face
                 neighbor_id = get_voxel_id_at((x, y, z - 1), chunk_voxels)
@@ -352,14 +374,14 @@ def build_chunk_mesh(chunk_voxels, format_size, chunk_pos):
 
                     if voxel_id == 16:  # Water - transparent
                         if flip_id:
-                            transparent_index = add_data(transparent_data, transparent_index, v3, v0, v1, v3, v1, v2)
+                            transparent_index = add_data(transparent_data, transparent_index, chunk_data, v3, v0, v1, v3, v1, v2)
                         else:
-                            transparent_index = add_data(transparent_data, transparent_index, v0, v1, v2, v0, v2, v3)
+                            transparent_index = add_data(transparent_data, transparent_index, chunk_data, v0, v1, v2, v0, v2, v3)
                     else:  # Solid blocks
                         if flip_id:
-                            solid_index = add_data(solid_data, solid_index, v3, v0, v1, v3, v1, v2)
+                            solid_index = add_data(solid_data, solid_index, chunk_data, v3, v0, v1, v3, v1, v2)
                         else:
-                            solid_index = add_data(solid_data, solid_index, v0, v1, v2, v0, v2, v3)
+                            solid_index = add_data(solid_data, solid_index, chunk_data, v0, v1, v2, v0, v2, v3)
 
                 # Front Face
                 neighbor_id = get_voxel_id_at((x, y, z + 1), chunk_voxels)
@@ -375,14 +397,14 @@ def build_chunk_mesh(chunk_voxels, format_size, chunk_pos):
 
                     if voxel_id == 16:  # Water - transparent
                         if flip_id:
-                            transparent_index = add_data(transparent_data, transparent_index, v3, v1, v0, v3, v2, v1)
+                            transparent_index = add_data(transparent_data, transparent_index, chunk_data, v3, v1, v0, v3, v2, v1)
                         else:
-                            transparent_index = add_data(transparent_data, transparent_index, v0, v2, v1, v0, v3, v2)
+                            transparent_index = add_data(transparent_data, transparent_index, chunk_data, v0, v2, v1, v0, v3, v2)
                     else:  # Solid blocks
                         if flip_id:
-                            solid_index = add_data(solid_data, solid_index, v3, v1, v0, v3, v2, v1)
+                            solid_index = add_data(solid_data, solid_index, chunk_data, v3, v1, v0, v3, v2, v1)
                         else:
-                            solid_index = add_data(solid_data, solid_index, v0, v2, v1, v0, v3, v2)
+                            solid_index = add_data(solid_data, solid_index, chunk_data, v0, v2, v1, v0, v3, v2)
 
-    return solid_data[:solid_index + 1], transparent_data[:transparent_index + 1]
+    return solid_data[:solid_index], transparent_data[:transparent_index]
 
@@ -0,0 +1,76 @@
+from app.settings import *
+from .chunk_connectivity import is_see_through
+
+# Occluder boxes are found per column block of OCCLUDER_BLOCK x OCCLUDER_BLOCK voxels
+OCCLUDER_BLOCK = 8
+OCCLUDER_BLOCKS = CHUNK_SIZE // OCCLUDER_BLOCK
+
+# Thinner boxes are not worth rasterizing
+MIN_OCCLUDER_HEIGHT = 2
+
+
+@njit
+def is_layer_opaque(chunk_voxels, block_x, block_z, y):
+    """
+    Checks if one horizontal layer of a column block is completely opaque.
+
+    Args:
+        chunk_voxels: This chunk's voxel data
+        block_x, block_z: Column block coordinates inside the chunk
+        y: Local Y coordinate of the layer
+
+    Returns:
+        bool: True if no voxel in the layer is see-through
+    """
+    for x in range(block_x * OCCLUDER_BLOCK, (block_x + 1) * OCCLUDER_BLOCK):
+        for z in range(block_z * OCCLUDER_BLOCK, (block_z + 1) * OCCLUDER_BLOCK):
+            if is_see_through(chunk_voxels[x + CHUNK_SIZE * z + CHUNK_AREA * y]):
+                return False
+    return True
+
+
+@njit  # Numba JIT - runs on every mesh rebuild when the occlusion buffer is enabled
+def get_occluder_boxes(chunk_voxels, chunk_pos):
+    """
+    Finds coarse occluder boxes for a chunk: for every 8x8 column block, the tallest run of
+    completely opaque layers. Boxes are fully inside solid terrain, so they can only hide
+    geometry that is really hidden.
+
+    Args:
+        chunk_voxels: This chunk's voxel data (32*32*32 = 32768 uint8s)
+        chunk_pos: (cx, cy, cz) chunk position in world
+
+    Returns:
+        numpy.array: (N, 6) float32 array of world space boxes (min x, y, z, max x, y, z)
+    """
+
+    cx, cy, cz = chunk_pos
+    boxes = numpy.empty((OCCLUDER_BLOCKS * OCCLUDER_BLOCKS, 6), dtype=numpy.float32)
+    box_count = 0
+
+    for block_x in range(OCCLUDER_BLOCKS):
+        for block_z in range(OCCLUDER_BLOCKS):
+            best_start, best_end = 0, 0
+            run_start = 0
+
+            for y in range(CHUNK_SIZE + 1):
+                if y < CHUNK_SIZE and is_layer_opaque(chunk_voxels, block_x, block_z, y):
+                    continue
+
+                # Layer y ends the current run of opaque layers
+                if y - run_start > best_end - best_start:
+                    best_start, best_end = run_start, y
+                run_start = y + 1
+
+            if best_end - best_start < MIN_OCCLUDER_HEIGHT:
+                continue
+
+            boxes[box_count, 0] = cx * CHUNK_SIZE + block_x * OCCLUDER_BLOCK
+            boxes[box_count, 1] = cy * CHUNK_SIZE + best_start
+            boxes[box_count, 2] = cz * CHUNK_SIZE + block_z * OCCLUDER_BLOCK
+            boxes[box_count, 3] = cx * CHUNK_SIZE + (block_x + 1) * OCCLUDER_BLOCK
+            boxes[box_count, 4] = cy * CHUNK_SIZE + best_end
+            boxes[box_count, 5] = cz * CHUNK_SIZE + (block_z + 1) * OCCLUDER_BLOCK
+            box_count += 1
+
+    return boxes[:box_count].copy()
@@ -193,10 +193,11 @@ class Player(Camera):
 
         print(f"Scanning for ground from spawn position y={self.position.y}")
 
-        # Scan downward from spawn position to find solid ground
-        for y in range(int(self.position.y), -1, -1):
-            check_pos = glm.vec3(self.position.x, y, self.position.z)
-            if world.is_solid_voxel(check_pos):
+        # Scan downward from spawn position to find solid ground, the whole column in one query
+        column_heights = range(int(self.position.y), -1, -1)
+        column = numpy.array([(self.position.x, y, self.position.z) for y in column_heights], dtype=numpy.float32)
+        for y, is_solid in zip(column_heights, world.is_solid_many(column).tolist()):
+            if is_solid:
                 # Found solid block at y, place player's FEET on top at y+1
                 ground_y = y + 1
                 # Player position is at eye level, so add PLAYER_HEIGHT
@@ -252,16 +253,16 @@ class Player(Camera):
 
         ground_found = False
 
-        for dx, dz in check_offsets:
-            check_x = self.position.x + dx
-            check_z = self.position.z + dz
+        # Check just below feet, all points in one query
+        check_positions = numpy.array(
+            [(self.position.x + dx, feet_y - 0.1, self.position.z + dz) for dx, dz in check_offsets], dtype=numpy.float32
+        )
+        is_ground = world.is_solid_many(check_positions).tolist()
 
-            # Check just below feet
-            check_pos = glm.vec3(check_x, feet_y - 0.1, check_z)
-
-            if world.is_solid_voxel(check_pos):
+        for check_pos, is_solid in zip(check_positions, is_ground):
+            if is_solid:
                 # Found ground - calculate proper landing position
-                ground_y = int(glm.floor(check_pos.y)) + 1
+                ground_y = int(numpy.floor(check_pos[1])) + 1
 
                 # Only snap if we're falling and penetrating the ground
                 if self.velocity_y < 0 and feet_y < ground_y:
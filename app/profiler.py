@@ -0,0 +1,186 @@
+"""
+Frame profiler.
+
+Times the main phases of every frame on the CPU, collects the GPU pass times and the
+per-frame counters of the renderer, and keeps the last PROFILER_HISTORY frames to report
+frame time percentiles. The history can be written to a CSV file (F3 in game).
+"""
+
+import csv
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from app.settings import *
+
+# Phases timed on the CPU, in the order they run in a frame (also the CSV column order)
+PROFILER_PHASES = (
+    'handle_events',
+    'player_update',
+    'update_chunks',
+    'raycast',
+    'culling',
+    'solid_pass',
+    'transparent_pass',
+    'gui',
+    'flip',
+)
+
+# Per-frame values read from the renderer at the end of a frame
+PROFILER_COUNTERS = (
+    'gpu_prepass_ms',
+    'gpu_solid_ms',
+    'gpu_transparent_ms',
+    'draw_calls',
+    'vertices',
+    'chunks_culled',
+    'meshes_built',
+    'state_changes',
+    'state_changes_skipped',
+    'render_scale',
+    'arena_used_bytes',
+    'chunk_cache_bytes',
+    'render_distance',
+)
+
+
+class Profiler:
+    """
+    Collects the CPU phase times, GPU pass times and counters of each frame.
+
+    Phases are timed with `with app.profiler.phase(name):` blocks. Phases may contain
+    each other (their times then overlap), a phase that runs more than once in a frame
+    is summed. The GPU times come from the GpuTimers of the world passes, which are
+    read a frame late, because timer queries can't be nested inside a frame-wide one.
+
+    Attributes:
+        app: The game object
+        frames (deque): The last PROFILER_HISTORY frames, each a dict with the frame time,
+            the phase times and the counters
+        phase_times (dict): CPU time of each phase in the current frame, in milliseconds
+        frame_start (float): perf_counter() at the start of the current frame
+        built_mesh_count (int): World.built_mesh_count at the start of the current frame
+    """
+
+    def __init__(self, app):
+        """
+        Initializes a Profiler object.
+
+        Args:
+            app: The game object
+        """
+        self.app = app
+        self.frames = deque(maxlen=PROFILER_HISTORY)
+        self.phase_times = dict.fromkeys(PROFILER_PHASES, 0.0)
+        self.frame_start = time.perf_counter()
+        self.built_mesh_count = 0
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Times the code of a `with` block as a phase of the current frame.
+
+        Args:
+            name (str): Phase name, one of PROFILER_PHASES
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] += (time.perf_counter() - start_time) * 1000
+
+    def get_counters(self):
+        """
+        Reads the per-frame counters of the renderer.
+
+        Returns:
+            dict: Value of each counter in PROFILER_COUNTERS
+        """
+        world = self.app.scene.world
+        render_state = self.app.render_state
+        dynamic_resolution = self.app.dynamic_resolution
+        prepass_ms, solid_pass_ms = world.get_pass_times()
+
+        counters = {
+            'gpu_prepass_ms': prepass_ms,
+            'gpu_solid_ms': solid_pass_ms,
+            'gpu_transparent_ms': world.transparent_pass_timer.time_ms,
+            'draw_calls': world.draw_call_count,
+            'vertices': world.vertex_count,
+            'chunks_culled': world.culled_chunk_count,
+            'meshes_built': world.built_mesh_count - self.built_mesh_count,
+            'state_changes': render_state.change_count,
+            'state_changes_skipped': render_state.skipped_count,
+            'render_scale': dynamic_resolution.render_scale if dynamic_resolution else 1.0,
+            'arena_used_bytes': world.geometry_arena.used_bytes,
+            'chunk_cache_bytes': world.chunk_cache.size_bytes if world.chunk_cache else 0,
+            'render_distance': world.render_distance,
+        }
+        self.built_mesh_count = world.built_mesh_count
+        return counters
+
+    def end_frame(self):
+        """
+        Stores the current frame in the history and starts the next one.
+        Must be called before RenderState.end_frame(), which resets the state change counters.
+        """
+        frame_end = time.perf_counter()
+        frame = {'frame_ms': (frame_end - self.frame_start) * 1000}
+        frame.update(self.phase_times)
+        frame.update(self.get_counters())
+        self.frames.append(frame)
+
+        self.frame_start = frame_end
+        self.phase_times = dict.fromkeys(PROFILER_PHASES, 0.0)
+
+    def get_percentiles(self):
+        """
+        Computes the frame time percentiles over the history.
+
+        Returns:
+            tuple: (p50, p95, p99) frame time in milliseconds, zeros if there is no history
+        """
+        if not self.frames:
+            return 0.0, 0.0, 0.0
+        frame_times = numpy.array([frame['frame_ms'] for frame in self.frames])
+        return tuple(float(p) for p in numpy.percentile(frame_times, (50, 95, 99)))
+
+    def get_phase_averages(self):
+        """
+        Computes the average CPU time of each phase over the history.
+
+        Returns:
+            dict: Average milliseconds of each phase
+        """
+        if not self.frames:
+            return dict.fromkeys(PROFILER_PHASES, 0.0)
+        return {name: sum(frame[name] for frame in self.frames) / len(self.frames) for name in PROFILER_PHASES}
+
+    def print_report(self):
+        """
+        Prints the frame time percentiles and the average phase times.
+        """
+        p50, p95, p99 = self.get_percentiles()
+        print(f"Frame time over {len(self.frames)} frames: p50 {p50:.1f} ms | p95 {p95:.1f} ms | p99 {p99:.1f} ms")
+        print("Phases: " + " | ".join(f"{name} {ms:.2f}" for name, ms in self.get_phase_averages().items()))
+
+    def dump_csv(self):
+        """
+        Writes the frame history to logs/profile_TIMESTAMP.csv, one row per frame.
+
+        Returns:
+            Path: Path of the written file
+        """
+        log_dir = Path('logs')
+        log_dir.mkdir(exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        csv_file = log_dir / f'profile_{timestamp}.csv'
+
+        with open(csv_file, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=('frame_ms', *PROFILER_PHASES, *PROFILER_COUNTERS))
+            writer.writeheader()
+            writer.writerows(self.frames)
+
+        print(f"Profile of {len(self.frames)} frames written to {csv_file}")
+        return csv_file
@@ -1,3 +1,4 @@
+import os
 import random
 
 from numba import njit
@@ -10,9 +11,27 @@ WINDOW_WIDTH = 1600
 WINDOW_HEIGHT = 900
 WINDOW_RESOLUTION = glm.vec2(WINDOW_WIDTH, WINDOW_HEIGHT)
 
-# World generation
-SEED = random.randrange(1, 10000)
+# World saves: modified chunks are written to region files of REGION_SIZE x REGION_SIZE chunk columns
+# (set UCG_WORLD_DIR to use another save, or to an empty string to disable saving)
+WORLD_SAVE_DIR = os.environ.get('UCG_WORLD_DIR', 'saves/world')
+WORLD_SEED_FILE = f'{WORLD_SAVE_DIR}/seed.txt'
+REGION_SIZE = 16
+REGION_COMPRESSION_LEVEL = 6
+EDIT_LOG_FLUSH_INTERVAL = 1.0  # Seconds between fsyncs of the voxel edit log
+EDIT_LOG_COMPACT_INTERVAL = 60.0  # Seconds between saves of the modified chunks, which let the edit log be truncated
+
+# World generation (set UCG_SEED to generate the same world on every run, e.g. for benchmarks,
+# otherwise the seed of the world save is reused so its saved chunks match the terrain)
+if 'UCG_SEED' in os.environ:
+    SEED = int(os.environ['UCG_SEED'])
+elif WORLD_SAVE_DIR and os.path.exists(WORLD_SEED_FILE):
+    with open(WORLD_SEED_FILE) as seed_file:
+        SEED = int(seed_file.read())
+else:
+    SEED = random.randrange(1, 10000)
 print(SEED)
+RENDER_DISTANCE = int(os.environ.get('UCG_RENDER_DISTANCE', 16))  # Chunks loaded around the player
+CHUNK_UNLOAD_MARGIN = 2  # Chunks stay loaded up to this many chunks beyond the render distance
 
 # FPS
 MAX_FPS = 120
@@ -32,6 +51,87 @@ H_CHUNK_SIZE = CHUNK_SIZE // 2
 CHUNK_AREA = CHUNK_SIZE * CHUNK_SIZE
 CHUNK_VOL = CHUNK_AREA * CHUNK_SIZE
 CHUNK_SPHERE_RADIUS = H_CHUNK_SIZE * math.sqrt(3)
+CHUNK_POS_BIAS = 8192  # Added to the x and z chunk positions packed into the vertices (14 bits each), so negative positions fit
+
+# Culling
+CAVE_CULLING = True  # Skip chunks hidden behind terrain using chunk face connectivity
+CAVE_CULLING_INTERVAL = 0.1  # Seconds between recomputes for connectivity changes (loads, unloads, edits)
+SOFTWARE_OCCLUSION = False  # Test chunks against a low resolution CPU depth buffer
+OCCLUSION_BUFFER_WIDTH, OCCLUSION_BUFFER_HEIGHT = 256, 144
+OCCLUSION_MAX_OCCLUDER_CHUNKS = 64  # Nearest chunks whose occluder boxes are rasterized
+
+# Idle chunks: chunks whose voxels were not accessed for CHUNK_IDLE_TIME seconds are palette + RLE compressed
+CHUNK_IDLE_TIME = 10.0
+CHUNK_COMPRESS_INTERVAL = 0.25  # Seconds between searches for idle chunks
+CHUNK_COMPRESS_PER_UPDATE = 128  # Limits the time a search can take when many chunks become idle together
+
+# Chunk cache: recently unloaded chunks are kept compressed in RAM, so chunks coming back into range
+# are not generated and meshed again
+CHUNK_CACHE_SIZE = 64 * 2**20  # Bytes, the least recently unloaded chunks are dropped beyond it
+# Also keep their vertex data so they are not meshed again. The data is read back from the GPU when
+# a chunk unloads, which stalls the frame on the arena pages being drawn from, once per unloaded chunk
+CHUNK_CACHE_MESHES = False
+
+# Voxel store: the voxels of the chunks within VOXEL_STORE_RADIUS chunks of the player are kept
+# uncompressed in one pooled array, so physics and world lookups run in numba
+VOXEL_STORE_RADIUS = 3
+
+# Vertical streaming: a chunk column only loads the sections its terrain surface or sea level passes
+# through. Sky and deep rock sections load when the player gets within SECTION_LOAD_RADIUS chunks of
+# them, which also covers everything the voxel raycast can reach (MAX_RAY_DIST < CHUNK_SIZE)
+VERTICAL_STREAMING = True
+SECTION_LOAD_RADIUS = 1
+
+# Chunk residency: memory budgets of the loaded chunks. When one is exceeded, the view distance shrinks
+# and the least important chunks are unloaded; it grows back towards RENDER_DISTANCE when usage is
+# low enough that one more ring of chunks stays below RESIDENCY_GROW_FRACTION of every budget
+VOXEL_MEMORY_BUDGET = 256 * 2**20  # Voxels of the loaded chunks
+MESH_MEMORY_BUDGET = 32 * 2**20  # Vertex data kept in RAM by the chunk cache
+GPU_MEMORY_BUDGET = 512 * 2**20  # Chunk geometry in the buffer arena
+RESIDENCY_CHECK_INTERVAL = 0.5  # Seconds between budget checks
+RESIDENCY_GROW_FRACTION = 0.75
+MIN_RENDER_DISTANCE = 4  # The view distance never shrinks below this
+
+# Rendering
+DEPTH_PREPASS = False  # Draw solid chunks depth-only first, then shade only the visible fragments
+ARENA_PAGE_SIZE = 16 * 1024 * 1024  # Bytes per vertex buffer page that chunk meshes are sub-allocated from
+DRAW_MERGE_WINDOW = 8  # Solid chunks, in draw order, whose neighbouring ranges in a page may be merged into one draw (larger: fewer draws, coarser front-to-back order)
+
+# Sky
+SKY_PANORAMA_WIDTH, SKY_PANORAMA_HEIGHT = 512, 256  # Equirectangular texture the sky and clouds are baked into
+SKY_REFRESH_INTERVAL = 0.5  # Seconds between bakes of the sky panorama (clouds drift slowly)
+SKY_BAKE_BANDS = 4  # Each bake is spread over this many frames, one band of panorama rows per frame
+SKY_TEXTURE_UNIT = 2
+
+# Dynamic resolution
+DYNAMIC_RESOLUTION = False  # Render the 3D scene at a variable fraction of the window resolution
+DYNAMIC_RESOLUTION_TARGET_MS = 1000 / 60  # Frame time to hold (60 FPS)
+DYNAMIC_RESOLUTION_MIN_SCALE = 0.5
+DYNAMIC_RESOLUTION_SMOOTHING = 0.1  # Fraction of the correction applied per frame
+UPSCALE_TEXTURE_UNIT = 3
+
+# Profiler
+PROFILER_HISTORY = 600  # Frames kept for the frame time percentiles and the CSV dump (F3)
+
+# Performance HUD (F1)
+SHOW_PERFORMANCE_HUD = False
+PRINT_DEBUG_INFO = False  # Also print the debug info to the console (and log file) every 30 frames
+HUD_REFRESH_INTERVAL = 0.25  # Seconds between HUD updates, the vertex buffer is only rewritten when it changed
+HUD_MAX_QUADS = 4096
+HUD_GRAPH_FRAMES = 120  # Frames shown in the frame time graph
+HUD_GRAPH_BAR_WIDTH = 3  # Pixels per frame
+HUD_GRAPH_HEIGHT = 48
+HUD_GRAPH_MAX_MS = 50.0  # Frame time at the top of the graph
+HUD_GRAPH_TARGET_MS = 1000 / 60  # Frames above this line are drawn red
+HUD_TEXTURE_UNIT = 4
+
+# Shader quality presets: feature #defines compiled into the chunk shader (F2 cycles them in game)
+SHADER_QUALITY_PRESETS = {
+    'low': (),
+    'medium': ('GAMMA_CORRECTION', 'DISTANCE_FOG', 'WATER_FOG'),
+    'high': ('GAMMA_CORRECTION', 'DISTANCE_FOG', 'WATER_FOG', 'WATER_REFLECTIONS'),
+}
+SHADER_QUALITY = 'high'
 
 # World
 WORLD_WIDTH, WORLD_HEIGHT = 30, 5
@@ -51,6 +151,7 @@ H_FOV = 2 * math.atan(math.tan(V_FOV * 0.5) * ASPECT_RATIO)  # Horizontal FOV
 NEAR = 0.1
 FAR = 2000.0
 PITCH_MAX = glm.radians(89)
+CAMERA_UBO_BINDING = 0  # Uniform block binding of the shared camera matrices
 
 # Player
 PLAYER_SPEED = 0.005
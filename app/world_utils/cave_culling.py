@@ -0,0 +1,213 @@
+from app.settings import *
+from app.meshes.chunks.chunk_connectivity import FACE_COUNT, FULL_CONNECTIVITY, connects
+
+# Chunk offset for each face ID (0=top, 1=bottom, 2=right, 3=left, 4=back, 5=front)
+FACE_OFFSETS = numpy.array([
+    (0, 1, 0), (0, -1, 0),
+    (1, 0, 0), (-1, 0, 0),
+    (0, 0, -1), (0, 0, 1),
+], dtype=numpy.int64)
+
+
+@njit  # Numba JIT - runs every time the camera enters a new chunk
+def find_visible_chunks(connectivity_grid, start_x, start_y, start_z):
+    """
+    Breadth-first search from the camera chunk through the chunk face-connectivity graph
+    (Minecraft style "advanced cave culling").
+
+    A chunk is entered through one face and may only be left through a face that is
+    connected to it. The search never turns back towards the camera, so chunks that are
+    only reachable around a corner of solid terrain are not marked as visible.
+
+    Args:
+        connectivity_grid: (nx, ny, nz) int64 array of chunk connectivity bitmasks
+        start_x, start_y, start_z: Grid position of the camera chunk
+
+    Returns:
+        numpy.array: (nx, ny, nz) uint8 array, 1 for potentially visible chunks
+    """
+
+    nx, ny, nz = connectivity_grid.shape
+    visible = numpy.zeros((nx, ny, nz), dtype=numpy.uint8)
+
+    # Queue entries: x, y, z, entry face (-1 for the camera chunk), travelled directions mask
+    queue = numpy.empty((nx * ny * nz, 5), dtype=numpy.int64)
+    queue[0, 0] = start_x
+    queue[0, 1] = start_y
+    queue[0, 2] = start_z
+    queue[0, 3] = -1
+    queue[0, 4] = 0
+    visible[start_x, start_y, start_z] = 1
+    head, tail = 0, 1
+
+    while head < tail:
+        x = queue[head, 0]
+        y = queue[head, 1]
+        z = queue[head, 2]
+        entry_face = queue[head, 3]
+        directions = queue[head, 4]
+        head += 1
+        connectivity = connectivity_grid[x, y, z]
+
+        for face in range(FACE_COUNT):
+            # Never travel back towards the camera (face ^ 1 is the opposite face)
+            if directions & (1 << (face ^ 1)):
+                continue
+
+            if entry_face >= 0 and not connects(connectivity, entry_face, face):
+                continue
+
+            next_x = x + FACE_OFFSETS[face, 0]
+            next_y = y + FACE_OFFSETS[face, 1]
+            next_z = z + FACE_OFFSETS[face, 2]
+
+            if not (0 <= next_x < nx and 0 <= next_y < ny and 0 <= next_z < nz):
+                continue
+            if visible[next_x, next_y, next_z]:
+                continue
+
+            visible[next_x, next_y, next_z] = 1
+            queue[tail, 0] = next_x
+            queue[tail, 1] = next_y
+            queue[tail, 2] = next_z
+            queue[tail, 3] = face ^ 1
+            queue[tail, 4] = directions | (1 << face)
+            tail += 1
+
+    return visible
+
+
+class CaveCuller:
+    """
+    Keeps the set of potentially visible chunks around the camera.
+
+    The set only depends on the camera chunk and on the connectivity of the loaded chunks,
+    so it is recomputed when the camera enters a new chunk or when a chunk inside the grid
+    changes its connectivity (loads, unloads, VoxelHandler edits). Connectivity changes are
+    collected and applied at most every CAVE_CULLING_INTERVAL seconds, so streaming a strip
+    of chunks does not rerun the search for each of them.
+
+    Attributes:
+        app: The game object
+        world: World object that owns the chunks
+        visible_grid (numpy.array): (size, WORLD_HEIGHT, size) booleans, True for the chunks
+            around the camera that may be visible, None before the first update
+        grid_origin (tuple): Chunk (x, z) of the grid cell (0, 0)
+        camera_chunk (tuple): Camera chunk the grid was computed for
+        is_dirty (bool): Flag indicating that the visible set has to be recomputed
+        next_update_time (float): Game time before which connectivity changes are not applied
+    """
+
+    def __init__(self, world):
+        """
+        Initializes a CaveCuller object for the given world.
+
+        Args:
+            world: World object
+        """
+        self.app = world.app
+        self.world = world
+        self.visible_grid = None
+        self.grid_origin = (0, 0)
+        self.camera_chunk = None
+        self.is_dirty = True
+        self.next_update_time = 0.0
+
+    def mark_dirty(self):
+        """
+        Requests a recompute of the visible set on the next update.
+        """
+        self.is_dirty = True
+
+    def on_connectivity_changed(self, chunk_pos, old_connectivity, new_connectivity):
+        """
+        Called when a chunk is meshed, rebuilt or unloaded. Chunks outside the last grid
+        are ignored, the grid is rebuilt around them when the camera gets near.
+
+        Args:
+            chunk_pos (tuple): Chunk position (x, y, z)
+            old_connectivity: Previous connectivity bitmask of the chunk
+            new_connectivity: New connectivity bitmask of the chunk
+        """
+        if old_connectivity == new_connectivity:
+            return
+
+        if self.visible_grid is not None:
+            size = self.visible_grid.shape[0]
+            gx, gz = chunk_pos[0] - self.grid_origin[0], chunk_pos[2] - self.grid_origin[1]
+            if not (0 <= gx < size and 0 <= gz < size):
+                return
+        self.is_dirty = True
+
+    def get_camera_chunk(self):
+        """
+        Returns the chunk position of the camera, clamped to the world height.
+
+        Returns:
+            tuple: (cx, cy, cz) chunk coordinates
+        """
+        position = self.app.player.position
+        cx = int(position.x // CHUNK_SIZE)
+        cy = min(max(int(position.y // CHUNK_SIZE), 0), WORLD_HEIGHT - 1)
+        cz = int(position.z // CHUNK_SIZE)
+        return cx, cy, cz
+
+    def update(self):
+        """
+        Recomputes the visible set if the camera changed chunk, or if the connectivity changed
+        and CAVE_CULLING_INTERVAL has passed since the last recompute.
+        """
+        camera_chunk = self.get_camera_chunk()
+        if camera_chunk == self.camera_chunk and (not self.is_dirty or self.app.time < self.next_update_time):
+            return
+
+        self.camera_chunk = camera_chunk
+        self.is_dirty = False
+        self.next_update_time = self.app.time + CAVE_CULLING_INTERVAL
+
+        # Dense grid of connectivity around the camera, unloaded chunks are fully connected
+        radius = self.world.render_distance + CHUNK_UNLOAD_MARGIN
+        size = 2 * radius + 1
+        origin_x = camera_chunk[0] - radius
+        origin_z = camera_chunk[2] - radius
+
+        connectivity_grid = numpy.full((size, WORLD_HEIGHT, size), FULL_CONNECTIVITY, dtype=numpy.int64)
+
+        # Except the rock below the surface sections, which vertical streaming does not load
+        column_bottoms = self.world.column_bottoms
+        if column_bottoms:
+            columns = numpy.array(list(column_bottoms), dtype=numpy.int64) - (origin_x, origin_z)
+            bottoms = numpy.fromiter(column_bottoms.values(), dtype=numpy.int64, count=len(column_bottoms))
+            inside = (columns[:, 0] >= 0) & (columns[:, 0] < size) & (columns[:, 1] >= 0) & (columns[:, 1] < size)
+            columns, bottoms = columns[inside], bottoms[inside]
+            column_index, buried_y = numpy.nonzero(numpy.arange(WORLD_HEIGHT) < bottoms[:, None])
+            connectivity_grid[columns[column_index, 0], buried_y, columns[column_index, 1]] = 0
+
+        registry = self.world.chunk_registry
+        slots = registry.get_active_slots()
+        gx, gy, gz = (registry.positions[slots] - (origin_x, 0, origin_z)).T
+        inside = (gx >= 0) & (gx < size) & (gz >= 0) & (gz < size)
+        connectivity_grid[gx[inside], gy[inside], gz[inside]] = registry.face_connectivity[slots[inside]]
+
+        self.visible_grid = find_visible_chunks(connectivity_grid, radius, camera_chunk[1], radius)
+        self.grid_origin = (origin_x, origin_z)
+
+    def get_visible_mask(self, positions):
+        """
+        Checks many chunks against the potentially visible set at once.
+
+        Args:
+            positions (numpy.array): (N, 3) chunk positions
+
+        Returns:
+            numpy.array: N booleans, True for the chunks that may be visible from the camera chunk
+        """
+        visible = numpy.zeros(len(positions), dtype=numpy.bool_)
+        if self.visible_grid is None:
+            return visible
+
+        size = self.visible_grid.shape[0]
+        gx, gy, gz = (positions - (self.grid_origin[0], 0, self.grid_origin[1])).T
+        inside = (gx >= 0) & (gx < size) & (gz >= 0) & (gz < size)
+        visible[inside] = self.visible_grid[gx[inside], gy[inside], gz[inside]]
+        return visible
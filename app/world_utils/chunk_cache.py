@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from app.meshes.chunks.chunk_compression import get_compressed_size
+
+
+class CachedChunk:
+    """
+    What is kept of an unloaded chunk to load it again without generating and meshing it.
+
+    Attributes:
+        compressed_voxels (tuple): Palette and runs of the voxels (see compress_voxels)
+        vertex_data (tuple): (solid, transparent) vertex arrays of the mesh, None if meshes are not cached
+        face_connectivity (int): Face connectivity bitmask of the chunk
+        occluder_boxes (numpy.array): Occluder boxes of the chunk
+        is_empty (bool): Flag indicating if the chunk is empty
+        vertex_bytes (int): Memory used by the vertex data
+        size_bytes (int): Memory used by the entry
+    """
+
+    def __init__(self, compressed_voxels, vertex_data, face_connectivity, occluder_boxes, is_empty):
+        """
+        Initializes a CachedChunk object.
+
+        Args:
+            compressed_voxels (tuple): Palette and runs of the voxels
+            vertex_data (tuple): (solid, transparent) vertex arrays, or None
+            face_connectivity (int): Face connectivity bitmask
+            occluder_boxes (numpy.array): Occluder boxes
+            is_empty (bool): Flag indicating if the chunk is empty
+        """
+        self.compressed_voxels = compressed_voxels
+        self.vertex_data = vertex_data
+        self.face_connectivity = face_connectivity
+        self.occluder_boxes = occluder_boxes
+        self.is_empty = is_empty
+
+        self.vertex_bytes = sum(data.nbytes for data in vertex_data) if vertex_data is not None else 0
+        self.size_bytes = get_compressed_size(compressed_voxels) + occluder_boxes.nbytes + self.vertex_bytes
+
+    def drop_vertex_data(self):
+        """
+        Frees the vertex data, the chunk is meshed again when it is loaded.
+        """
+        self.size_bytes -= self.vertex_bytes
+        self.vertex_data = None
+        self.vertex_bytes = 0
+
+
+class ChunkCache:
+    """
+    Byte-bounded LRU cache of recently unloaded chunks.
+
+    Players moving back and forth along the edge of the render distance unload and load the
+    same chunks over and over; with the cache, loading them again skips terrain generation,
+    and with CHUNK_CACHE_MESHES also meshing, which leaves a buffer upload.
+
+    Attributes:
+        max_bytes (int): Memory limit of the cache
+        entries (OrderedDict): Chunk position -> CachedChunk, least recently unloaded first
+        size_bytes (int): Memory used by the entries
+        vertex_bytes (int): Memory used by the vertex data of the entries
+        hit_count (int): Loads served by the cache
+        miss_count (int): Loads that were not in the cache
+    """
+
+    def __init__(self, max_bytes):
+        """
+        Initializes a ChunkCache object.
+
+        Args:
+            max_bytes (int): Memory limit of the cache
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size_bytes = 0
+        self.vertex_bytes = 0
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def put(self, chunk_pos, cached_chunk):
+        """
+        Adds an unloaded chunk, evicting the least recently unloaded chunks to stay in the limit.
+
+        Args:
+            chunk_pos (tuple): Chunk position (x, y, z)
+            cached_chunk (CachedChunk): The chunk
+        """
+        self.discard(chunk_pos)
+        self.entries[chunk_pos] = cached_chunk
+        self.size_bytes += cached_chunk.size_bytes
+        self.vertex_bytes += cached_chunk.vertex_bytes
+
+        while self.size_bytes > self.max_bytes and self.entries:
+            _, evicted_chunk = self.entries.popitem(last=False)
+            self.size_bytes -= evicted_chunk.size_bytes
+            self.vertex_bytes -= evicted_chunk.vertex_bytes
+
+    def take(self, chunk_pos):
+        """
+        Removes a chunk from the cache to load it.
+
+        Args:
+            chunk_pos (tuple): Chunk position (x, y, z)
+
+        Returns:
+            CachedChunk: The chunk, or None if it is not in the cache
+        """
+        cached_chunk = self.entries.pop(chunk_pos, None)
+        if cached_chunk is None:
+            self.miss_count += 1
+            return None
+
+        self.hit_count += 1
+        self.size_bytes -= cached_chunk.size_bytes
+        self.vertex_bytes -= cached_chunk.vertex_bytes
+        return cached_chunk
+
+    def discard(self, chunk_pos):
+        """
+        Removes a chunk from the cache if it is in it.
+
+        Args:
+            chunk_pos (tuple): Chunk position (x, y, z)
+        """
+        cached_chunk = self.entries.pop(chunk_pos, None)
+        if cached_chunk is not None:
+            self.size_bytes -= cached_chunk.size_bytes
+            self.vertex_bytes -= cached_chunk.vertex_bytes
+
+    def trim_vertex_data(self, max_bytes):
+        """
+        Drops the vertex data of the least recently unloaded chunks until the cached vertex
+        data fits in the given size. Their compressed voxels stay cached.
+
+        Args:
+            max_bytes (int): Memory limit of the cached vertex data
+        """
+        for cached_chunk in self.entries.values():
+            if self.vertex_bytes <= max_bytes:
+                return
+            self.size_bytes -= cached_chunk.vertex_bytes
+            self.vertex_bytes -= cached_chunk.vertex_bytes
+            cached_chunk.drop_vertex_data()
+
+    def get_hit_rate(self):
+        """
+        Returns the fraction of loads served by the cache.
+
+        Returns:
+            float: Hit rate between 0 and 1
+        """
+        load_count = self.hit_count + self.miss_count
+        return self.hit_count / load_count if load_count else 0.0
@@ -0,0 +1,183 @@
+from app.settings import *
+from app.meshes.chunks.chunk_connectivity import FULL_CONNECTIVITY
+
+# Chunk flags
+CHUNK_EMPTY = 1  # No voxels
+CHUNK_HAS_SOLID = 2  # Mesh has solid geometry
+CHUNK_HAS_WATER = 4  # Mesh has transparent geometry
+CHUNK_MODIFIED = 8  # Voxels edited since the chunk was generated or saved
+CHUNK_POOLED = 16  # Voxels live in the world's VoxelStore
+
+REGISTRY_INITIAL_CAPACITY = 1024
+
+
+class ChunkRegistry:
+    """
+    Structure-of-arrays view of the loaded chunks, so the per-frame passes (culling, draw
+    order, unload scans, the cave culling grid) run as numpy operations over all chunks
+    instead of visiting one Chunk object after another.
+
+    Each loaded chunk owns a slot, which indexes every array. Slots of unloaded chunks are
+    reused; the arrays double in size when they are full, so they must not be kept across
+    calls that can load chunks.
+
+    Attributes:
+        capacity (int): Number of slots in the arrays
+        chunks (numpy.array): Chunk object of each slot, None for free slots
+        is_active (numpy.array): True for the slots of loaded chunks
+        positions (numpy.array): (capacity, 3) int32 chunk positions
+        centers (numpy.array): (capacity, 3) float32 world positions of the chunk centers
+        flags (numpy.array): uint8 CHUNK_* flags
+        face_connectivity (numpy.array): int64 face connectivity bitmasks, for cave culling
+        last_visible_times (numpy.array): float64 game times the chunks last passed culling
+        solid_counts (numpy.array): int32 number of solid vertices in the arena
+        transparent_counts (numpy.array): int32 number of transparent vertices in the arena
+        free_slots (list): Unused slots below the highest used one
+        count (int): Number of loaded chunks
+    """
+
+    def __init__(self, capacity=REGISTRY_INITIAL_CAPACITY):
+        """
+        Initializes an empty ChunkRegistry.
+
+        Args:
+            capacity (int): Initial number of slots
+        """
+        self.capacity = 0
+        self.chunks = numpy.empty(0, dtype=object)
+        self.is_active = numpy.zeros(0, dtype=numpy.bool_)
+        self.positions = numpy.zeros((0, 3), dtype=numpy.int32)
+        self.centers = numpy.zeros((0, 3), dtype=numpy.float32)
+        self.flags = numpy.zeros(0, dtype=numpy.uint8)
+        self.face_connectivity = numpy.zeros(0, dtype=numpy.int64)
+        self.last_visible_times = numpy.zeros(0, dtype=numpy.float64)
+        self.solid_counts = numpy.zeros(0, dtype=numpy.int32)
+        self.transparent_counts = numpy.zeros(0, dtype=numpy.int32)
+        self.free_slots = []
+        self.count = 0
+        self.grow(capacity)
+
+    def grow(self, capacity):
+        """
+        Enlarges every array to the given number of slots.
+
+        Args:
+            capacity (int): New number of slots
+        """
+        def enlarge(array):
+            enlarged = numpy.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            enlarged[:self.capacity] = array
+            return enlarged
+
+        self.chunks = enlarge(self.chunks)
+        self.is_active = enlarge(self.is_active)
+        self.positions = enlarge(self.positions)
+        self.centers = enlarge(self.centers)
+        self.flags = enlarge(self.flags)
+        self.face_connectivity = enlarge(self.face_connectivity)
+        self.last_visible_times = enlarge(self.last_visible_times)
+        self.solid_counts = enlarge(self.solid_counts)
+        self.transparent_counts = enlarge(self.transparent_counts)
+        self.free_slots = list(range(capacity - 1, self.capacity - 1, -1)) + self.free_slots
+        self.capacity = capacity
+
+    def add(self, chunk):
+        """
+        Gives a new chunk a slot. The chunk starts empty, fully connected and without geometry.
+
+        Args:
+            chunk: The chunk
+
+        Returns:
+            int: Slot of the chunk
+        """
+        if not self.free_slots:
+            self.grow(self.capacity * 2)
+        slot = self.free_slots.pop()
+
+        self.chunks[slot] = chunk
+        self.is_active[slot] = True
+        self.positions[slot] = chunk.position
+        self.centers[slot] = (numpy.array(chunk.position, dtype=numpy.float32) + 0.5) * CHUNK_SIZE
+        self.flags[slot] = CHUNK_EMPTY
+        self.face_connectivity[slot] = FULL_CONNECTIVITY
+        self.last_visible_times[slot] = 0.0
+        self.solid_counts[slot] = 0
+        self.transparent_counts[slot] = 0
+        self.count += 1
+        return slot
+
+    def remove(self, slot):
+        """
+        Frees the slot of an unloaded chunk.
+
+        Args:
+            slot (int): Slot of the chunk
+        """
+        self.chunks[slot] = None
+        self.is_active[slot] = False
+        self.flags[slot] = 0
+        self.free_slots.append(slot)
+        self.count -= 1
+
+    def has_flag(self, slot, flag):
+        """
+        Checks a flag of one chunk.
+
+        Args:
+            slot (int): Slot of the chunk
+            flag (int): CHUNK_* flag
+
+        Returns:
+            bool: True if the flag is set
+        """
+        return bool(self.flags[slot] & flag)
+
+    def set_flag(self, slot, flag, value):
+        """
+        Sets or clears a flag of one chunk.
+
+        Args:
+            slot (int): Slot of the chunk
+            flag (int): CHUNK_* flag
+            value (bool): True to set the flag
+        """
+        if value:
+            self.flags[slot] |= flag
+        else:
+            self.flags[slot] &= ~numpy.uint8(flag)
+
+    def get_active_slots(self):
+        """
+        Returns the slots of the loaded chunks.
+
+        Returns:
+            numpy.array: Slot indices
+        """
+        return numpy.flatnonzero(self.is_active)
+
+    def get_flagged_slots(self, flags):
+        """
+        Returns the slots of the chunks that have any of the given flags.
+
+        Args:
+            flags (int): CHUNK_* flags combined with |
+
+        Returns:
+            numpy.array: Slot indices
+        """
+        return numpy.flatnonzero(self.flags & flags)
+
+    def get_distances2(self, slots, position):
+        """
+        Computes the squared distances from a world position to the centers of chunks.
+
+        Args:
+            slots (numpy.array): Slots of the chunks
+            position (glm.vec3): World position
+
+        Returns:
+            numpy.array: float32 squared distances
+        """
+        offsets = self.centers[slots] - numpy.array(position, dtype=numpy.float32)
+        return numpy.einsum('ij,ij->i', offsets, offsets)
@@ -0,0 +1,55 @@
+"""
+Column offset tables for streaming chunks around the player.
+
+The chunks within a view distance of the player form a disk of chunk columns. Instead of
+scanning the square around the player and measuring the distance of every column each time
+the player enters a new chunk, the offsets of the disk are computed once per view distance,
+sorted by distance so the nearest columns are loaded first. When the player moves, only the
+strips of columns that enter and leave the disk are visited, so the cost grows with the
+distance moved instead of with the view distance.
+"""
+
+import functools
+from app.settings import *
+
+
+@functools.lru_cache(maxsize=16)
+def get_ring_offsets(radius):
+    """
+    Returns the column offsets within a distance of the center.
+
+    Args:
+        radius (int): Distance in chunks
+
+    Returns:
+        tuple: (dx, dz) offsets with dx² + dz² <= radius², nearest first
+    """
+    span = numpy.arange(-radius, radius + 1)
+    dx, dz = (axis.ravel() for axis in numpy.meshgrid(span, span, indexing='ij'))
+    distances2 = dx * dx + dz * dz
+    is_inside = distances2 <= radius * radius
+    dx, dz, distances2 = dx[is_inside], dz[is_inside], distances2[is_inside]
+
+    order = numpy.argsort(distances2, kind='stable')
+    return tuple(zip(dx[order].tolist(), dz[order].tolist()))
+
+
+@functools.lru_cache(maxsize=64)
+def get_strip_offsets(radius, dx, dz):
+    """
+    Returns the column offsets within a distance of the center that are outside the same
+    distance of another center. Moving the center from one chunk to the next makes the
+    columns of one strip enter the disk and the columns of the opposite strip leave it.
+
+    Args:
+        radius (int): Distance in chunks
+        dx, dz (int): Offset of the other center
+
+    Returns:
+        tuple: (dx, dz) offsets from the center, nearest first
+    """
+    radius2 = radius * radius
+    return tuple(
+        (ox, oz) for ox, oz in get_ring_offsets(radius)
+        if (ox - dx) ** 2 + (oz - dz) ** 2 > radius2
+    )
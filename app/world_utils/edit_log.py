@@ -0,0 +1,207 @@
+import os
+import struct
+import threading
+from app.settings import *
+from .region_store import sync_directory
+
+# One record per voxel edit: world position, old voxel ID, new voxel ID
+EDIT_RECORD = struct.Struct('<3iBB')
+
+
+class EditLog:
+    """
+    Append-only journal of voxel edits, so edits survive a crash between chunk saves.
+
+    Edits are recorded on the main thread into a batch. A background thread appends the
+    batch to the current segment file and fsyncs it every EDIT_LOG_FLUSH_INTERVAL seconds.
+
+    The log is split into numbered segments (edits.N.log). Compaction starts a new segment
+    after the world queued its modified chunks in the region store; once the region store
+    has written them, the older segments are no longer needed and are deleted.
+
+    Attributes:
+        directory (str): Directory of the world save
+        segment (int): Number of the segment the next edits go to
+        compacted_segment (int): Segments below this number are covered by the region store
+        batch (list): Records and segment switches (None) not written yet
+        lock: Guards batch and compacted_segment, which are shared with the flush thread
+        stop_event: Set to stop the flush thread
+        flusher: The flush thread
+        record_count (int): Number of edits recorded since the log was opened
+    """
+
+    def __init__(self, directory):
+        """
+        Initializes an EditLog object and starts the flush thread. New edits go to a new
+        segment, the segments of a previous session are kept until they are compacted.
+
+        Args:
+            directory (str): Directory of the world save
+        """
+        self.directory = directory
+        segments = self.get_segments()
+        self.segment = segments[-1] + 1 if segments else 0
+        self.compacted_segment = 0
+        self.batch = []
+        self.lock = threading.Lock()
+        self.record_count = 0
+
+        self.stop_event = threading.Event()
+        self.flusher = threading.Thread(
+            target=self.flush_periodically, args=(self.segment,), name='EditLogFlusher', daemon=True
+        )
+        self.flusher.start()
+
+    def get_segment_path(self, segment):
+        """
+        Returns the path of a log segment.
+
+        Args:
+            segment (int): Segment number
+
+        Returns:
+            str: Path of the segment file
+        """
+        return f'{self.directory}/edits.{segment}.log'
+
+    def get_segments(self):
+        """
+        Lists the segment files in the save directory.
+
+        Returns:
+            list: Segment numbers, in ascending order
+        """
+        segments = []
+        for file_name in os.listdir(self.directory):
+            parts = file_name.split('.')
+            if len(parts) == 3 and parts[0] == 'edits' and parts[2] == 'log' and parts[1].isdigit():
+                segments.append(int(parts[1]))
+        return sorted(segments)
+
+    def read_edits(self):
+        """
+        Reads the edits of the existing segments, i.e. the edits of a previous session that
+        were not compacted, e.g. because the game crashed.
+
+        Returns:
+            dict: Chunk position -> list of (voxel index, new voxel ID), in edit order
+        """
+        edits = {}
+        for segment in self.get_segments():
+            if segment >= self.segment:
+                continue
+            with open(self.get_segment_path(segment), 'rb') as file:
+                data = file.read()
+
+            # A record cut off by the crash is ignored
+            usable_size = len(data) - len(data) % EDIT_RECORD.size
+            for wx, wy, wz, old_id, new_id in EDIT_RECORD.iter_unpack(data[:usable_size]):
+                chunk_pos = (wx // CHUNK_SIZE, wy // CHUNK_SIZE, wz // CHUNK_SIZE)
+                lx, ly, lz = wx % CHUNK_SIZE, wy % CHUNK_SIZE, wz % CHUNK_SIZE
+                voxel_index = lx + CHUNK_SIZE * lz + CHUNK_AREA * ly
+                edits.setdefault(chunk_pos, []).append((voxel_index, new_id))
+        return edits
+
+    def record(self, world_pos, old_id, new_id):
+        """
+        Records a voxel edit. Returns immediately, the edit is written by the flush thread.
+
+        Args:
+            world_pos: World position of the voxel
+            old_id (int): Voxel ID before the edit
+            new_id (int): Voxel ID after the edit
+        """
+        wx, wy, wz = (int(value) for value in world_pos)
+        with self.lock:
+            self.batch.append(EDIT_RECORD.pack(wx, wy, wz, int(old_id), int(new_id)))
+        self.record_count += 1
+
+    def start_segment(self):
+        """
+        Starts a new segment. Called when the world queues its modified chunks for saving:
+        all edits in the earlier segments are covered by those chunk writes.
+
+        Returns:
+            int: Number of the new segment
+        """
+        self.segment += 1
+        with self.lock:
+            self.batch.append(None)
+        return self.segment
+
+    def set_compacted(self, segment):
+        """
+        Marks the segments below the given one as written to the region store, so they
+        are deleted on the next flush. Called from the region store's writer thread.
+
+        Args:
+            segment (int): First segment that is still needed
+        """
+        with self.lock:
+            self.compacted_segment = max(self.compacted_segment, segment)
+
+    def flush(self, file, segment):
+        """
+        Writes the batch to the segment files, fsyncs them and deletes compacted segments.
+        Runs on the flush thread.
+
+        Args:
+            file: Open file of the current segment, or None
+            segment (int): Number of the current segment
+
+        Returns:
+            tuple: (open file of the current segment or None, number of the current segment)
+        """
+        with self.lock:
+            batch, self.batch = self.batch, []
+            compacted_segment = self.compacted_segment
+
+        for entry in batch:
+            if entry is None:
+                # Segment switch: the previous segment is complete
+                if file:
+                    file.flush()
+                    os.fsync(file.fileno())
+                    file.close()
+                    file = None
+                segment += 1
+                continue
+            if file is None:
+                path = self.get_segment_path(segment)
+                is_new_file = not os.path.exists(path)
+                file = open(path, 'ab')
+                if is_new_file:
+                    sync_directory(self.directory)
+            file.write(entry)
+
+        if file:
+            file.flush()
+            os.fsync(file.fileno())
+
+        for old_segment in self.get_segments():
+            if old_segment < min(compacted_segment, segment):
+                os.remove(self.get_segment_path(old_segment))
+
+        return file, segment
+
+    def flush_periodically(self, segment):
+        """
+        Flush thread: flushes the batch every EDIT_LOG_FLUSH_INTERVAL seconds until stopped.
+
+        Args:
+            segment (int): Number of the first segment
+        """
+        file = None
+        while not self.stop_event.wait(EDIT_LOG_FLUSH_INTERVAL):
+            file, segment = self.flush(file, segment)
+
+        file, segment = self.flush(file, segment)
+        if file:
+            file.close()
+
+    def close(self):
+        """
+        Flushes the remaining edits and stops the flush thread.
+        """
+        self.stop_event.set()
+        self.flusher.join()
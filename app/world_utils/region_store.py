@@ -0,0 +1,410 @@
+import bisect
+import os
+import queue
+import struct
+import threading
+import zlib
+from app.settings import *
+
+# Region file layout: magic, then an offset table with one (offset, length) entry per chunk
+# slot, then the zlib compressed voxel arrays of the stored chunks
+REGION_MAGIC = b'UCGREG01'
+REGION_AREA = REGION_SIZE * REGION_SIZE
+REGION_SLOTS = REGION_AREA * WORLD_HEIGHT
+REGION_ENTRY = struct.Struct('<2I')
+REGION_HEADER_SIZE = len(REGION_MAGIC) + REGION_SLOTS * REGION_ENTRY.size
+
+
+def sync_directory(directory):
+    """
+    Makes the files created in a directory survive a power loss. Does nothing on systems
+    where directories can't be opened (Windows).
+
+    Args:
+        directory (str): Path of the directory
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def get_region_slot(chunk_pos):
+    """
+    Finds the region file and the slot of its offset table that store a chunk.
+
+    Args:
+        chunk_pos (tuple): Chunk position (x, y, z)
+
+    Returns:
+        tuple: ((region x, region z), slot index)
+    """
+    cx, cy, cz = chunk_pos
+    region = (cx // REGION_SIZE, cz // REGION_SIZE)
+    slot = cx % REGION_SIZE + REGION_SIZE * (cz % REGION_SIZE) + REGION_AREA * cy
+    return region, slot
+
+
+class RegionStore:
+    """
+    Stores modified chunks in region files of REGION_SIZE x REGION_SIZE chunk columns.
+
+    Each chunk is compressed separately and located through the offset table at the start
+    of its region file. A rewritten chunk is written into free space, and its table entry only
+    switches to the new data once it is written, so the table never points at partly written
+    data. The space of the previous data is only reused once the new table entry is on disk,
+    so after a crash the table still points at one complete version of each chunk. The free
+    space of a region is rebuilt from its offset table when the region is first read.
+
+    Saving never blocks the caller: the voxels are handed to a background thread that
+    compresses and writes them. Until a write has finished, the chunk is kept in the
+    pending writes, and loading it returns the pending voxels.
+
+    The world seed is saved with the regions, because the stored chunks only match the
+    terrain generated from the same seed.
+
+    Attributes:
+        directory (str): Directory of the save
+        is_enabled (bool): False if the save belongs to another seed, loads and saves are then skipped
+        tables (dict): Offset table (REGION_SLOTS x 2 uint32 array) of each region read so far,
+            None for regions without a file
+        free_spaces (dict): Sorted (offset, length) byte ranges of each region file that no
+            table entry points at
+        region_ends (dict): Offset of each region file after its last stored chunk, where data
+            that fits in no free space is appended
+        pending (dict): Chunk position -> voxels waiting to be written
+        lock: Guards tables and pending, which are shared with the writer thread
+        write_queue: Chunk positions to write and callbacks to call, None stops the writer thread
+        writer: The writer thread
+        saved_count (int): Number of chunks written
+    """
+
+    def __init__(self, directory, seed):
+        """
+        Initializes a RegionStore object and starts the writer thread.
+
+        Args:
+            directory (str): Directory of the save, created if it doesn't exist
+            seed (int): Seed of the world
+        """
+        self.directory = directory
+        self.is_enabled = self.check_seed(seed)
+        self.tables = {}
+        self.free_spaces = {}
+        self.region_ends = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.write_queue = queue.Queue()
+        self.saved_count = 0
+
+        self.writer = threading.Thread(target=self.write_pending_chunks, name='RegionWriter', daemon=True)
+        self.writer.start()
+
+    def check_seed(self, seed):
+        """
+        Saves the seed in a new save, or checks that it matches the seed of an existing one.
+
+        Args:
+            seed (int): Seed of the world
+
+        Returns:
+            bool: True if the save can be used with the seed
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        seed_path = f'{self.directory}/{os.path.basename(WORLD_SEED_FILE)}'
+
+        if not os.path.exists(seed_path):
+            with open(seed_path, 'w') as file:
+                file.write(str(seed))
+            return True
+
+        with open(seed_path) as file:
+            saved_seed = int(file.read())
+        if saved_seed != seed:
+            print(f"World save {self.directory} was generated with seed {saved_seed}, not {seed}: "
+                  f"chunks will not be loaded or saved")
+            return False
+        return True
+
+    def get_region_path(self, region):
+        """
+        Returns the path of a region file.
+
+        Args:
+            region (tuple): Region position (x, z)
+
+        Returns:
+            str: Path of the region file
+        """
+        return f'{self.directory}/r.{region[0]}.{region[1]}.region'
+
+    def get_table(self, region):
+        """
+        Returns the offset table of a region, reading it from the file the first time.
+        Must be called with the lock held.
+
+        Args:
+            region (tuple): Region position (x, z)
+
+        Returns:
+            numpy.array: (REGION_SLOTS, 2) uint32 array of (offset, length), or None if the
+            region has no file
+        """
+        if region not in self.tables:
+            table = None
+            path = self.get_region_path(region)
+            if os.path.exists(path):
+                with open(path, 'rb') as file:
+                    header = file.read(REGION_HEADER_SIZE)
+                if header[:len(REGION_MAGIC)] == REGION_MAGIC and len(header) == REGION_HEADER_SIZE:
+                    table = numpy.frombuffer(header, dtype='<u4', offset=len(REGION_MAGIC))
+                    table = table.reshape(REGION_SLOTS, 2).copy()
+                    self.init_free_space(region, table)
+                else:
+                    print(f"Ignoring invalid region file {path}")
+            self.tables[region] = table
+        return self.tables[region]
+
+    def init_free_space(self, region, table):
+        """
+        Rebuilds the free space of a region from its offset table: the gaps between the stored
+        chunks are free, and new data is appended after the last one. Must be called with the lock held.
+
+        Args:
+            region (tuple): Region position (x, z)
+            table (numpy.array): Offset table of the region
+        """
+        stored = table[table[:, 1] > 0].astype(numpy.int64)
+        stored = stored[numpy.argsort(stored[:, 0], kind='stable')]
+
+        free_spaces, end = [], REGION_HEADER_SIZE
+        for offset, length in stored.tolist():
+            if offset > end:
+                free_spaces.append((end, offset - end))
+            end = max(end, offset + length)
+        self.free_spaces[region] = free_spaces
+        self.region_ends[region] = end
+
+    def allocate_space(self, region, length):
+        """
+        Finds the first free space of a region file that fits, or space at its end.
+        Must be called with the lock held.
+
+        Args:
+            region (tuple): Region position (x, z)
+            length (int): Number of bytes
+
+        Returns:
+            int: Offset of the allocated space
+        """
+        free_spaces = self.free_spaces[region]
+        for i, (offset, size) in enumerate(free_spaces):
+            if size < length:
+                continue
+            if size == length:
+                del free_spaces[i]
+            else:
+                free_spaces[i] = (offset + length, size - length)
+            return offset
+
+        offset = self.region_ends[region]
+        self.region_ends[region] += length
+        return offset
+
+    def free_space(self, region, offset, length):
+        """
+        Returns space of a region file that no table entry points at any more, merging it with
+        its free neighbours. Must be called with the lock held.
+
+        Args:
+            region (tuple): Region position (x, z)
+            offset (int): Offset of the space
+            length (int): Number of bytes
+        """
+        free_spaces = self.free_spaces[region]
+        i = bisect.bisect_left(free_spaces, (offset, length))
+
+        # Merge with the next free space
+        if i < len(free_spaces) and free_spaces[i][0] == offset + length:
+            length += free_spaces[i][1]
+            del free_spaces[i]
+
+        # Merge with the previous free space
+        if i > 0 and sum(free_spaces[i - 1]) == offset:
+            i -= 1
+            offset, length = free_spaces[i][0], free_spaces[i][1] + length
+            del free_spaces[i]
+
+        # Space at the end of the file is appended to again
+        if offset + length == self.region_ends[region]:
+            self.region_ends[region] = offset
+        else:
+            free_spaces.insert(i, (offset, length))
+
+    def load_chunk(self, chunk_pos):
+        """
+        Loads the voxels of a saved chunk.
+
+        Args:
+            chunk_pos (tuple): Chunk position (x, y, z)
+
+        Returns:
+            numpy.array: CHUNK_VOL uint8 voxels, or None if the chunk was never saved or its
+            data is corrupt
+        """
+        if not self.is_enabled:
+            return None
+
+        region, slot = get_region_slot(chunk_pos)
+        with self.lock:
+            if chunk_pos in self.pending:
+                return self.pending[chunk_pos].copy()
+            table = self.get_table(region)
+            if table is None:
+                return None
+            offset, length = table[slot]
+            if length == 0:
+                return None
+
+            # Read with the lock held, the writer may reuse the space once the chunk is saved again
+            with open(self.get_region_path(region), 'rb') as file:
+                file.seek(int(offset))
+                data = file.read(int(length))
+
+        try:
+            voxels = numpy.frombuffer(zlib.decompress(data), dtype=numpy.uint8)
+        except zlib.error:
+            voxels = None
+        if voxels is None or len(voxels) != CHUNK_VOL:
+            print(f"Ignoring corrupt chunk {chunk_pos} in {self.get_region_path(region)}, it is generated again")
+            return None
+        return voxels.copy()
+
+    def has_chunk(self, chunk_pos):
+        """
+        Checks if a chunk was saved, without reading it.
+
+        Args:
+            chunk_pos (tuple): Chunk position (x, y, z)
+
+        Returns:
+            bool: True if the chunk is stored or waiting to be written
+        """
+        if not self.is_enabled:
+            return False
+
+        region, slot = get_region_slot(chunk_pos)
+        with self.lock:
+            if chunk_pos in self.pending:
+                return True
+            table = self.get_table(region)
+            return table is not None and table[slot][1] != 0
+
+    def save_chunk(self, chunk_pos, voxels):
+        """
+        Queues the voxels of a chunk for writing. Returns immediately.
+
+        Args:
+            chunk_pos (tuple): Chunk position (x, y, z)
+            voxels (numpy.array): Voxels of the chunk, must not be modified afterwards
+        """
+        if not self.is_enabled:
+            return
+
+        with self.lock:
+            self.pending[chunk_pos] = voxels
+        self.write_queue.put(chunk_pos)
+
+    def write_pending_chunks(self):
+        """
+        Writer thread: writes the queued chunks until None is queued.
+        A chunk saved several times before it was written is only written once, with its latest voxels.
+        """
+        while True:
+            chunk_pos = self.write_queue.get()
+            if chunk_pos is None:
+                return
+            if callable(chunk_pos):
+                chunk_pos()
+                continue
+
+            with self.lock:
+                voxels = self.pending.get(chunk_pos)
+            if voxels is None:
+                continue
+
+            self.write_chunk(chunk_pos, voxels)
+
+            with self.lock:
+                # A newer save of the chunk stays pending for its own queue entry
+                if self.pending.get(chunk_pos) is voxels:
+                    del self.pending[chunk_pos]
+
+    def call_when_written(self, callback):
+        """
+        Calls a function on the writer thread once every chunk saved before has been written.
+
+        Args:
+            callback: Function without arguments
+        """
+        self.write_queue.put(callback)
+
+    def write_chunk(self, chunk_pos, voxels):
+        """
+        Compresses a chunk and writes it into its region file. Runs on the writer thread.
+        The chunk is on disk when this returns, so the callbacks queued after it (e.g. the
+        deletion of the edit log segments it covers) can rely on it.
+
+        Args:
+            chunk_pos (tuple): Chunk position (x, y, z)
+            voxels (numpy.array): Voxels of the chunk
+        """
+        region, slot = get_region_slot(chunk_pos)
+        path = self.get_region_path(region)
+        data = zlib.compress(voxels.tobytes(), REGION_COMPRESSION_LEVEL)
+
+        with self.lock:
+            table = self.get_table(region)
+            if table is None:
+                table = numpy.zeros((REGION_SLOTS, 2), dtype=numpy.uint32)
+                with open(path, 'wb') as file:
+                    file.write(REGION_MAGIC)
+                    file.write(table.tobytes())
+                    file.flush()
+                    os.fsync(file.fileno())
+                sync_directory(self.directory)
+                self.tables[region] = table
+                self.init_free_space(region, table)
+
+            # Free space, the old data stays valid until the table entry is switched to the new data
+            offset = self.allocate_space(region, len(data))
+            old_offset, old_length = (int(value) for value in table[slot])
+
+        with open(path, 'r+b') as file:
+            file.seek(offset)
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+
+            file.seek(len(REGION_MAGIC) + slot * REGION_ENTRY.size)
+            file.write(REGION_ENTRY.pack(offset, len(data)))
+            file.flush()
+            os.fsync(file.fileno())
+
+        with self.lock:
+            table[slot] = (offset, len(data))
+            # The table entry on disk points at the new data, the old data can be overwritten
+            if old_length:
+                self.free_space(region, old_offset, old_length)
+        self.saved_count += 1
+
+    def close(self):
+        """
+        Writes the remaining queued chunks and stops the writer thread.
+        """
+        self.write_queue.put(None)
+        self.writer.join()
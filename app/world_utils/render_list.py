@@ -0,0 +1,93 @@
+from app.settings import *
+
+
+class RenderList:
+    """
+    Persistent list of the chunks that have geometry for one render pass.
+
+    Chunks are added and removed when their meshes are built, rebuilt or unloaded,
+    so a render pass only visits chunks that have something to draw. The draw order
+    is kept sorted by distance to the camera and is re-sorted incrementally.
+
+    Attributes:
+        registry (ChunkRegistry): Registry holding the chunk centers
+        chunks (dict): Dictionary mapping chunk positions (x,y,z) to Chunk instances
+        order (list): Chunks in draw order, valid after the last call to sort()
+        reverse (bool): True to draw far chunks first (back-to-front)
+        is_dirty (bool): Flag indicating that chunks were added or removed since the last sort
+    """
+
+    def __init__(self, registry, reverse=False):
+        """
+        Initializes an empty RenderList.
+
+        Args:
+            registry (ChunkRegistry): Registry holding the chunk centers
+            reverse (bool): True for back-to-front order, False for front-to-back
+        """
+        self.registry = registry
+        self.chunks = {}
+        self.order = []
+        self.reverse = reverse
+        self.is_dirty = False
+
+    def update(self, chunk, has_geometry):
+        """
+        Adds or removes a chunk depending on whether it has geometry for this pass.
+
+        Args:
+            chunk: The chunk that was meshed
+            has_geometry (bool): True if the chunk has something to draw in this pass
+        """
+        if not has_geometry:
+            self.remove(chunk)
+        elif chunk.position not in self.chunks:
+            self.chunks[chunk.position] = chunk
+            self.order.append(chunk)
+            self.is_dirty = True
+
+    def remove(self, chunk):
+        """
+        Removes a chunk from the list if it is in it. The chunk stays in the draw order
+        until the next sort.
+
+        Args:
+            chunk: The chunk to remove
+        """
+        if self.chunks.pop(chunk.position, None) is not None:
+            self.is_dirty = True
+
+    def sort(self, camera_pos):
+        """
+        Re-sorts the draw order by distance to the camera.
+
+        The distances are computed for all chunks at once from the registry's center array.
+        The previous order is sorted again rather than rebuilt, it is already nearly sorted
+        after a small camera move, which the stable sort (Timsort) handles in close to linear time.
+
+        Args:
+            camera_pos (glm.vec3): Position of the camera
+        """
+        if self.is_dirty:
+            # A chunk removed and added again since the last sort has two entries, keep the first
+            order, positions = [], set()
+            for chunk in self.order:
+                if self.chunks.get(chunk.position) is chunk and chunk.position not in positions:
+                    positions.add(chunk.position)
+                    order.append(chunk)
+            self.order = order
+            self.is_dirty = False
+
+        slots = numpy.fromiter((chunk.slot for chunk in self.order), dtype=numpy.int64, count=len(self.order))
+        distances2 = self.registry.get_distances2(slots, camera_pos)
+        draw_order = numpy.argsort(-distances2 if self.reverse else distances2, kind='stable')
+        self.order = [self.order[i] for i in draw_order.tolist()]
+
+    def __contains__(self, chunk):
+        return chunk.position in self.chunks
+
+    def __iter__(self):
+        return iter(self.chunks.values())
+
+    def __len__(self):
+        return len(self.chunks)
@@ -0,0 +1,153 @@
+from app.settings import *
+from .chunk_registry import CHUNK_MODIFIED
+
+
+class ResidencyManager:
+    """
+    Keeps the memory used by the chunks within VOXEL_MEMORY_BUDGET, MESH_MEMORY_BUDGET and
+    GPU_MEMORY_BUDGET by adjusting the effective view distance of the world.
+
+    When the voxels or the arena geometry of the loaded chunks exceed their budget, chunks are
+    unloaded in priority order: farthest ring first, then the chunks that have not been visible
+    for the longest time, then clean chunks before modified ones (which have to be saved). The
+    view distance shrinks below the nearest unloaded ring so those chunks are not loaded again.
+    When there is room for another ring of chunks, the view distance grows back one ring at a
+    time, up to RENDER_DISTANCE.
+
+    The vertex data kept in RAM by the chunk cache is trimmed to its budget directly.
+
+    Attributes:
+        app: The game object
+        world: World whose chunks are managed
+        next_check_time (float): Game time of the next budget check
+        voxel_bytes (int): Memory used by the voxels of the loaded chunks at the last check
+        mesh_bytes (int): Memory used by the vertex data in the chunk cache at the last check
+        gpu_bytes (int): Arena memory used by the chunk geometry at the last check
+        evicted_count (int): Number of chunks unloaded to stay within the budgets
+    """
+
+    def __init__(self, world):
+        """
+        Initializes a ResidencyManager object.
+
+        Args:
+            world: World whose chunks are managed
+        """
+        self.app = world.app
+        self.world = world
+        self.next_check_time = 0.0
+        self.voxel_bytes = 0
+        self.mesh_bytes = 0
+        self.gpu_bytes = 0
+        self.evicted_count = 0
+
+    def measure(self):
+        """
+        Measures the memory used by the chunks.
+        """
+        chunk_cache = self.world.chunk_cache
+        self.voxel_bytes = self.world.get_voxel_memory()[0]
+        self.mesh_bytes = chunk_cache.vertex_bytes if chunk_cache else 0
+        self.gpu_bytes = self.world.geometry_arena.used_bytes
+
+    def is_over_budget(self):
+        """
+        Checks the last measurement against the budgets that unloading chunks can satisfy.
+
+        Returns:
+            bool: True if the voxels or the geometry use more than their budget
+        """
+        return self.voxel_bytes > VOXEL_MEMORY_BUDGET or self.gpu_bytes > GPU_MEMORY_BUDGET
+
+    def update(self):
+        """
+        Checks the budgets every RESIDENCY_CHECK_INTERVAL seconds, then shrinks or grows the view distance.
+        """
+        if self.app.time < self.next_check_time:
+            return
+        self.next_check_time = self.app.time + RESIDENCY_CHECK_INTERVAL
+
+        chunk_cache = self.world.chunk_cache
+        if chunk_cache and chunk_cache.vertex_bytes > MESH_MEMORY_BUDGET:
+            chunk_cache.trim_vertex_data(MESH_MEMORY_BUDGET)
+
+        self.measure()
+        if self.is_over_budget():
+            self.evict()
+        else:
+            self.grow()
+
+    def get_eviction_order(self):
+        """
+        Sorts the loaded chunks outside MIN_RENDER_DISTANCE by how expendable they are.
+
+        Returns:
+            list: (ring, chunk) pairs, the chunk to unload first comes first. The ring is the
+            smallest view distance the chunk is loaded at.
+        """
+        player_pos = self.app.player.position
+        player_chunk = (int(player_pos.x // CHUNK_SIZE), int(player_pos.z // CHUNK_SIZE))
+
+        registry = self.world.chunk_registry
+        slots = registry.get_active_slots()
+        offsets = registry.positions[slots][:, ::2] - player_chunk
+        rings = numpy.ceil(numpy.hypot(offsets[:, 0], offsets[:, 1])).astype(numpy.int64)
+        is_candidate = rings > MIN_RENDER_DISTANCE
+        slots, rings = slots[is_candidate], rings[is_candidate]
+
+        # lexsort sorts by the last key first
+        is_modified = (registry.flags[slots] & CHUNK_MODIFIED) != 0
+        order = numpy.lexsort((is_modified, registry.last_visible_times[slots], -rings))
+        return list(zip(rings[order].tolist(), registry.chunks[slots[order]].tolist()))
+
+    def evict(self):
+        """
+        Unloads chunks until the voxels and the geometry fit in their budgets, and shrinks the
+        view distance below the nearest ring that was unloaded.
+        """
+        excess_voxel_bytes = self.voxel_bytes - VOXEL_MEMORY_BUDGET
+        excess_gpu_bytes = self.gpu_bytes - GPU_MEMORY_BUDGET
+        render_distance = self.world.render_distance
+
+        for ring, chunk in self.get_eviction_order():
+            if excess_voxel_bytes <= 0 and excess_gpu_bytes <= 0:
+                break
+            excess_voxel_bytes -= chunk.get_voxel_memory()
+            excess_gpu_bytes -= chunk.mesh.get_size_bytes()
+            self.world.unload_chunk(*chunk.position)
+            render_distance = min(render_distance, ring - 1)
+            self.evicted_count += 1
+
+        self.set_render_distance(render_distance)
+
+    def grow(self):
+        """
+        Grows the view distance by one ring if the chunks would still use less than
+        RESIDENCY_GROW_FRACTION of every budget.
+        """
+        render_distance = self.world.render_distance
+        if render_distance >= RENDER_DISTANCE:
+            return
+
+        # The number of loaded chunks grows with the area of the view circle
+        scale = ((render_distance + 1) / render_distance) ** 2
+        budgets = ((self.voxel_bytes, VOXEL_MEMORY_BUDGET), (self.gpu_bytes, GPU_MEMORY_BUDGET))
+        if all(used_bytes * scale <= budget * RESIDENCY_GROW_FRACTION for used_bytes, budget in budgets):
+            self.set_render_distance(render_distance + 1)
+
+    def set_render_distance(self, render_distance):
+        """
+        Changes the view distance of the world. The chunks are loaded and unloaded for it
+        on the next chunk update.
+
+        Args:
+            render_distance (int): New view distance in chunks
+        """
+        if render_distance == self.world.render_distance:
+            return
+
+        if render_distance < self.world.render_distance:
+            print(f"Chunk memory budget exceeded: view distance reduced to {render_distance} chunks")
+        self.world.render_distance = render_distance
+        self.world.last_player_chunk = None
+        self.world.cave_culler.is_dirty = True
@@ -4,6 +4,22 @@ from app.settings import *
 from app.blocks import block_type
 
 
+@njit
+def seed_chunk_random(seed, cx, cy, cz):
+    """
+    Seeds the random generator that places ores and trees from the world seed and the
+    position of a chunk, so a chunk always generates the same, whatever order the chunks
+    are generated in.
+
+    Args:
+        seed (int): World seed
+        cx, cy, cz (int): World position of the chunk's origin
+    """
+    # Large odd multipliers give neighbouring chunks unrelated seeds
+    chunk_hash = seed * 73856093 ^ cx * 19349663 ^ cy * 83492791 ^ cz * 50331653
+    random.seed(chunk_hash & 0x7FFFFFFF)
+
+
 @njit
 def get_height(x, z):
     """
@@ -48,6 +64,27 @@ def get_height(x, z):
     return int(base_height)
 
 
+@njit  # Numba JIT - runs for every chunk column that comes into range
+def get_height_range(wx, wz):
+    """
+    Finds the lowest and highest terrain height of a chunk column.
+
+    Args:
+        wx (int): X-coordinate of the column's first voxel
+        wz (int): Z-coordinate of the column's first voxel
+
+    Returns:
+        tuple: (min height, max height) of the column
+    """
+    min_height, max_height = get_height(wx, wz), get_height(wx, wz)
+    for x in range(wx, wx + CHUNK_SIZE):
+        for z in range(wz, wz + CHUNK_SIZE):
+            height = get_height(x, z)
+            min_height = min(min_height, height)
+            max_height = max(max_height, height)
+    return min_height, max_height
+
+
 @njit
 def get_index(x, y, z):
     """
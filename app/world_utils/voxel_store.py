@@ -0,0 +1,199 @@
+from app.settings import *
+from .chunk_registry import CHUNK_POOLED
+
+
+@njit  # Numba JIT - called for every voxel lookup of the physics and the world
+def get_store_voxel(grid, grid_columns, pool, x, y, z):
+    """
+    Looks up a voxel in the voxel store.
+
+    Args:
+        grid: (size, WORLD_HEIGHT, size) int32 pool rows of the grid cells, -1 for empty cells
+        grid_columns: (size, size, 2) int64 chunk (x, z) each grid column holds
+        pool: (rows, CHUNK_VOL) uint8 voxels
+        x, y, z (int): World position of the voxel
+
+    Returns:
+        int: Voxel ID, 0 above and below the world, -1 if the chunk is not in the store
+    """
+    if y < 0 or y >= WORLD_HEIGHT * CHUNK_SIZE:
+        return 0
+
+    cx, cy, cz = x // CHUNK_SIZE, y // CHUNK_SIZE, z // CHUNK_SIZE
+    size = grid.shape[0]
+    gx, gz = cx % size, cz % size
+    if grid_columns[gx, gz, 0] != cx or grid_columns[gx, gz, 1] != cz:
+        return -1
+
+    row = grid[gx, cy, gz]
+    if row < 0:
+        return -1
+    return pool[row, x % CHUNK_SIZE + CHUNK_SIZE * (z % CHUNK_SIZE) + CHUNK_AREA * (y % CHUNK_SIZE)]
+
+
+@njit  # Numba JIT - batch lookups for collision probes, column scans and entities
+def get_store_voxels(grid, grid_columns, pool, positions, voxel_ids):
+    """
+    Looks up many voxels in the voxel store.
+
+    Args:
+        grid, grid_columns, pool: Voxel store arrays (see get_store_voxel)
+        positions: (N, 3) world positions, rounded down to the voxel they are in
+        voxel_ids: (N,) int16 output, -1 where the chunk is not in the store
+    """
+    for i in range(positions.shape[0]):
+        voxel_ids[i] = get_store_voxel(
+            grid, grid_columns, pool,
+            int(math.floor(positions[i, 0])), int(math.floor(positions[i, 1])), int(math.floor(positions[i, 2]))
+        )
+
+
+class VoxelStore:
+    """
+    Uncompressed voxels of the chunks around the player in one pooled array, so voxel lookups
+    run in numba functions instead of going through the chunk dictionary.
+
+    The store covers the chunk columns within VOXEL_STORE_RADIUS chunks of the player. Its grid
+    is toroidal: chunk column (cx, cz) lives in grid column (cx % size, cz % size), so when the
+    player moves only the columns that enter and leave the covered area change. Each grid cell
+    owns a fixed row of the pool. While a chunk is in the store, its voxels are a view of its
+    pool row, so edits go straight into the store, and the chunk is not compressed.
+
+    Lookups outside the covered area fall back to the chunk dictionary.
+
+    Attributes:
+        world: World the chunks belong to
+        size (int): Number of grid columns along x and z
+        grid (numpy.array): (size, WORLD_HEIGHT, size) int32 pool rows, -1 for empty cells
+        grid_columns (numpy.array): (size, size, 2) int64 chunk (x, z) each grid column holds
+        pool (numpy.array): (size * WORLD_HEIGHT * size, CHUNK_VOL) uint8 voxels
+        center (tuple): Chunk (x, z) of the player the store was filled for, None before the first update
+    """
+
+    def __init__(self, world):
+        """
+        Initializes an empty VoxelStore.
+
+        Args:
+            world: World the chunks belong to
+        """
+        self.world = world
+        self.size = 2 * VOXEL_STORE_RADIUS + 1
+        self.grid = numpy.full((self.size, WORLD_HEIGHT, self.size), -1, dtype=numpy.int32)
+        self.grid_columns = numpy.zeros((self.size, self.size, 2), dtype=numpy.int64)
+        self.pool = numpy.zeros((self.size * WORLD_HEIGHT * self.size, CHUNK_VOL), dtype=numpy.uint8)
+        self.center = None
+
+    def is_covered(self, chunk_pos):
+        """
+        Checks if a chunk is in the area covered by the store.
+
+        Args:
+            chunk_pos (tuple): Chunk position (x, y, z)
+
+        Returns:
+            bool: True if the chunk belongs in the store
+        """
+        if self.center is None:
+            return False
+        cx, cy, cz = chunk_pos
+        return abs(cx - self.center[0]) <= VOXEL_STORE_RADIUS and abs(cz - self.center[1]) <= VOXEL_STORE_RADIUS
+
+    def get_cell(self, chunk_pos):
+        """
+        Returns the grid cell of a chunk.
+
+        Args:
+            chunk_pos (tuple): Chunk position (x, y, z)
+
+        Returns:
+            tuple: (grid x, y, grid z)
+        """
+        cx, cy, cz = chunk_pos
+        return cx % self.size, cy, cz % self.size
+
+    def add(self, chunk):
+        """
+        Moves the voxels of a loaded chunk into the store if the chunk is in the covered area.
+
+        Args:
+            chunk: The chunk
+        """
+        if not self.is_covered(chunk.position) or chunk.registry.has_flag(chunk.slot, CHUNK_POOLED):
+            return
+
+        gx, gy, gz = self.get_cell(chunk.position)
+        row = (gx * WORLD_HEIGHT + gy) * self.size + gz
+        self.pool[row] = chunk.voxels
+        chunk.voxels = self.pool[row]
+        chunk.registry.set_flag(chunk.slot, CHUNK_POOLED, True)
+
+        self.grid[gx, gy, gz] = row
+        self.grid_columns[gx, gz] = (chunk.position[0], chunk.position[2])
+
+    def remove(self, chunk):
+        """
+        Gives a chunk its own copy of its voxels and frees its cell. Called when the chunk
+        leaves the covered area or is unloaded.
+
+        Args:
+            chunk: The chunk
+        """
+        if not chunk.registry.has_flag(chunk.slot, CHUNK_POOLED):
+            return
+
+        gx, gy, gz = self.get_cell(chunk.position)
+        chunk.registry.set_flag(chunk.slot, CHUNK_POOLED, False)
+        chunk.voxels = self.pool[self.grid[gx, gy, gz]].copy()
+        self.grid[gx, gy, gz] = -1
+
+    def update(self, player_chunk):
+        """
+        Moves the covered area to the player: the chunks that left it get their voxels
+        back, the loaded chunks that entered it are added.
+
+        Args:
+            player_chunk (tuple): Chunk (x, z) of the player
+        """
+        if player_chunk == self.center:
+            return
+        self.center = player_chunk
+
+        registry = self.world.chunk_registry
+        for chunk in registry.chunks[registry.get_flagged_slots(CHUNK_POOLED)].tolist():
+            if not self.is_covered(chunk.position):
+                self.remove(chunk)
+
+        px, pz = player_chunk
+        for cx in range(px - VOXEL_STORE_RADIUS, px + VOXEL_STORE_RADIUS + 1):
+            for cz in range(pz - VOXEL_STORE_RADIUS, pz + VOXEL_STORE_RADIUS + 1):
+                for cy in range(WORLD_HEIGHT):
+                    chunk = self.world.chunks.get((cx, cy, cz))
+                    if chunk:
+                        self.add(chunk)
+
+    def get_voxel(self, x, y, z):
+        """
+        Looks up one voxel.
+
+        Args:
+            x, y, z (int): World position of the voxel
+
+        Returns:
+            int: Voxel ID, -1 if its chunk is not in the store
+        """
+        return get_store_voxel(self.grid, self.grid_columns, self.pool, x, y, z)
+
+    def get_voxels(self, positions):
+        """
+        Looks up many voxels.
+
+        Args:
+            positions (numpy.array): (N, 3) world positions, rounded down to the voxel they are in
+
+        Returns:
+            numpy.array: (N,) int16 voxel IDs, -1 where the chunk is not in the store
+        """
+        voxel_ids = numpy.empty(len(positions), dtype=numpy.int16)
+        get_store_voxels(self.grid, self.grid_columns, self.pool, positions, voxel_ids)
+        return voxel_ids
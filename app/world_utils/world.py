@@ -1,6 +1,22 @@
 from app.settings import *
+import functools
+import moderngl
 from app.meshes.chunks.chunk import Chunk
 from app.graphics.voxel_handler import VoxelHandler
+from app.meshes.chunks.chunk_connectivity import FULL_CONNECTIVITY
+from app.graphics.occlusion_buffer import OcclusionBuffer
+from app.graphics.buffer_arena import BufferArena
+from app.graphics.gpu_timer import GpuTimer
+from .cave_culling import CaveCuller
+from .terrain_gen import get_height_range
+from .render_list import RenderList
+from .region_store import RegionStore
+from .edit_log import EditLog
+from .chunk_cache import ChunkCache, CachedChunk
+from .residency_manager import ResidencyManager
+from .chunk_registry import ChunkRegistry, CHUNK_HAS_SOLID, CHUNK_HAS_WATER
+from .voxel_store import VoxelStore
+from .chunk_rings import get_ring_offsets, get_strip_offsets
 
 class World:
     """
@@ -10,8 +26,38 @@ class World:
     Attributes:
         app: Main game instance
         chunks (dict): Dictionary mapping chunk positions (x,y,z) to Chunk instances
+        chunk_registry (ChunkRegistry): Arrays of per-chunk data for the vectorized per-frame passes
+        voxel_store (VoxelStore): Pooled voxels of the chunks around the player, for fast voxel lookups
+        solid_chunks (RenderList): Loaded chunks that have solid geometry, drawn front-to-back
+        transparent_chunks (RenderList): Loaded chunks that have transparent geometry (water), drawn back-to-front
+        draw_order_chunk (tuple): Camera chunk the render lists were last sorted for
+        geometry_arena (BufferArena): Large vertex buffers that chunk meshes are sub-allocated from
         voxel_handler (VoxelHandler): Instance of VoxelHandler for handling voxel interactions
-        render_distance: How many chunks to render around the player
+        cave_culler (CaveCuller): Keeps the set of chunks that are not hidden behind terrain
+        occlusion_buffer (OcclusionBuffer): CPU depth buffer for culling chunks behind terrain
+        visible_chunk_count (int): Number of chunks that passed culling in the last frame
+        culled_chunk_count (int): Number of chunks with geometry that were culled in the last frame
+        built_mesh_count (int): Number of chunk meshes built or rebuilt since the world was created
+        draw_call_count (int): Number of chunk draw calls in the last frame
+        vertex_count (int): Number of chunk vertices drawn in the last frame
+        depth_prepass_timer (GpuTimer): GPU time of the depth pre-pass
+        solid_pass_timer (GpuTimer): GPU time of the solid shading pass
+        transparent_pass_timer (GpuTimer): GPU time of the transparent (water) pass
+        region_store (RegionStore): Saved chunks, None if WORLD_SAVE_DIR is empty
+        edit_log (EditLog): Journal of the voxel edits since the modified chunks were last saved,
+            None if there is no usable world save
+        chunk_cache (ChunkCache): Recently unloaded chunks, None if CHUNK_CACHE_SIZE is 0
+        next_compaction_time (float): Game time of the next save of the modified chunks
+        next_compress_time (float): Game time of the next search for idle chunks to compress
+        render_distance: How many chunks to render around the player, lowered by the residency manager
+            when the chunks exceed their memory budgets
+        residency_manager (ResidencyManager): Keeps the chunks within their memory budgets
+        last_player_chunk (tuple): Chunk (x, z) of the player at the last chunk update, None to
+            load and unload every chunk on the next update
+        last_player_section (tuple): Chunk (x, y, z) of the player the sections around the player
+            were last loaded for
+        column_bottoms (dict): Chunk (x, z) of each loaded column -> lowest surface section; with
+            VERTICAL_STREAMING the sections below it are solid rock, loaded or not
     """
 
     def __init__(self, app):
@@ -24,9 +70,38 @@ class World:
 
         self.app = app
         self.chunks = {}  # Dictionary for infinite world
+        self.chunk_registry = ChunkRegistry()
+        self.voxel_store = VoxelStore(self)
+        self.solid_chunks = RenderList(self.chunk_registry)
+        self.transparent_chunks = RenderList(self.chunk_registry, reverse=True)
+        self.draw_order_chunk = None
+        self.geometry_arena = BufferArena(
+            self.app, vbo_format='1u4 1u4', attrs=('packed_data', 'chunk_data'), vertex_size=8
+        )
         self.voxel_handler = VoxelHandler(self)
-        self.render_distance = 16  # Load chunks within 16 chunks of player (512 blocks)
+        self.cave_culler = CaveCuller(self)
+        self.occlusion_buffer = OcclusionBuffer(self.app)
+        self.visible_chunk_count = 0
+        self.culled_chunk_count = 0
+        self.built_mesh_count = 0
+        self.draw_call_count = 0
+        self.vertex_count = 0
+        self.depth_prepass_timer = GpuTimer(self.app.ctx)
+        self.solid_pass_timer = GpuTimer(self.app.ctx)
+        self.transparent_pass_timer = GpuTimer(self.app.ctx)
+        self.region_store = RegionStore(WORLD_SAVE_DIR, SEED) if WORLD_SAVE_DIR else None
+        self.edit_log = None
+        if self.region_store and self.region_store.is_enabled:
+            self.edit_log = EditLog(WORLD_SAVE_DIR)
+            self.replay_edit_log()
+        self.chunk_cache = ChunkCache(CHUNK_CACHE_SIZE) if CHUNK_CACHE_SIZE else None
+        self.next_compaction_time = EDIT_LOG_COMPACT_INTERVAL
+        self.next_compress_time = CHUNK_IDLE_TIME
+        self.render_distance = RENDER_DISTANCE  # Load chunks within RENDER_DISTANCE chunks of the player
+        self.residency_manager = ResidencyManager(self)
         self.last_player_chunk = None
+        self.last_player_section = None
+        self.column_bottoms = {}
 
         # Build initial chunks around spawn
         self.build_initial_chunks()
@@ -39,13 +114,56 @@ class World:
         spawn_chunk_z = int(PLAYER_POS.z // CHUNK_SIZE)
 
         for x in range(spawn_chunk_x - self.render_distance, spawn_chunk_x + self.render_distance):
-            for y in range(WORLD_HEIGHT):
-                for z in range(spawn_chunk_z - self.render_distance, spawn_chunk_z + self.render_distance):
-                    self.load_chunk(x, y, z)
+            for z in range(spawn_chunk_z - self.render_distance, spawn_chunk_z + self.render_distance):
+                self.load_column(x, z)
+
+    def replay_edit_log(self):
+        """
+        Applies the edits a previous session logged but did not save (e.g. because it crashed)
+        to the saved chunks, then compacts the log.
+        """
+        edits = self.edit_log.read_edits()
+        if not edits:
+            return
+
+        for chunk_pos, chunk_edits in edits.items():
+            voxels = self.region_store.load_chunk(chunk_pos)
+            if voxels is None:
+                chunk = Chunk(self, position=chunk_pos)
+                voxels = chunk.build_voxels()
+                self.chunk_registry.remove(chunk.slot)
+            for voxel_index, voxel_id in chunk_edits:
+                voxels[voxel_index] = voxel_id
+            self.region_store.save_chunk(chunk_pos, voxels)
+
+        print(f"Recovered {sum(map(len, edits.values()))} voxel edits in {len(edits)} chunks from the edit log")
+        self.compact_edit_log()
+
+    def record_edit(self, world_pos, old_id, new_id):
+        """
+        Logs a voxel edit made by the player.
+
+        Args:
+            world_pos: World position of the voxel
+            old_id (int): Voxel ID before the edit
+            new_id (int): Voxel ID after the edit
+        """
+        if self.edit_log:
+            self.edit_log.record(world_pos, old_id, new_id)
+
+    def compact_edit_log(self):
+        """
+        Queues the modified chunks for saving and starts a new edit log segment. The older
+        segments are deleted once the region store has written the chunks.
+        """
+        self.save()
+        segment = self.edit_log.start_segment()
+        self.region_store.call_when_written(functools.partial(self.edit_log.set_compacted, segment))
 
     def load_chunk(self, cx, cy, cz):
         """
-        Loads a single chunk at the given chunk coordinates.
+        Loads a single chunk at the given chunk coordinates, from the chunk cache if it was
+        unloaded recently, from the world save if it was saved, otherwise by generating its terrain.
 
         Args:
             cx, cy, cz: Chunk coordinates
@@ -53,28 +171,154 @@ class World:
         chunk_pos = (cx, cy, cz)
 
         if chunk_pos not in self.chunks:
+            cached_chunk = self.chunk_cache.take(chunk_pos) if self.chunk_cache else None
+            if cached_chunk:
+                chunk = self.restore_cached_chunk(chunk_pos, cached_chunk)
+                self.chunks[chunk_pos] = chunk
+                self.voxel_store.add(chunk)
+                return
+
             chunk = Chunk(self, position=chunk_pos)
-            chunk.voxels = chunk.build_voxels()
+            voxels = self.region_store.load_chunk(chunk_pos) if self.region_store else None
+            if voxels is None:
+                chunk.voxels = chunk.build_voxels()
+            else:
+                chunk.voxels = voxels
+                chunk.is_empty = not numpy.any(voxels)
             chunk.build_mesh()
             self.chunks[chunk_pos] = chunk
+            self.voxel_store.add(chunk)
+
+    def restore_cached_chunk(self, chunk_pos, cached_chunk):
+        """
+        Recreates a chunk from the chunk cache. The voxels stay compressed and, if the
+        vertex data was cached, the chunk is not meshed.
+
+        Args:
+            chunk_pos (tuple): Chunk coordinates
+            cached_chunk (CachedChunk): The cache entry of the chunk
+
+        Returns:
+            Chunk: The chunk
+        """
+        chunk = Chunk(self, position=chunk_pos)
+        chunk.compressed_voxels = cached_chunk.compressed_voxels
+        chunk.is_empty = cached_chunk.is_empty
+        chunk.occluder_boxes = cached_chunk.occluder_boxes
+        if cached_chunk.vertex_data is None:
+            chunk.build_mesh()
+        else:
+            chunk.face_connectivity = cached_chunk.face_connectivity
+            self.cave_culler.on_connectivity_changed(chunk_pos, FULL_CONNECTIVITY, chunk.face_connectivity)
+            chunk.build_mesh(cached_chunk.vertex_data)
+        return chunk
 
     def unload_chunk(self, cx, cy, cz):
         """
-        Unloads a chunk at the given chunk coordinates.
+        Unloads a chunk at the given chunk coordinates. A modified chunk is queued for
+        saving, the write happens in the background. The chunk is kept in the chunk cache
+        in case it comes back into range.
 
         Args:
             cx, cy, cz: Chunk coordinates
         """
         chunk_pos = (cx, cy, cz)
         if chunk_pos in self.chunks:
-            del self.chunks[chunk_pos]
+            chunk = self.chunks.pop(chunk_pos)
+            self.voxel_store.remove(chunk)
+            if chunk.is_modified and self.region_store:
+                self.region_store.save_chunk(chunk_pos, chunk.voxels)
+            self.solid_chunks.remove(chunk)
+            self.transparent_chunks.remove(chunk)
+            if self.chunk_cache:
+                self.cache_chunk(chunk)
+            chunk.mesh.release()
+            self.cave_culler.on_connectivity_changed(chunk_pos, chunk.face_connectivity, FULL_CONNECTIVITY)
+            self.chunk_registry.remove(chunk.slot)
+
+    def cache_chunk(self, chunk):
+        """
+        Adds a chunk that is being unloaded to the chunk cache, with its vertex data if
+        CHUNK_CACHE_MESHES is set.
+
+        Args:
+            chunk (Chunk): The chunk, its mesh must not be released yet
+        """
+        chunk.compress()
+        vertex_data = chunk.mesh.read_vertex_data() if CHUNK_CACHE_MESHES else None
+        self.chunk_cache.put(chunk.position, CachedChunk(
+            chunk.compressed_voxels, vertex_data, chunk.face_connectivity, chunk.occluder_boxes, chunk.is_empty
+        ))
+
+    def save(self):
+        """
+        Queues every loaded modified chunk for saving.
+        """
+        if not self.region_store:
+            return
+        for chunk_pos, chunk in self.chunks.items():
+            if chunk.is_modified:
+                # The chunk stays loaded and editable, so the writer gets a copy
+                self.region_store.save_chunk(chunk_pos, chunk.voxels.copy())
+                chunk.is_modified = False
+
+    def close(self):
+        """
+        Saves the modified chunks, waits for the writes to finish and releases the chunk geometry.
+        """
+        if self.edit_log:
+            self.compact_edit_log()
+        else:
+            self.save()
+
+        if self.region_store:
+            self.region_store.close()
+        if self.edit_log:
+            self.edit_log.close()
+        self.geometry_arena.release()
+
+    def on_mesh_built(self, mesh):
+        """
+        Called by ChunkMesh when a chunk is meshed or rebuilt, keeps the render lists
+        in sync with the geometry the chunk has.
+
+        Args:
+            mesh (ChunkMesh): The mesh that was built
+        """
+        chunk = mesh.chunk
+        registry = self.chunk_registry
+        registry.set_flag(chunk.slot, CHUNK_HAS_SOLID, mesh.solid_range is not None)
+        registry.set_flag(chunk.slot, CHUNK_HAS_WATER, mesh.transparent_range is not None)
+        registry.solid_counts[chunk.slot] = mesh.solid_range.count if mesh.solid_range else 0
+        registry.transparent_counts[chunk.slot] = mesh.transparent_range.count if mesh.transparent_range else 0
+
+        self.solid_chunks.update(chunk, mesh.solid_range is not None)
+        self.transparent_chunks.update(chunk, mesh.transparent_range is not None)
+        self.built_mesh_count += 1
 
     def update(self):
         """
         Updates the voxel handler and manages chunk loading/unloading.
         """
-        self.voxel_handler.update()
-        self.update_chunks()
+        profiler = self.app.profiler
+        with profiler.phase('raycast'):
+            self.voxel_handler.update()
+        with profiler.phase('update_chunks'):
+            self.update_chunks()
+
+        if self.app.time >= self.next_compress_time:
+            self.next_compress_time = self.app.time + CHUNK_COMPRESS_INTERVAL
+            with profiler.phase('update_chunks'):
+                self.compress_idle_chunks()
+        with profiler.phase('update_chunks'):
+            self.residency_manager.update()
+
+        if self.edit_log and self.app.time >= self.next_compaction_time:
+            self.next_compaction_time = self.app.time + EDIT_LOG_COMPACT_INTERVAL
+            self.compact_edit_log()
+
+        if CAVE_CULLING:
+            self.cave_culler.update()
 
     def update_chunks(self):
         """
@@ -86,49 +330,290 @@ class World:
         player_chunk = (player_chunk_x, player_chunk_z)
 
         # Only update if player moved to a new chunk
-        if player_chunk == self.last_player_chunk:
-            return
+        if player_chunk != self.last_player_chunk:
+            self.update_columns(player_chunk)
 
+        if VERTICAL_STREAMING:
+            self.load_sections_near((player_chunk_x, int(player_pos.y // CHUNK_SIZE), player_chunk_z))
+
+    def update_columns(self, player_chunk):
+        """
+        Loads and unloads chunk columns for a new player chunk. Only the columns that entered
+        the render distance are loaded and only the columns that left the unload distance
+        (render distance + CHUNK_UNLOAD_MARGIN) are unloaded.
+
+        Args:
+            player_chunk (tuple): Chunk (x, z) of the player
+        """
+        player_chunk_x, player_chunk_z = player_chunk
+        last_player_chunk = self.last_player_chunk
         self.last_player_chunk = player_chunk
+        self.voxel_store.update(player_chunk)
 
-        # Load new chunks in render distance
-        for x in range(player_chunk_x - self.render_distance, player_chunk_x + self.render_distance + 1):
-            for y in range(WORLD_HEIGHT):
-                for z in range(player_chunk_z - self.render_distance, player_chunk_z + self.render_distance + 1):
-                    # Only load if within circular render distance
-                    dist = ((x - player_chunk_x) ** 2 + (z - player_chunk_z) ** 2) ** 0.5
-                    if dist <= self.render_distance:
-                        self.load_chunk(x, y, z)
+        # First update or new render distance: visit every chunk
+        if last_player_chunk is None:
+            self.update_all_chunks(player_chunk)
+            return
+
+        last_chunk_x, last_chunk_z = last_player_chunk
+        dx, dz = player_chunk_x - last_chunk_x, player_chunk_z - last_chunk_z
+
+        # Load the columns that entered the render distance, nearest first
+        for ox, oz in get_strip_offsets(self.render_distance, -dx, -dz):
+            self.load_column(player_chunk_x + ox, player_chunk_z + oz)
+
+        # Unload the columns that left the unload distance
+        for ox, oz in get_strip_offsets(self.render_distance + CHUNK_UNLOAD_MARGIN, dx, dz):
+            self.unload_column(last_chunk_x + ox, last_chunk_z + oz)
+
+    def update_all_chunks(self, player_chunk):
+        """
+        Loads every chunk in render distance and unloads every loaded chunk outside the
+        unload distance.
+
+        Args:
+            player_chunk (tuple): Chunk (x, z) of the player
+        """
+        player_chunk_x, player_chunk_z = player_chunk
+
+        # Load new chunks in render distance, nearest first
+        for ox, oz in get_ring_offsets(self.render_distance):
+            self.load_column(player_chunk_x + ox, player_chunk_z + oz)
 
         # Unload distant chunks
-        chunks_to_unload = []
-        for chunk_pos in self.chunks.keys():
-            cx, cy, cz = chunk_pos
-            dist = ((cx - player_chunk_x) ** 2 + (cz - player_chunk_z) ** 2) ** 0.5
-            if dist > self.render_distance + 2:  # Keep 2 extra chunks as buffer
-                chunks_to_unload.append(chunk_pos)
+        registry = self.chunk_registry
+        slots = registry.get_active_slots()
+        offsets = registry.positions[slots][:, ::2] - (player_chunk_x, player_chunk_z)
+        is_distant = numpy.einsum('ij,ij->i', offsets, offsets) > (self.render_distance + CHUNK_UNLOAD_MARGIN) ** 2
 
-        for chunk_pos in chunks_to_unload:
-            self.unload_chunk(*chunk_pos)
+        for slot in slots[is_distant].tolist():
+            self.unload_chunk(*registry.chunks[slot].position)
+
+        unload_distance2 = (self.render_distance + CHUNK_UNLOAD_MARGIN) ** 2
+        self.column_bottoms = {
+            (cx, cz): bottom for (cx, cz), bottom in self.column_bottoms.items()
+            if (cx - player_chunk_x) ** 2 + (cz - player_chunk_z) ** 2 <= unload_distance2
+        }
+
+    def load_column(self, cx, cz):
+        """
+        Loads the chunks of a chunk column. With VERTICAL_STREAMING, only the sections the
+        surface passes through and the sections that were saved are loaded, the others are
+        loaded when the player gets near them.
+
+        Args:
+            cx, cz: Chunk coordinates of the column
+        """
+        if not VERTICAL_STREAMING:
+            for y in range(WORLD_HEIGHT):
+                self.load_chunk(cx, y, cz)
+            return
+
+        surface_sections = self.get_surface_sections(cx, cz)
+        self.column_bottoms[(cx, cz)] = surface_sections[0]
+        for y in range(WORLD_HEIGHT):
+            if y in surface_sections or (self.region_store and self.region_store.has_chunk((cx, y, cz))):
+                self.load_chunk(cx, y, cz)
+
+    def get_surface_sections(self, cx, cz):
+        """
+        Finds the sections of a chunk column that the terrain surface or the sea level pass
+        through. The sections below are solid rock and the sections above are empty sky.
+
+        Args:
+            cx, cz: Chunk coordinates of the column
+
+        Returns:
+            range: Chunk y coordinates of the sections
+        """
+        min_height, max_height = get_height_range(cx * CHUNK_SIZE, cz * CHUNK_SIZE)
+
+        # Highest and lowest terrain voxels, trees never grow out of the chunk of their ground block
+        top_y, bottom_y = max_height - 1, min_height - 1
+        if min_height < WATER_LVL:
+            top_y = max(top_y, WATER_LVL - 1)
+
+        bottom = min(max(bottom_y // CHUNK_SIZE, 0), WORLD_HEIGHT - 1)
+        top = min(max(top_y // CHUNK_SIZE, 0), WORLD_HEIGHT - 1)
+        return range(bottom, top + 1)
+
+    def load_sections_near(self, player_section):
+        """
+        Loads every section within SECTION_LOAD_RADIUS chunks of the player, so sky and deep
+        rock sections skipped by load_column are there before the player or the voxel
+        raycast reach them.
+
+        Args:
+            player_section (tuple): Chunk (x, y, z) of the player
+        """
+        if player_section == self.last_player_section:
+            return
+        self.last_player_section = player_section
+
+        px, py, pz = player_section
+        for x in range(px - SECTION_LOAD_RADIUS, px + SECTION_LOAD_RADIUS + 1):
+            for y in range(max(py - SECTION_LOAD_RADIUS, 0), min(py + SECTION_LOAD_RADIUS + 1, WORLD_HEIGHT)):
+                for z in range(pz - SECTION_LOAD_RADIUS, pz + SECTION_LOAD_RADIUS + 1):
+                    self.load_chunk(x, y, z)
+
+    def unload_column(self, cx, cz):
+        """
+        Unloads the loaded chunks of a chunk column.
+
+        Args:
+            cx, cz: Chunk coordinates of the column
+        """
+        for y in range(WORLD_HEIGHT):
+            self.unload_chunk(cx, y, cz)
+        self.column_bottoms.pop((cx, cz), None)
+
+    def compress_idle_chunks(self):
+        """
+        Compresses up to CHUNK_COMPRESS_PER_UPDATE chunks whose voxels were not accessed
+        for CHUNK_IDLE_TIME seconds. They are decompressed again when their voxels are accessed.
+        """
+        idle_time = self.app.time - CHUNK_IDLE_TIME
+        compressed_count = 0
+        for chunk in self.chunks.values():
+            if chunk.raw_voxels is not None and chunk.last_access_time < idle_time:
+                chunk.compress()
+                compressed_count += 1
+                if compressed_count == CHUNK_COMPRESS_PER_UPDATE:
+                    break
+
+    def get_voxel_memory(self):
+        """
+        Measures the memory used by the voxels of the loaded chunks.
+
+        Returns:
+            tuple: (bytes used, bytes the voxels would use uncompressed)
+        """
+        used_bytes = sum(chunk.get_voxel_memory() for chunk in self.chunks.values())
+        return used_bytes, len(self.chunks) * CHUNK_VOL
+
+    def update_draw_order(self):
+        """
+        Re-sorts the render lists when the camera entered a new chunk or chunks were
+        added to or removed from a list.
+
+        Front-to-back solid chunks let the depth test reject hidden fragments before the
+        fragment shader runs, back-to-front water blends correctly.
+        """
+        camera_pos = self.app.player.position
+        camera_chunk = (
+            int(camera_pos.x // CHUNK_SIZE),
+            int(camera_pos.y // CHUNK_SIZE),
+            int(camera_pos.z // CHUNK_SIZE),
+        )
+        camera_moved = camera_chunk != self.draw_order_chunk
+        self.draw_order_chunk = camera_chunk
+
+        for render_list in (self.solid_chunks, self.transparent_chunks):
+            if camera_moved or render_list.is_dirty:
+                render_list.sort(camera_pos)
+
+    def get_visible_chunks(self):
+        """
+        Culls every chunk with geometry once per frame, as array operations over the chunk registry.
+
+        Returns:
+            numpy.array: One boolean per registry slot, True for the chunks that passed cave
+            culling, the frustum test and, if enabled, the software occlusion test
+        """
+        registry = self.chunk_registry
+        candidate_slots = registry.get_flagged_slots(CHUNK_HAS_SOLID | CHUNK_HAS_WATER)
+        is_candidate_visible = self.app.player.frustum.get_visible_mask(registry.centers[candidate_slots])
+        if CAVE_CULLING:
+            is_candidate_visible &= self.cave_culler.get_visible_mask(registry.positions[candidate_slots])
+        visible_slots = candidate_slots[is_candidate_visible]
+
+        if SOFTWARE_OCCLUSION:
+            visible_chunks = self.occlusion_buffer.cull(registry.chunks[visible_slots].tolist())
+            visible_slots = numpy.array([chunk.slot for chunk in visible_chunks], dtype=numpy.int64)
+
+        registry.last_visible_times[visible_slots] = self.app.time
+
+        self.visible_chunk_count = len(visible_slots)
+        self.culled_chunk_count = len(candidate_slots) - len(visible_slots)
+        is_visible = numpy.zeros(registry.capacity, dtype=numpy.bool_)
+        is_visible[visible_slots] = True
+        return is_visible
 
     def render(self):
         """
         Renders all chunks using two-pass rendering for proper transparency.
+        Each pass only walks the render list of chunks that have geometry for it,
+        in draw order.
 
         WHY TWO PASSES?
         - Transparent water needs depth testing but shouldn't write to depth buffer
         - This prevents water from blocking geometry behind it incorrectly
         - Solid blocks render first (with depth write), then water (depth test only)
+
+        With DEPTH_PREPASS, the solid blocks are first drawn depth-only with a trivial
+        shader, so the expensive chunk fragment shader runs once per pixel at most.
         """
-        # PASS 1: Render all solid blocks (writes to depth buffer)
-        for chunk in self.chunks.values():
-            chunk.render()
+        render_state = self.app.render_state
+        profiler = self.app.profiler
+        registry = self.chunk_registry
+        arena = self.geometry_arena
+        with profiler.phase('culling'):
+            self.update_draw_order()
+            is_visible = self.get_visible_chunks()
+            is_slot_visible = is_visible.tolist()  # Plain list, indexed once per chunk below
+
+            # Ranges of neighbouring chunks in a page are drawn with one call
+            solid_ranges = arena.merge_ranges([
+                chunk.mesh.solid_range for chunk in self.solid_chunks.order if is_slot_visible[chunk.slot]
+            ], window=DRAW_MERGE_WINDOW)
+            transparent_ranges = arena.merge_ranges([
+                chunk.mesh.transparent_range for chunk in self.transparent_chunks.order if is_slot_visible[chunk.slot]
+            ])
+
+        render_state.enable(moderngl.DEPTH_TEST)
+        render_state.disable(moderngl.CULL_FACE)
+        render_state.set_depth_func('<')
+        render_state.set_depth_mask(True)
+
+        # PASS 0 (optional): Depth-only pre-pass of all solid blocks
+        if DEPTH_PREPASS:
+            with profiler.phase('solid_pass'), self.depth_prepass_timer:
+                render_state.set_color_mask((False, False, False, False))
+                for arena_range in solid_ranges:
+                    arena_range.render_depth()
+                render_state.set_color_mask((True, True, True, True))
+
+            # Only the fragments that won the pre-pass are shaded
+            render_state.set_depth_func('==')
+            render_state.set_depth_mask(False)
+
+        # PASS 1: Render all solid blocks front-to-back (writes to depth buffer)
+        with profiler.phase('solid_pass'), self.solid_pass_timer:
+            for arena_range in solid_ranges:
+                arena_range.render()
+
+        # PASS 2: Render all transparent blocks back-to-front (reads depth buffer, doesn't write to it)
+        render_state.set_depth_func('<')
+        render_state.set_depth_mask(False)  # Disable depth writes
+        with profiler.phase('transparent_pass'), self.transparent_pass_timer:
+            for arena_range in transparent_ranges:
+                arena_range.render()
+
+        # Counters of the geometry drawn by the passes, the vertex counts come from the registry
+        solid_passes = 2 if DEPTH_PREPASS else 1
+        self.draw_call_count = solid_passes * len(solid_ranges) + len(transparent_ranges)
+        self.vertex_count = int(
+            solid_passes * registry.solid_counts[is_visible].sum() + registry.transparent_counts[is_visible].sum()
+        )
+
+    def get_pass_times(self):
+        """
+        Returns the GPU time of the depth pre-pass and solid pass of the previous frame.
 
-        # PASS 2: Render all transparent blocks (reads depth buffer, doesn't write to it)
-        self.app.ctx.depth_mask = False  # Disable depth writes
-        for chunk in self.chunks.values():
-            chunk.render_transparent()
-        self.app.ctx.depth_mask = True  # Re-enable depth writes
+        Returns:
+            tuple: (depth pre-pass ms, solid pass ms), the pre-pass time is 0 when it is disabled
+        """
+        return self.depth_prepass_timer.time_ms, self.solid_pass_timer.time_ms
 
     def get_voxel_id(self, voxel_world_pos):
         """
@@ -140,6 +625,12 @@ class World:
         Returns:
             int: Voxel ID at the position, or 0 if out of bounds or chunk not loaded
         """
+        x, y, z = int(voxel_world_pos[0]), int(voxel_world_pos[1]), int(voxel_world_pos[2])
+        voxel_id = self.voxel_store.get_voxel(x, y, z)
+        if voxel_id >= 0:
+            return voxel_id
+
+        # Chunk outside the voxel store
         cx, cy, cz = voxel_world_pos // CHUNK_SIZE
 
         # Check Y bounds only (infinite in X and Z)
@@ -150,7 +641,7 @@ class World:
         if chunk_pos in self.chunks:
             lx, ly, lz = voxel_world_pos % CHUNK_SIZE
             voxel_index = int(lx) + CHUNK_SIZE * int(lz) + CHUNK_AREA * int(ly)
-            return self.chunks[chunk_pos].voxels[voxel_index]
+            return self.chunks[chunk_pos].get_voxel(voxel_index)
         return 0
 
     def is_solid_voxel(self, position):
@@ -183,3 +674,33 @@ class World:
         voxel_pos = glm.ivec3(glm.floor(position))
         return self.get_voxel_id(voxel_pos) == 16
 
+    def get_voxels(self, positions):
+        """
+        Gets the voxel IDs at many world positions at once, e.g. for collision probes.
+
+        Args:
+            positions (numpy.array): (N, 3) world positions, rounded down to the voxel they are in
+
+        Returns:
+            numpy.array: (N,) voxel IDs, 0 where the chunk is out of bounds or not loaded
+        """
+        voxel_ids = self.voxel_store.get_voxels(positions)
+
+        # Positions outside the voxel store
+        for i in numpy.flatnonzero(voxel_ids < 0).tolist():
+            voxel_ids[i] = self.get_voxel_id(glm.ivec3(*numpy.floor(positions[i]).astype(numpy.int64).tolist()))
+        return voxel_ids
+
+    def is_solid_many(self, positions):
+        """
+        Checks at many world positions at once if the voxel blocks player movement.
+
+        Args:
+            positions (numpy.array): (N, 3) world positions
+
+        Returns:
+            numpy.array: (N,) booleans, True where the voxel is solid (not void and not water)
+        """
+        voxel_ids = self.get_voxels(positions)
+        return (voxel_ids != 0) & (voxel_ids != 16)
+
@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+from app.graphics.buffer_arena import ArenaRange, BufferArena
+
+
+def get_spans(ranges):
+    return [(arena_range.page.name, arena_range.first, arena_range.count) for arena_range in ranges]
+
+
+def test_adjacent_ranges_in_a_page_are_merged():
+    page, other_page = SimpleNamespace(name='a'), SimpleNamespace(name='b')
+    ranges = [
+        ArenaRange(page, 12, 6),
+        ArenaRange(other_page, 0, 6),
+        ArenaRange(page, 0, 12),
+        ArenaRange(page, 30, 6),
+        ArenaRange(other_page, 6, 6),
+    ]
+
+    merged = BufferArena.merge_ranges(ranges, window=len(ranges))
+
+    # Ordered by the first of their ranges in the draw order
+    assert get_spans(merged) == [('a', 0, 18), ('b', 0, 12), ('a', 30, 6)]
+    assert get_spans(ranges)[0] == ('a', 12, 6)  # The input ranges are left untouched
+
+
+def test_ranges_are_only_reordered_within_the_window():
+    page = SimpleNamespace(name='a')
+    ranges = [ArenaRange(page, 6, 6), ArenaRange(page, 0, 6), ArenaRange(page, 18, 6), ArenaRange(page, 12, 6)]
+
+    assert get_spans(BufferArena.merge_ranges(ranges)) == [('a', 6, 6), ('a', 0, 6), ('a', 18, 6), ('a', 12, 6)]
+    # Merged inside each pair, then with the merged range of the previous pair
+    assert get_spans(BufferArena.merge_ranges(ranges, window=2)) == [('a', 0, 24)]
@@ -0,0 +1,36 @@
+import os
+import threading
+import zlib
+import numpy
+from app.settings import CHUNK_VOL, REGION_COMPRESSION_LEVEL
+from app.world_utils.region_store import RegionStore, REGION_HEADER_SIZE
+
+
+def save_and_wait(store, chunk_pos, voxels):
+    is_written = threading.Event()
+    store.save_chunk(chunk_pos, voxels)
+    store.call_when_written(is_written.set)
+    assert is_written.wait(10)
+
+
+def test_saving_a_chunk_again_reuses_its_space(tmp_path):
+    store = RegionStore(str(tmp_path), 1)
+    rng = numpy.random.default_rng(0)
+    max_length = 0
+    for i in range(60):
+        # Voxels of varying entropy, so the compressed size changes between saves
+        voxels = rng.integers(0, 2 + i % 7, CHUNK_VOL).astype(numpy.uint8)
+        max_length = max(max_length, len(zlib.compress(voxels.tobytes(), REGION_COMPRESSION_LEVEL)))
+        save_and_wait(store, (1, 0, 1), voxels)
+        save_and_wait(store, (2, 0, 1), voxels[::-1].copy())
+    store.close()
+
+    assert os.path.getsize(tmp_path / 'r.0.0.region') <= REGION_HEADER_SIZE + 6 * max_length
+
+    # The free space is rebuilt from the table, and the stored chunks are intact
+    store = RegionStore(str(tmp_path), 1)
+    assert numpy.array_equal(store.load_chunk((1, 0, 1)), voxels)
+    save_and_wait(store, (1, 0, 1), voxels[::-1].copy())
+    assert numpy.array_equal(store.load_chunk((1, 0, 1)), voxels[::-1])
+    assert numpy.array_equal(store.load_chunk((2, 0, 1)), voxels[::-1])
+    store.close()
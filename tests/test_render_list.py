@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+import glm
+from app.world_utils.chunk_registry import ChunkRegistry
+from app.world_utils.render_list import RenderList
+
+
+def make_chunk(registry, position):
+    chunk = SimpleNamespace(position=position)
+    chunk.slot = registry.add(chunk)
+    return chunk
+
+
+def test_chunk_removed_and_added_before_sort_is_drawn_once():
+    registry = ChunkRegistry()
+    render_list = RenderList(registry)
+    near, far = make_chunk(registry, (0, 0, 0)), make_chunk(registry, (3, 0, 0))
+    render_list.update(near, True)
+    render_list.update(far, True)
+    render_list.sort(glm.vec3(0))
+
+    render_list.update(near, False)
+    render_list.update(near, True)
+    render_list.sort(glm.vec3(0))
+
+    assert render_list.order == [near, far]
+    assert len(render_list) == 2
+
+
+def test_removed_chunk_leaves_draw_order_on_sort():
+    registry = ChunkRegistry()
+    render_list = RenderList(registry, reverse=True)
+    near, far = make_chunk(registry, (0, 0, 0)), make_chunk(registry, (3, 0, 0))
+    render_list.update(near, True)
+    render_list.update(far, True)
+
+    render_list.remove(far)
+    render_list.sort(glm.vec3(0))
+
+    assert render_list.order == [near]
@@ -0,0 +1,22 @@
+import numpy
+from app.settings import CHUNK_SIZE, CHUNK_VOL
+from app.meshes.chunks.chunk import Chunk
+
+
+def generate(position):
+    voxels = numpy.zeros(CHUNK_VOL, dtype='uint8')
+    Chunk.generate_terrain(voxels, *(float(axis * CHUNK_SIZE) for axis in position))
+    return voxels
+
+
+def test_chunk_does_not_depend_on_generation_order():
+    surface, neighbour, below = (3, 1, 4), (4, 1, 4), (3, 0, 4)
+
+    first = generate(surface)
+    generate(neighbour)
+    generate(below)
+    generate(neighbour)
+    second = generate(surface)
+
+    assert numpy.any(first)
+    assert numpy.array_equal(first, second)
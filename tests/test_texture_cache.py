@@ -0,0 +1,11 @@
+from app.graphics import texture_cache
+
+
+def test_empty_cache_file_falls_back_to_png(tmp_path, monkeypatch):
+    monkeypatch.setattr(texture_cache, 'TEXTURE_DIR', str(tmp_path))
+    (tmp_path / 'frame.png.cache').write_bytes(b'')
+
+    def upload(*args):
+        raise AssertionError('an empty cache must not be uploaded')
+
+    assert texture_cache.load_cache('frame.png', upload) is None